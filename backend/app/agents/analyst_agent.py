@@ -1,19 +1,45 @@
 import dspy
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 # NO MÁS IMPORTACIONES RARAS DE TYPEDPREDICTOR
-from app.config import GROQ_API_KEY
+from app.config import GROQ_API_KEY, ANALYST_MAX_WORKERS
+from app.services.context_selector import context_selector
+from app.services.llm_memo import extraction_memo
+from app.services.rate_limiter import rate_limiters, call_with_rate_limit
 import os
 
 # --- 1. Configuración Global de DSPy para usar Groq ---
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY no encontrada. Asegúrate de que esté en backend/.env")
 
+# num_retries=0: los reintentos ante 429 los gestiona el rate limiter compartido
 groq_lm = dspy.LM(
     'groq/llama-3.1-8b-instant',
     api_key=GROQ_API_KEY,
-    max_tokens=200
+    max_tokens=200,
+    num_retries=0
 )
 dspy.settings.configure(lm=groq_lm)
 
+# LM para extracciones por lotes: varias variables por llamada necesitan más tokens de salida
+groq_lm_batch = dspy.LM(
+    'groq/llama-3.1-8b-instant',
+    api_key=GROQ_API_KEY,
+    max_tokens=1024,
+    num_retries=0
+)
+
+# Pool acotado de hilos para las llamadas al LLM: así el event loop de uvicorn
+# sigue atendiendo otras peticiones mientras Groq responde
+_llm_executor = ThreadPoolExecutor(max_workers=ANALYST_MAX_WORKERS, thread_name_prefix="analyst")
+
+# Versión del contrato de extracción (firma + instrucciones).
+# Súbela si cambias las firmas: invalida de golpe las respuestas memorizadas.
+SIGNATURE_VERSION = "1"
+
+# Máximo de variables por llamada al LLM (el resto se reparte en llamadas adicionales)
+MAX_FIELDS_PER_CALL = 12
+
 print("🤖 Agente Analista configurado con Groq (llama-3.1-8b-instant)")
 
 
@@ -27,7 +53,7 @@ class ExtractSingleVariable(dspy.Signature):
     """
     
     context = dspy.InputField(
-        desc="El texto completo extraído de una página web sobre un tractor."
+        desc="Fragmentos relevantes del texto extraído de una página web sobre un tractor."
     )
     variable_name = dspy.InputField(
         desc="El nombre técnico exacto de la variable que se debe extraer (ej: 'rated_power_net', 'displacement', 'transmission_type')."
@@ -39,6 +65,30 @@ class ExtractSingleVariable(dspy.Signature):
     )
 
 
+# Instrucciones de la firma dinámica multi-variable (ver _build_batch_signature)
+BATCH_INSTRUCTIONS = """
+Extrae varios valores técnicos de un contexto de texto, uno por cada campo de salida.
+Cada valor debe ser exacto al que aparece en el texto.
+Si un valor no se encuentra de forma explícita, ese campo debe ser 'N/A'.
+"""
+
+
+def _build_batch_signature(nombres_variables: tuple[str, ...]) -> type[dspy.Signature]:
+    """
+    Construye una firma DSPy con un OutputField por cada variable solicitada.
+    """
+    fields = {
+        "context": (str, dspy.InputField(
+            desc="Fragmentos relevantes del texto extraído de una página web sobre un tractor."
+        ))
+    }
+    for nombre in nombres_variables:
+        fields[nombre] = (str, dspy.OutputField(
+            desc=f"El valor de '{nombre}' (ej: '370 HP', '9.0L', 'PowerShift'). Si no se encuentra, responde exactamente 'N/A'."
+        ))
+    return dspy.make_signature(fields, BATCH_INSTRUCTIONS, signature_name="ExtractMultipleVariables")
+
+
 # --- 3. Clase del Agente Especialista ---
 
 class AnalystAgent:
@@ -61,6 +111,9 @@ class AnalystAgent:
             print(f"❌ Error al inicializar dspy.Predict en AnalystAgent: {e}")
             self.extractor = None
 
+        # Predictores multi-variable, cacheados por la tupla de variables
+        self._batch_extractors: dict[tuple[str, ...], dspy.Predict] = {}
+
     def run(self, contexto: str, nombre_variable: str) -> str:
         """
         Ejecuta la extracción de la variable.
@@ -69,24 +122,108 @@ class AnalystAgent:
             print("❌ AnalystAgent no inicializado. Extracción fallida.")
             return "N/A"
             
+        # ¿Ya le preguntamos esto mismo al LLM sobre esta misma página?
+        page_hash = extraction_memo.context_hash(contexto)
+        memorizado = extraction_memo.get(page_hash, nombre_variable, groq_lm.model, SIGNATURE_VERSION)
+        if memorizado is not None:
+            print(f"AnalystAgent [Memo]: Respuesta memorizada para '{nombre_variable}' = '{memorizado}'")
+            return memorizado
+
         print(f"AnalystAgent [Groq]: Iniciando extracción para: '{nombre_variable}'")
+
+        # Sólo mandamos al LLM las ventanas de la página relevantes para la variable
+        contexto, _ = context_selector.select(contexto, [nombre_variable])
         
         try:
-            # Llama al LLM (Groq) a través de DSPy
-            resultado = self.extractor(
-                context=contexto, 
-                variable_name=nombre_variable
+            # Llama al LLM (Groq) a través de DSPy, respetando el límite de tasa compartido
+            resultado = call_with_rate_limit(
+                rate_limiters.get("groq", groq_lm.model),
+                lambda: self.extractor(
+                    context=contexto, 
+                    variable_name=nombre_variable
+                )
             )
             
             valor_extraido = resultado.value
             
             if not valor_extraido or valor_extraido.strip() == "":
                 print(f"AnalystAgent [Groq]: Extracción resultó en N/A (vacío) para: '{nombre_variable}'")
+                extraction_memo.set(page_hash, nombre_variable, groq_lm.model, SIGNATURE_VERSION, "N/A")
                 return "N/A"
 
             print(f"AnalystAgent [Groq]: Extracción exitosa para: '{nombre_variable}' = '{valor_extraido}'")
+            extraction_memo.set(page_hash, nombre_variable, groq_lm.model, SIGNATURE_VERSION, valor_extraido.strip())
             return valor_extraido.strip()
 
         except Exception as e:
             print(f"❌ Error durante la extracción de DSPy para '{nombre_variable}': {e}")
-            return "N/A"
\ No newline at end of file
+            return "N/A"
+
+    def run_batch(self, contexto: str, nombres_variables: list[str]) -> dict[str, str]:
+        """
+        Extrae varias variables del mismo contexto con una firma multi-salida.
+        Si la lista es larga se divide en bloques de MAX_FIELDS_PER_CALL variables.
+
+        Returns:
+            dict[str, str]: {nombre_variable: valor}, con 'N/A' para las no encontradas.
+        """
+        resultados = {nombre: "N/A" for nombre in nombres_variables}
+
+        # Primero el memo: sólo preguntamos al LLM por las variables sin respuesta guardada
+        page_hash = extraction_memo.context_hash(contexto)
+        pendientes = []
+        for nombre in nombres_variables:
+            memorizado = extraction_memo.get(page_hash, nombre, groq_lm_batch.model, SIGNATURE_VERSION)
+            if memorizado is None:
+                pendientes.append(nombre)
+            else:
+                resultados[nombre] = memorizado
+
+        if len(pendientes) < len(nombres_variables):
+            print(f"AnalystAgent [Memo]: {len(nombres_variables) - len(pendientes)} variables resueltas desde el memo.")
+
+        for inicio in range(0, len(pendientes), MAX_FIELDS_PER_CALL):
+            bloque = tuple(pendientes[inicio:inicio + MAX_FIELDS_PER_CALL])
+            print(f"AnalystAgent [Groq]: Extracción por lotes de {len(bloque)} variables: {list(bloque)}")
+
+            try:
+                extractor = self._batch_extractors.get(bloque)
+                if extractor is None:
+                    extractor = dspy.Predict(_build_batch_signature(bloque))
+                    self._batch_extractors[bloque] = extractor
+
+                contexto_bloque, _ = context_selector.select(contexto, list(bloque))
+                def llamar_llm():
+                    with dspy.context(lm=groq_lm_batch):
+                        return extractor(context=contexto_bloque)
+
+                resultado = call_with_rate_limit(rate_limiters.get("groq", groq_lm_batch.model), llamar_llm)
+
+                for nombre in bloque:
+                    valor = getattr(resultado, nombre, None)
+                    if valor and str(valor).strip() not in ("", "N/A"):
+                        resultados[nombre] = str(valor).strip()
+                    extraction_memo.set(page_hash, nombre, groq_lm_batch.model, SIGNATURE_VERSION, resultados[nombre])
+
+            except Exception as e:
+                print(f"❌ Error durante la extracción por lotes de DSPy para {list(bloque)}: {e}")
+
+        encontrados = sum(1 for v in resultados.values() if v != "N/A")
+        print(f"AnalystAgent [Groq]: Lote completado. {encontrados}/{len(nombres_variables)} variables encontradas.")
+        return resultados
+
+    # --- Versiones asíncronas (no bloquean el event loop) ---
+
+    async def arun(self, contexto: str, nombre_variable: str) -> str:
+        """
+        Igual que run(), pero ejecutado en el pool de hilos del agente.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_llm_executor, self.run, contexto, nombre_variable)
+
+    async def arun_batch(self, contexto: str, nombres_variables: list[str]) -> dict[str, str]:
+        """
+        Igual que run_batch(), pero ejecutado en el pool de hilos del agente.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_llm_executor, self.run_batch, contexto, nombres_variables)
@@ -0,0 +1,119 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+
+from app.services.scraper import scrape_cache
+from app.services.context_selector import context_selector
+from app.services.llm_memo import extraction_memo
+from app.services.rate_limiter import rate_limiters
+from app.services.searcher import search_cache
+from app.services.url_registry import url_registry
+from app.services.backfill import run_backfill
+from app.services.tractor_snapshot import tractor_snapshot
+from app.services.response_cache import response_cache
+from app.database.schemas import SourceURLRequest
+from app.database.connection import pool_metrics
+
+router = APIRouter()
+
+
+@router.get("/cache/stats", summary="Estadísticas de las cachés del backend")
+async def cache_stats():
+    """
+    Devuelve aciertos, fallos, expulsiones y tamaño de cada caché.
+    """
+    return {
+        "scrape": scrape_cache.stats(),
+        "llm_memo": extraction_memo.stats(),
+        "search": search_cache.stats(),
+        "tractor_snapshot": tractor_snapshot.stats(),
+        "responses": response_cache.stats()
+    }
+
+
+@router.delete("/cache/scrape", summary="Vacía la caché de páginas scrapeadas")
+async def clear_scrape_cache():
+    """
+    Borra todas las páginas guardadas. El próximo scrapeo volverá a descargar.
+    """
+    # Recorre y borra los ficheros del disco: fuera del event loop
+    removed = await run_in_threadpool(scrape_cache.clear)
+    print(f"Admin: Caché de scrapeo vaciada ({removed} entradas).")
+    return {"removed": removed}
+
+
+@router.delete("/cache/responses", summary="Vacía la caché de respuestas de lectura")
+async def clear_response_cache():
+    removed = response_cache.clear()
+    print(f"Admin: Caché de respuestas vaciada ({removed} entradas).")
+    return {"removed": removed}
+
+
+@router.delete("/cache/llm-memo", summary="Invalida respuestas memorizadas del LLM")
+async def invalidate_llm_memo(
+    variable_name: Optional[str] = Query(None, description="Sólo las respuestas de esta variable"),
+    model: Optional[str] = Query(None, description="Sólo las respuestas de este modelo (ej: 'groq/llama-3.1-8b-instant')")
+):
+    """
+    Sin filtros vacía el memo completo.
+    """
+    # Con filtros abre y lee cada JSON del memo (hasta su tope en MB): fuera del event loop
+    removed = await run_in_threadpool(extraction_memo.invalidate, variable_name=variable_name, model=model)
+    print(f"Admin: Memo del LLM invalidado ({removed} entradas).")
+    return {"removed": removed}
+
+
+@router.get("/metrics/context", summary="Tokens ahorrados por el selector de contexto")
+async def context_metrics():
+    """
+    Tokens de entrada, tokens enviados al LLM y ahorro acumulado.
+    """
+    return context_selector.stats()
+
+
+@router.get("/metrics/rate-limits", summary="Estado de los límites de tasa por proveedor")
+async def rate_limit_metrics():
+    """
+    Tasa actual (adaptada tras los 429), peticiones y tiempo total de espera por bucket.
+    """
+    return rate_limiters.stats()
+
+
+@router.get("/pools", summary="Estado de los pools de conexiones a la BD (lectura / escritura)")
+async def pool_stats():
+    """
+    Por pool: conexiones en uso, latencia de checkout (media, p50, p95, máx.),
+    peticiones esperando conexión y rotación (conexiones abiertas, cerradas, invalidadas).
+    """
+    return {name: metrics.stats() for name, metrics in pool_metrics.items()}
+
+
+@router.get("/source-urls/stats", summary="Tamaño de la base de conocimiento de URLs")
+async def source_url_stats():
+    return url_registry.stats()
+
+
+@router.put("/source-urls", summary="Registra la ficha técnica conocida de un tractor")
+async def register_source_url(request: SourceURLRequest):
+    """
+    Alta o corrección manual: la próxima búsqueda de este tractor no pasará por la web.
+    """
+    key = await run_in_threadpool(url_registry.remember, request.name, request.url, "manual")
+    if not key:
+        raise HTTPException(status_code=400, detail="El nombre debe incluir marca y modelo (al menos 2 palabras, el modelo con cifras: 'John Deere 6R 110').")
+    return {"key": key, "url": request.url}
+
+
+@router.post("/backfill/numeric", summary="Recalcula las columnas numéricas desde los Strings guardados")
+async def backfill_numeric(
+    dry_run: bool = Query(True, description="Sólo cuenta los cambios (no escribe)"),
+    clear_unparsed: bool = Query(False, description="Pone a NULL los numéricos cuyo String ya no se puede convertir"),
+    variables: Optional[list[str]] = Query(None, description="Sólo estas variables (por defecto, todas)")
+):
+    """
+    Útil después de corregir o añadir una regla del convertidor.
+    Devuelve cuántas filas y valores cambiaron por columna.
+    """
+    return await run_in_threadpool(
+        run_backfill, variables=variables, dry_run=dry_run, clear_unparsed=clear_unparsed
+    )
@@ -2,12 +2,18 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import os
 from groq import Groq
+from app.services.rate_limiter import rate_limiters, acall_with_rate_limit
 
 router = APIRouter()
 
 # Inicializa el cliente de Groq
 # Asegúrate de que GROQ_API_KEY esté en tu archivo .env
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+# max_retries=0: los 429 los reintenta acall_with_rate_limit (como num_retries=0 en DSPy);
+# si el SDK los reintentara por su cuenta, el limitador compartido nunca bajaría la tasa
+client = Groq(api_key=os.environ.get("GROQ_API_KEY"), max_retries=0)
+
+# Modelo del chat (más grande que el del AnalystAgent)
+CHAT_MODEL = "llama-3.3-70b-versatile" # O "llama-3.1-8b-instant" si quieres más velocidad
 
 class ChatRequest(BaseModel):
     message: str
@@ -38,14 +44,18 @@ Instrucciones:
 @router.post("/talk", response_model=ChatResponse)
 async def chat_with_ai(request: ChatRequest):
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile", # O "llama-3.1-8b-instant" si quieres más velocidad
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": request.message}
-            ],
-            temperature=0.7,
-            max_tokens=1024,
+        # El cliente de Groq es síncrono: corre en el threadpool, con el límite de tasa compartido
+        completion = await acall_with_rate_limit(
+            rate_limiters.get("groq", CHAT_MODEL),
+            lambda: client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": request.message}
+                ],
+                temperature=0.7,
+                max_tokens=1024,
+            )
         )
         
         ai_reply = completion.choices[0].message.content
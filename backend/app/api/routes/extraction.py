@@ -1,28 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import inspect # Usaremos esto para una verificación de seguridad
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Importaciones de la base de datos
-from app.database.connection import get_db
-from app.database.models import Tractor # El modelo SQLAlchemy
-from app.database.schemas import ExtractionRequest, ExtractionResponse # Los modelos Pydantic
+from app.database.connection import get_async_db
+from app.database.schemas import ( # Los modelos Pydantic
+    ExtractionRequest, ExtractionResponse,
+    BatchExtractionRequest, BatchExtractionResponse
+)
 
 # Importaciones de los servicios y agentes
-from app.services.scraper import scrape_url
-from app.agents.analyst_agent import AnalystAgent
-from app.services.converter import get_canonical_values
+from app.services.scraper import scrape_page
+from app.services.extraction_service import (
+    analyst, valid_variables, extract_page_values, store_tractor_values_async
+)
 
 # --- Inicialización ---
 router = APIRouter()
 
-# Creamos una única instancia del agente para reutilizar (carga el modelo de IA una sola vez)
-try:
-    analyst = AnalystAgent()
-    print("Agente Analista cargado en la ruta de extracción.")
-except Exception as e:
-    print(f"ERROR CRÍTICO: No se pudo cargar el AnalystAgent: {e}")
-    analyst = None
-
 # --- Endpoint de Extracción ---
 
 @router.post(
@@ -32,28 +26,40 @@ except Exception as e:
 )
 async def extract_and_store_variable(
     request: ExtractionRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Este endpoint orquesta el proceso completo:
     1. Scrapea la URL proporcionada.
     2. Usa el Agente Analista (DSPy/Groq) para extraer 1 variable (ej: "108.6 hp").
     3. Usa el Convertidor para obtener el valor numérico (ej: 81.0).
-    4. Busca el tractor en la BD (o lo crea si no existe).
-    5. Actualiza AMBAS columnas (la de String y la numérica) en la BD.
+    4. Inserta el tractor o actualiza AMBAS columnas (la de String y la numérica)
+       en una sola sentencia (INSERT ... ON CONFLICT).
     """
     if not analyst:
         raise HTTPException(status_code=500, detail="El Agente Analista no está inicializado.")
 
-    # 1. Llamar a scrape_url (de services.scraper)
+    # Verificación de seguridad: ¿existe esta columna en el modelo Tractor?
+    if not valid_variables([request.variable_name])[0]:
+        print(f"Error: La variable '{request.variable_name}' no existe en el modelo 'Tractor'.")
+        raise HTTPException(status_code=400, detail=f"Variable '{request.variable_name}' no válida.")
+
+    # 1. Llamar a scrape_page (de services.scraper)
     print(f"Iniciando scrapeo de: {request.source_url}")
-    contexto = await scrape_url(request.source_url)
-    if not contexto:
+    page = await scrape_page(request.source_url)
+    if not page:
         raise HTTPException(status_code=404, detail="No se pudo scrapear el contenido de la URL.")
 
-    # 2. Llamar al AnalystAgent.run()
-    print(f"Llamando al Agente Analista para la variable: {request.variable_name}")
-    valor_extraido_str = analyst.run(contexto, request.variable_name) # ej: "108.6 hp"
+    # 2. Si el adaptador del sitio ya leyó la variable de la tabla, no hace falta el LLM
+    valor_extraido_str = page["structured"].get(request.variable_name)
+    source = "adapter"
+    if valor_extraido_str:
+        print(f"Adaptador del sitio: {request.variable_name} = '{valor_extraido_str}' (sin LLM)")
+    else:
+        # Llamar al AnalystAgent.run()
+        print(f"Llamando al Agente Analista para la variable: {request.variable_name}")
+        valor_extraido_str = await analyst.arun(page["text"], request.variable_name) # ej: "108.6 hp"
+        source = "llm"
 
     if valor_extraido_str == "N/A":
         print("El agente no encontró la variable.")
@@ -64,53 +70,98 @@ async def extract_and_store_variable(
         )
 
     try:
-        # 3. Buscar (query) en Tractor por tractor_model
-        tractor = db.query(Tractor).filter(Tractor.model == request.tractor_model).first()
-
-        # 4. Si no existe, crear un Tractor(model=..., company=...)
-        if not tractor:
-            print(f"Creando nueva entrada en la BD para el tractor: {request.tractor_model}")
-            tractor = Tractor(
-                model=request.tractor_model,
-                company=request.company 
-            )
-            db.add(tractor)
-            db.flush() # Importante para que 'tractor' tenga un ID antes del commit
-
-        # 5. Guardar el valor String Original
-        
-        # Verificación de seguridad: ¿existe esta columna en el modelo Tractor?
-        if not hasattr(Tractor, request.variable_name):
-            print(f"Error: La variable '{request.variable_name}' no existe en el modelo 'Tractor'.")
-            raise HTTPException(status_code=400, detail=f"Variable '{request.variable_name}' no válida.")
-        
-        print(f"Actualizando DB (String): {request.tractor_model} -> {request.variable_name} = '{valor_extraido_str}'")
-        setattr(tractor, request.variable_name, valor_extraido_str)
-
-        # 6. ¡NUEVA LÓGICA! Convertir y guardar el valor numérico
-        col_name_num, num_value = get_canonical_values(request.variable_name, valor_extraido_str)
-        
-        if col_name_num and num_value is not None:
-            # Segunda verificación de seguridad: ¿existe la columna numérica?
-            if hasattr(Tractor, col_name_num):
-                print(f"Actualizando DB (Numérico): {request.tractor_model} -> {col_name_num} = {num_value}")
-                setattr(tractor, col_name_num, num_value)
-            else:
-                # Esto es un log para nosotros, por si olvidamos añadir una col_num en models.py
-                print(f"ADVERTENCIA: El convertidor devolvió la columna '{col_name_num}' pero esta no existe en 'models.py'.")
-
-        # 7. Hacer db.commit()
-        db.commit()
-        db.refresh(tractor) # Refresca el objeto con los datos de la BD
-
-        # 8. Devolver el valor extraído
+        # 3-4. Convertir y guardar (sesión asíncrona)
+        await store_tractor_values_async(
+            db, request.tractor_model, request.company,
+            {request.variable_name: valor_extraido_str}
+        )
+
+        # 5. Devolver el valor extraído
         return ExtractionResponse(
             status="success",
             variable_name=request.variable_name,
-            value=valor_extraido_str
+            value=valor_extraido_str,
+            source=source
         )
 
     except Exception as e:
-        db.rollback() # Revertir cambios si algo falla
+        await db.rollback() # Revertir cambios si algo falla
         print(f"❌ Error al interactuar con la base de datos: {e}")
-        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
+
+
+# --- Endpoint de Extracción por Lotes ---
+
+@router.post(
+    "/extract/batch",
+    response_model=BatchExtractionResponse,
+    summary="Extrae varias variables de una URL con un solo scrapeo y las guarda en una transacción"
+)
+async def extract_and_store_batch(
+    request: BatchExtractionRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Versión por lotes de /extract:
+    1. Scrapea la URL UNA sola vez.
+    2. Lee las variables que el adaptador del sitio encontró en tablas/JSON-LD y extrae
+       el resto con una firma DSPy multi-salida (en bloques si la lista es larga).
+    3. Convierte cada valor a su columna numérica canónica.
+    4. Guarda todas las columnas (String y numéricas) en una única transacción.
+    """
+    if not analyst:
+        raise HTTPException(status_code=500, detail="El Agente Analista no está inicializado.")
+
+    # Separamos las variables que no existen en el modelo 'Tractor' (sin duplicados, en orden)
+    validas, invalidas = valid_variables(request.variable_names)
+    if invalidas:
+        print(f"ADVERTENCIA: Variables no válidas ignoradas: {invalidas}")
+
+    # 1. Scrapeo único
+    print(f"Iniciando scrapeo (lote) de: {request.source_url}")
+    page = await scrape_page(request.source_url)
+    if not page:
+        raise HTTPException(status_code=404, detail="No se pudo scrapear el contenido de la URL.")
+
+    # 2. Adaptador del sitio primero, LLM (multi-variable) sólo para las que faltan
+    encontrados, desde_adaptador = await extract_page_values(page, validas)
+
+    results = [
+        ExtractionResponse(
+            status="success" if v in encontrados else "not_found",
+            variable_name=v,
+            value=encontrados.get(v),
+            source=("adapter" if v in desde_adaptador else "llm") if v in encontrados else None
+        )
+        for v in validas
+    ] + [
+        ExtractionResponse(status="invalid", variable_name=v, value=None)
+        for v in invalidas
+    ]
+
+    if not encontrados:
+        print("El agente no encontró ninguna variable del lote.")
+        return BatchExtractionResponse(
+            status="not_found",
+            tractor_model=request.tractor_model,
+            extracted_count=0,
+            results=results
+        )
+
+    try:
+        # 3-4. Convertir y guardar en una sola transacción (sesión asíncrona)
+        await store_tractor_values_async(
+            db, request.tractor_model, request.company, encontrados
+        )
+
+        return BatchExtractionResponse(
+            status="success",
+            tractor_model=request.tractor_model,
+            extracted_count=len(encontrados),
+            results=results
+        )
+
+    except Exception as e:
+        await db.rollback()
+        print(f"❌ Error al interactuar con la base de datos (lote): {e}")
+        raise HTTPException(status_code=500, detail=f"Error de base de datos: {e}")
@@ -0,0 +1,87 @@
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.database.schemas import MiningJobRequest, MiningJobStatus
+from app.services.extraction_service import analyst
+from app.services.mining_jobs import mining_jobs
+
+router = APIRouter()
+
+
+def _get_job_or_404(job_id: str):
+    job = mining_jobs.jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Trabajo de minería no encontrado")
+    return job
+
+
+@router.post("/jobs/mining", response_model=MiningJobStatus, summary="Lanza un trabajo de minería en el servidor")
+async def submit_mining_job(request: MiningJobRequest):
+    """
+    Crea un trabajo que recorre búsqueda -> scrapeo -> extracción -> guardado
+    para cada tractor. El progreso se sigue en /jobs/{job_id}/events.
+    """
+    if not analyst:
+        raise HTTPException(status_code=500, detail="El Agente Analista no está inicializado.")
+    if not request.tractors:
+        raise HTTPException(status_code=400, detail="La lista de tractores está vacía.")
+
+    job = mining_jobs.submit(
+        tractors=[t.model_dump() for t in request.tractors],
+        variable_names=request.variable_names
+    )
+    print(f"Ruta Jobs: Trabajo {job.id} creado con {len(job.tractors)} tractores.")
+    return job.summary()
+
+
+@router.get("/jobs", response_model=List[MiningJobStatus], summary="Lista los trabajos de minería")
+async def list_mining_jobs():
+    return [job.summary() for job in mining_jobs.jobs.values()]
+
+
+@router.get("/jobs/{job_id}", summary="Estado y resultados de un trabajo de minería")
+async def get_mining_job(job_id: str):
+    job = _get_job_or_404(job_id)
+    return {**job.summary(), "results": job.results}
+
+
+@router.get("/jobs/{job_id}/events", summary="Progreso del trabajo en tiempo real (Server-Sent Events)")
+async def stream_mining_job(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Stream SSE con los eventos del trabajo. Si el navegador se reconecta
+    (cabecera 'Last-Event-ID'), sólo recibe los eventos que se perdió.
+    """
+    _get_job_or_404(job_id)
+    last_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_stream():
+        async for event in mining_jobs.subscribe(job_id, last_seq):
+            yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=MiningJobStatus, summary="Cancela un trabajo en curso")
+async def cancel_mining_job(job_id: str):
+    _get_job_or_404(job_id)
+    job = await mining_jobs.cancel(job_id)
+    return job.summary()
+
+
+@router.post("/jobs/{job_id}/resume", response_model=MiningJobStatus, summary="Reanuda un trabajo desde su checkpoint")
+async def resume_mining_job(job_id: str):
+    """
+    Vuelve a lanzar el trabajo sólo con los tractores que no terminaron bien.
+    """
+    _get_job_or_404(job_id)
+    if not analyst:
+        raise HTTPException(status_code=500, detail="El Agente Analista no está inicializado.")
+    job = mining_jobs.resume(job_id)
+    return job.summary()
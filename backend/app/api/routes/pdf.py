@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from app.database.connection import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.connection import get_async_read_db
 from app.database.models import Tractor
 from app.agents.writer_agent import WriterAgent
+from app.services.response_cache import response_cache, attachment_header
 import os
 
 router = APIRouter()
@@ -11,42 +13,58 @@ router = APIRouter()
 # Instanciamos el agente
 writer_agent = WriterAgent()
 
+
+def _render_pdf(tractor: Tractor) -> tuple[bytes, str]:
+    """
+    Genera el PDF del tractor. Devuelve (bytes, nombre_de_descarga).
+    """
+    # 2. Llamar al WriterAgent.run()
+    pdf_path = writer_agent.run(tractor)
+    if not pdf_path:
+        raise HTTPException(status_code=500, detail="Error al generar el archivo PDF en el servidor")
+
+    # 3. Leer el archivo temporal (queda en la caché de respuestas) y borrarlo
+    try:
+        with open(pdf_path, "rb") as f:
+            content = f.read()
+    finally:
+        os.remove(pdf_path)
+
+    # Creamos un nombre de archivo legible para la descarga
+    filename = f"{tractor.company or 'Reporte'}_{tractor.model}.pdf".replace(" ", "_")
+    return content, filename
+
+
 @router.get("/generate-pdf/{model_name}")
 async def generate_pdf_route(
-    model_name: str, 
-    db: Session = Depends(get_db)
+    model_name: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Genera y devuelve un reporte en PDF para un modelo de tractor específico.
+    Mientras el catálogo no cambie, el PDF se sirve desde la caché (o con 304 si el cliente ya lo tiene).
     """
-    
+    cache_key = response_cache.key("pdf", request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        print(f"Ruta PDF: '{model_name}' servido desde la caché de respuestas.")
+        return response_cache.respond(request, cached)
+
     # 1. Consultar la TractorDB en Postgres
     print(f"Ruta PDF: Buscando tractor '{model_name}' en la BD...")
-    tractor = db.query(Tractor).filter(Tractor.model == model_name).first()
-    
-    # 2. Si no lo encuentra, devolver un 404
+    result = await db.execute(select(Tractor).where(Tractor.model == model_name))
+    tractor = result.scalars().first()
+
+    # Si no lo encuentra, devolver un 404
     if not tractor:
         print(f"Ruta PDF: Tractor '{model_name}' no encontrado.")
         raise HTTPException(status_code=404, detail="Tractor no encontrado en la base de datos")
-        
-    # 3. Llamar al WriterAgent.run()
-    pdf_path = writer_agent.run(tractor)
-    
-    if not pdf_path:
-        raise HTTPException(status_code=500, detail="Error al generar el archivo PDF en el servidor")
 
-    # 4. Devolver el PDF generado usando FileResponse
-    
-    # Creamos un nombre de archivo legible para la descarga
-    filename = f"{tractor.company or 'Reporte'}_{tractor.model}.pdf".replace(" ", "_")
-    
-    print(f"Ruta PDF: Enviando archivo {pdf_path} como {filename}")
-    
-    return FileResponse(
-        path=pdf_path,
-        media_type='application/pdf',
-        filename=filename,
-        # Importante: Usamos una lambda en 'background' para eliminar 
-        # el archivo temporal DESPUÉS de que se haya enviado al usuario.
-        background=lambda: os.remove(pdf_path)
-    )
\ No newline at end of file
+    # El render (WriterAgent + disco) es síncrono: fuera del event loop
+    content, filename = await run_in_threadpool(_render_pdf, tractor)
+    print(f"Ruta PDF: Enviando PDF ({len(content)} bytes) como {filename}")
+    entry = response_cache.put(
+        cache_key, content, "application/pdf", {"Content-Disposition": attachment_header(filename)}
+    )
+    return response_cache.respond(request, entry)
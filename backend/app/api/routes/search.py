@@ -16,7 +16,7 @@ async def search_url_route(request: SearchRequest):
     Endpoint para buscar una URL relevante basada en una consulta.
     Usa un motor de búsqueda gratuito (DuckDuckGo).
     """
-    url = search_google_free(request.query)
+    url = await search_google_free(request.query)
     
     if not url:
         # No lanzamos error 404 para no romper el flujo del chat,
@@ -1,24 +1,68 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional
+
+from app.config import (
+    FILTER_ENGINE, FILTER_MAX_PAGE_SIZE, FILTER_STREAM_BATCH_SIZE, FACET_DEFAULT_BINS,
+    TRACTOR_SEARCH_MIN_SCORE, TRACTOR_SEARCH_MAX_RESULTS, SIMILAR_MAX_K,
+    RANK_MAX_OBJECTIVES, RANK_MAX_RESULTS
+)
 
 # Importaciones de la base de datos
-from app.database.connection import get_db
+from app.database.connection import AsyncReadSessionLocal, get_async_read_db
 from app.database.models import Tractor
-from app.database.schemas import TractorPublic
+from app.database.schemas import TractorPublic, parse_fields
+from app.database.filters import active_filters, apply_sql
+from app.database.facets import parse_facet_columns, sql_facets
+from app.database.search import pg_trgm_enabled, sql_search
+from app.database.pagination import SortSpec, PageCursor, parse_sort, encode_cursor, decode_cursor, apply_sql_page
+from app.services.tractor_snapshot import tractor_snapshot
+from app.services.ranking import parse_objectives, objective_signature, rank, sql_objective_values
+from app.services.response_cache import response_cache
+from app.services.serialization import NDJSON_MEDIA_TYPE, dumps, project, rows_to_json, iter_ndjson, aiter_ndjson
 
 router = APIRouter()
 
-@router.get(
-    "/tractors/filter", 
-    response_model=List[TractorPublic],
-    summary="Obtiene una lista de tractores con filtros dinámicos (TODOS)"
-)
-async def filter_tractors(
-    # --- Dependencias ---
-    db: Session = Depends(get_db),
-    
+
+def _sql_query(
+    filters: list,
+    sort: SortSpec,
+    cursor: PageCursor | None,
+    limit: int | None,
+    fields: tuple[str, ...] | None,
+):
+    """
+    Motor SQL: selecciona sólo las columnas pedidas (más 'id' y la de orden, para el cursor).
+    Devuelve tuplas, no objetos Tractor (sin hidratación del ORM).
+    """
+    names = Tractor.__table__.columns.keys() if fields is None else {*fields, "id", sort.column}
+    stmt = select(*[Tractor.__table__.c[name] for name in names])
+    return apply_sql_page(apply_sql(stmt, filters), sort, cursor, limit)
+
+
+async def _sql_page(db: AsyncSession, filters, sort, cursor, limit, fields) -> tuple[list[dict], bool]:
+    result = await db.execute(_sql_query(filters, sort, cursor, limit, fields))
+    rows = [dict(row._mapping) for row in result]
+    has_more = limit is not None and len(rows) > limit
+    return rows[:limit] if has_more else rows, has_more
+
+
+async def _sql_stream(filters, sort: SortSpec, fields: tuple[str, ...] | None) -> AsyncIterator[dict]:
+    """
+    Filas leídas con un cursor del lado del servidor (yield_per): la memoria no crece con el catálogo.
+    Abre su propia sesión porque se consume mientras se envía la respuesta.
+    """
+    async with AsyncReadSessionLocal() as db:
+        stmt = _sql_query(filters, sort, None, None, fields).execution_options(yield_per=FILTER_STREAM_BATCH_SIZE)
+        result = await db.stream(stmt)
+        async for row in result:
+            yield dict(row._mapping)
+
+
+def tractor_filters(
     # --- Filtros de Texto ---
     company: Optional[str] = Query(None, description="Filtra por nombre de compañía (búsqueda parcial)"),
     model: Optional[str] = Query(None, description="Filtra por nombre de modelo (búsqueda parcial)"),
@@ -76,102 +120,255 @@ async def filter_tractors(
     
     # --- Filtros de Rango (Combustible) ---
     fuel_cap_min_l: Optional[float] = Query(None), fuel_cap_max_l: Optional[float] = Query(None)
+) -> list:
+    """
+    Dependencia compartida por las rutas de lista: los ~80 parámetros de filtro
+    (documentados en OpenAPI) -> filtros activos de database/filters.py.
+    """
+    # Todos los parámetros de la función -> filtros activos
+    return active_filters(locals())
+
+
+@router.get(
+    "/tractors/search",
+    summary="Búsqueda difusa de tractores por marca y modelo (typeahead)"
+)
+async def search_tractors(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar (ej: 't7 190', 'deere 6r')"),
+    limit: int = Query(10, ge=1, le=TRACTOR_SEARCH_MAX_RESULTS),
 ):
-    
-    print("Iniciando consulta de filtro 100% completa...")
-    query = db.query(Tractor)
-    
-    # --- Aplicar Filtros de Texto ---
-    if company: query = query.filter(Tractor.company.ilike(f"%{company}%"))
-    if model: query = query.filter(Tractor.model.ilike(f"%{model}%"))
-    if drive_type: query = query.filter(Tractor.drive_type == drive_type)
-    if rear_type: query = query.filter(Tractor.rear_type == rear_type)
-
-    # --- Aplicar Filtros Booleanos ---
-    if enganche_delantero is not None: query = query.filter(Tractor.enganche_delantero == enganche_delantero)
-    if differential_lock is not None: query = query.filter(Tractor.differential_lock == differential_lock)
-    if has_precision_agriculture is not None: query = query.filter(Tractor.has_precision_agriculture == has_precision_agriculture)
-
-    # --- Aplicar Filtros de Rango Numérico (TODOS) ---
-    if cylinders_min: query = query.filter(Tractor.numero_de_cilindros_num >= cylinders_min)
-    if cylinders_max: query = query.filter(Tractor.numero_de_cilindros_num <= cylinders_max)
-    if disp_min_l: query = query.filter(Tractor.displacement_l >= disp_min_l)
-    # 👇 ¡CORREGIDO AQUÍ! (Era TTractor)
-    if disp_max_l: query = query.filter(Tractor.displacement_l <= disp_max_l)
-    if comp_min: query = query.filter(Tractor.compression_ratio_num >= comp_min)
-    if comp_max: query = query.filter(Tractor.compression_ratio_num <= comp_max)
-    if oil_cap_min_l: query = query.filter(Tractor.oil_capacity_l >= oil_cap_min_l)
-    if oil_cap_max_l: query = query.filter(Tractor.oil_capacity_l <= oil_cap_max_l)
-    if starter_min_v: query = query.filter(Tractor.starter_volts_v >= starter_min_v)
-    if starter_max_v: query = query.filter(Tractor.starter_volts_v <= starter_max_v)
-    if power_net_min_kw: query = query.filter(Tractor.rated_power_net_kw >= power_net_min_kw)
-    if power_net_max_kw: query = query.filter(Tractor.rated_power_net_kw <= power_net_max_kw)
-    if power_gross_min_kw: query = query.filter(Tractor.max_power_gross_kw >= power_gross_min_kw)
-    if power_gross_max_kw: query = query.filter(Tractor.max_power_gross_kw <= power_gross_max_kw)
-    if rated_rpm_min: query = query.filter(Tractor.rated_rpm_num >= rated_rpm_min)
-    if rated_rpm_max: query = query.filter(Tractor.rated_rpm_num <= rated_rpm_max)
-    if torque_min_nm: query = query.filter(Tractor.torque_nm >= torque_min_nm)
-    if torque_max_nm: query = query.filter(Tractor.torque_nm <= torque_max_nm)
-    if torque_rpm_min: query = query.filter(Tractor.torque_rpm_num >= torque_rpm_min)
-    if torque_rpm_max: query = query.filter(Tractor.torque_rpm_num <= torque_rpm_max)
-    
-    if gears_fwd_min: query = query.filter(Tractor.cambios_adelante >= gears_fwd_min)
-    if gears_fwd_max: query = query.filter(Tractor.cambios_adelante <= gears_fwd_max)
-    if gears_rev_min: query = query.filter(Tractor.cambios_atras >= gears_rev_min)
-    if gears_rev_max: query = query.filter(Tractor.cambios_atras <= gears_rev_max)
-
-    if pump_flow_min_lpm: query = query.filter(Tractor.pump_flow_lpm >= pump_flow_min_lpm)
-    if pump_flow_max_lpm: query = query.filter(Tractor.pump_flow_lpm <= pump_flow_max_lpm)
-    if pressure_min_bar: query = query.filter(Tractor.pressure_bar >= pressure_min_bar)
-    if pressure_max_bar: query = query.filter(Tractor.pressure_bar <= pressure_max_bar)
-    if scv_flow_min_lpm: query = query.filter(Tractor.rear_scv_flow_lpm >= scv_flow_min_lpm)
-    if scv_flow_max_lpm: query = query.filter(Tractor.rear_scv_flow_lpm <= scv_flow_max_lpm)
-    if rear_valves_min: query = query.filter(Tractor.rear_valves >= rear_valves_min)
-    if rear_valves_max: query = query.filter(Tractor.rear_valves <= rear_valves_max)
-    if front_valves_min: query = query.filter(Tractor.front_valves >= front_valves_min)
-    if front_valves_max: query = query.filter(Tractor.front_valves <= front_valves_max)
-    if capacity_min_l: query = query.filter(Tractor.capacity_l >= capacity_min_l)
-    if capacity_max_l: query = query.filter(Tractor.capacity_l <= capacity_max_l)
-
-    if pto_rpm_min: query = query.filter(Tractor.engine_rpm_at_pto_num >= pto_rpm_min)
-    if pto_rpm_max: query = query.filter(Tractor.engine_rpm_at_pto_num <= pto_rpm_max)
-
-    if length_min_m: query = query.filter(Tractor.length_m >= length_min_m)
-    if length_max_m: query = query.filter(Tractor.length_m <= length_max_m)
-    if width_min_m: query = query.filter(Tractor.width_m >= width_min_m)
-    if width_max_m: query = query.filter(Tractor.width_m <= width_max_m)
-    
-    # 👇 ¡AQUÍ ESTÁ LA MAGIA! Usamos func.coalesce
-    ref_height = func.coalesce(Tractor.height_rops_m, Tractor.height_m)
-    if height_min_m: query = query.filter(ref_height >= height_min_m)
-    if height_max_m: query = query.filter(ref_height <= height_max_m)
-    
-    if wheelbase_min_m: query = query.filter(Tractor.wheelbase_m >= wheelbase_min_m)
-    if wheelbase_max_m: query = query.filter(Tractor.wheelbase_m <= wheelbase_max_m)
-    if clearance_min_m: query = query.filter(Tractor.ground_clearance_m >= clearance_min_m)
-    if clearance_max_m: query = query.filter(Tractor.ground_clearance_m <= clearance_max_m)
-    
-    # 👇 Usamos func.coalesce para el peso también
-    ref_weight = func.coalesce(Tractor.ballasted_weight_kg, Tractor.shipping_weight_kg)
-    if weight_ship_min_kg: query = query.filter(Tractor.shipping_weight_kg >= weight_ship_min_kg)
-    if weight_ship_max_kg: query = query.filter(Tractor.shipping_weight_kg <= weight_ship_max_kg)
-    if weight_ballast_min_kg: query = query.filter(Tractor.ballasted_weight_kg >= weight_ballast_min_kg)
-    if weight_ballast_max_kg: query = query.filter(Tractor.ballasted_weight_kg <= weight_ballast_max_kg)
-
-    if batt_volts_min_v: query = query.filter(Tractor.battery_volts_v >= batt_volts_min_v)
-    if batt_volts_max_v: query = query.filter(Tractor.battery_volts_v <= batt_volts_max_v)
-    if batt_ah_min: query = query.filter(Tractor.battery_AH_num >= batt_ah_min)
-    if batt_ah_max: query = query.filter(Tractor.battery_AH_num <= batt_ah_max)
-    
-    if lift_cap_min_kg: query = query.filter(Tractor.rear_lift_capacity_kg >= lift_cap_min_kg)
-    if lift_cap_max_kg: query = query.filter(Tractor.rear_lift_capacity_kg <= lift_cap_max_kg)
-    
-    if fuel_cap_min_l: query = query.filter(Tractor.fuel_tank_capacity_l >= fuel_cap_min_l)
-    if fuel_cap_max_l: query = query.filter(Tractor.fuel_tank_capacity_l <= fuel_cap_max_l)
+    """
+    Coincidencias por similitud de trigramas, de la mejor a la peor: tolera erratas
+    y separadores distintos ("T7 190" encuentra "T7.190").
+    Devuelve [{id, company, model, score}].
+    """
+    search_engine = "pg_trgm" if pg_trgm_enabled() else "ngram"
+    cache_key = response_cache.key("search", request, search_engine)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
 
-    # Ejecutar la consulta
-    print("Ejecutando consulta de filtro en la BD...")
-    tractors = query.all()
-    print(f"Consulta completada. Se encontraron {len(tractors)} tractores.")
-    
-    return tractors
\ No newline at end of file
+    current = True
+    if search_engine == "pg_trgm":
+        # Índice GIN de trigramas en la BD
+        results = await sql_search(db, q, limit, TRACTOR_SEARCH_MIN_SCORE)
+    else:
+        # Índice de trigramas del snapshot (se reconstruye con cada versión del catálogo,
+        # por eso también la búsqueda va al threadpool)
+        snapshot = await run_in_threadpool(tractor_snapshot.get)
+        results = await run_in_threadpool(snapshot.search, q, limit, TRACTOR_SEARCH_MIN_SCORE)
+        current = snapshot.is_current()
+
+    entry = response_cache.put(cache_key, dumps(results), "application/json", store=current)
+    return response_cache.respond(request, entry)
+
+
+@router.get(
+    "/tractors/filter", 
+    response_model=List[TractorPublic],
+    summary="Obtiene una lista de tractores con filtros dinámicos (TODOS)"
+)
+async def filter_tractors(
+    # --- Dependencias ---
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+
+    # --- Paginación, orden y proyección ---
+    limit: Optional[int] = Query(None, ge=1, le=FILTER_MAX_PAGE_SIZE, description="Tamaño de página (sin él, devuelve todo)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor de la página anterior"),
+    sort: Optional[str] = Query(None, description="Columna indexada de orden; '-' delante para descendente (ej: '-rated_power_net_kw')"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas (ej: 'company,model'); 'id' siempre se incluye"),
+    format: Optional[str] = Query(None, description="'ndjson': un tractor por línea, enviado a medida que se lee (también con 'Accept: application/x-ndjson')"),
+
+    # --- Filtros (ver tractor_filters) ---
+    filters: list = Depends(tractor_filters),
+):
+    print(f"Iniciando consulta de filtro ({len(filters)} filtros activos, motor '{FILTER_ENGINE}')...")
+
+    try:
+        sort_spec = parse_sort(sort)
+        page_cursor = decode_cursor(cursor, sort_spec) if cursor else None
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # --- Modo NDJSON (opcional): las filas se envían a medida que se leen ---
+    if format == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        headers, body = {}, None
+        if FILTER_ENGINE == "snapshot":
+            snapshot = await run_in_threadpool(tractor_snapshot.get)
+            rows, has_more = await run_in_threadpool(snapshot.page, filters, sort_spec, page_cursor, limit)
+        elif limit is None:
+            # Todo el resultado, leído por lotes con un cursor del servidor
+            rows, has_more = None, False
+            body = aiter_ndjson(_sql_stream(filters, sort_spec, projection), projection)
+        else:
+            # Una página está acotada por FILTER_MAX_PAGE_SIZE: se lee entera para conocer el cursor
+            rows, has_more = await _sql_page(db, filters, sort_spec, page_cursor, limit, projection)
+        if has_more:
+            headers["X-Next-Cursor"] = encode_cursor(sort_spec, rows[-1])
+        print(f"Consulta en modo NDJSON (motor '{FILTER_ENGINE}').")
+        if body is None:
+            body = iter_ndjson(rows, projection)
+        return StreamingResponse(body, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    # Misma consulta y misma versión del catálogo -> misma respuesta (sin tocar la BD)
+    cache_key = response_cache.key("filter", request, FILTER_ENGINE)
+    cached = response_cache.get(cache_key)
+    if cached:
+        print("Consulta servida desde la caché de respuestas.")
+        return response_cache.respond(request, cached)
+
+    current = True
+    if FILTER_ENGINE == "snapshot":
+        # Máscaras NumPy sobre el catálogo en memoria (se recarga si cambió la versión)
+        snapshot = await run_in_threadpool(tractor_snapshot.get)
+        tractors, has_more = await run_in_threadpool(snapshot.page, filters, sort_spec, page_cursor, limit)
+        current = snapshot.is_current()
+    else:
+        print("Ejecutando consulta de filtro en la BD...")
+        tractors, has_more = await _sql_page(db, filters, sort_spec, page_cursor, limit, projection)
+
+    print(f"Consulta completada. Se devuelven {len(tractors)} tractores{' (hay más páginas)' if has_more else ''}.")
+
+    # Las filas ya tienen los tipos de TractorPublic: van directo al encoder JSON, sin validación por fila
+    headers = {"X-Next-Cursor": encode_cursor(sort_spec, tractors[-1])} if has_more else {}
+    # Calculada sobre el snapshot anterior mientras se recarga: se sirve pero no se cachea
+    entry = response_cache.put(cache_key, rows_to_json(tractors, projection), "application/json", headers, store=current)
+    return response_cache.respond(request, entry)
+
+
+@router.get(
+    "/tractors/facets",
+    summary="Rangos, histogramas y recuentos de valores del catálogo filtrado"
+)
+async def tractor_facets(
+    # --- Dependencias ---
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+
+    # --- Opciones ---
+    columns: Optional[str] = Query(None, description="Columnas numéricas separadas por comas (por defecto, todas las de los filtros de rango)"),
+    bins: int = Query(FACET_DEFAULT_BINS, ge=1, le=100, description="Intervalos de cada histograma"),
+
+    # --- Filtros (los mismos que /tractors/filter) ---
+    filters: list = Depends(tractor_filters),
+):
+    """
+    Para los sliders del SelectionModule: min/max, nulos e histograma de cada columna numérica
+    y recuento de 'company', 'drive_type' y 'rear_type', sin descargar el catálogo.
+    """
+    try:
+        facet_columns = parse_facet_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Cacheado por firma de filtros + versión del catálogo (igual que /tractors/filter)
+    cache_key = response_cache.key("facets", request, FILTER_ENGINE)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
+
+    current = True
+    if FILTER_ENGINE == "snapshot":
+        snapshot = await run_in_threadpool(tractor_snapshot.get)
+        # Pasada NumPy sobre todo el catálogo: fuera del event loop, como el ranking
+        facets = await run_in_threadpool(snapshot.facets, filters, facet_columns, bins)
+        current = snapshot.is_current()
+    else:
+        facets = await sql_facets(db, filters, facet_columns, bins)
+
+    print(f"Facetas calculadas: {facets['total']} tractores, {len(facet_columns)} columnas (motor '{FILTER_ENGINE}').")
+    entry = response_cache.put(cache_key, dumps(facets), "application/json", store=current)
+    return response_cache.respond(request, entry)
+
+
+@router.get(
+    "/tractors/rank",
+    summary="Ranking multicriterio y frontera de Pareto del catálogo filtrado"
+)
+async def rank_tractors(
+    # --- Dependencias ---
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+
+    # --- Objetivos ---
+    objectives: str = Query(..., description="'columna:max|min[:peso]' separados por comas (ej: 'rated_power_net_kw:max:3,shipping_weight_kg:min')"),
+    limit: int = Query(20, ge=1, le=RANK_MAX_RESULTS, description="Tamaño del top"),
+    pareto_limit: int = Query(100, ge=0, le=RANK_MAX_RESULTS, description="Máximo de tractores de la frontera de Pareto a devolver"),
+
+    # --- Restricciones (los mismos filtros que /tractors/filter) ---
+    filters: list = Depends(tractor_filters),
+):
+    """
+    Entre los tractores que cumplen los filtros y tienen todos los objetivos:
+    'top' ordenado por la media ponderada de los objetivos normalizados (0-1),
+    y 'pareto' con los que ningún otro mejora en todos los objetivos a la vez.
+    """
+    try:
+        parsed = parse_objectives(objectives, RANK_MAX_OBJECTIVES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Cacheado por firma de objetivos (sin importar el orden) + filtros + versión del catálogo
+    cache_key = response_cache.key("rank", request, FILTER_ENGINE, objective_signature(parsed), exclude=("objectives",))
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
+
+    current = True
+    if FILTER_ENGINE == "snapshot":
+        snapshot = await run_in_threadpool(tractor_snapshot.get)
+        ids, names, values = await run_in_threadpool(snapshot.objective_values, filters, tuple(o.column for o in parsed))
+        current = snapshot.is_current()
+    else:
+        ids, names, values = await sql_objective_values(db, filters, tuple(o.column for o in parsed))
+
+    result = await run_in_threadpool(rank, ids, names, values, parsed, limit, pareto_limit)
+    print(f"Ranking: {result['complete']}/{result['total']} tractores con todos los objetivos, "
+          f"{result['pareto_count']} en la frontera de Pareto (motor '{FILTER_ENGINE}').")
+    entry = response_cache.put(cache_key, dumps(result), "application/json", store=current)
+    return response_cache.respond(request, entry)
+
+
+@router.get(
+    "/tractors/{tractor_id}/similar",
+    summary="Tractores con las especificaciones más parecidas (k vecinos)"
+)
+async def similar_tractors(
+    tractor_id: int,
+    request: Request,
+    k: int = Query(5, ge=1, le=SIMILAR_MAX_K, description="Número de vecinos"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas (ej: 'company,model')"),
+):
+    """
+    Distancia sobre las especificaciones numéricas estandarizadas que tienen ambos tractores
+    (services/similarity.py), de la más parecida a la menos.
+    Cada tractor lleva además 'distance' y 'shared_features'.
+    """
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cache_key = response_cache.key("similar", request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
+
+    # Matriz de especificaciones del snapshot (se reconstruye con cada versión del catálogo,
+    # por eso también la consulta va al threadpool)
+    snapshot = await run_in_threadpool(tractor_snapshot.get)
+    neighbours = await run_in_threadpool(snapshot.similar, tractor_id, k)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail="Tractor no encontrado en la base de datos")
+
+    results = [
+        {**project(row, projection), "distance": row["distance"], "shared_features": row["shared_features"]}
+        for row in neighbours
+    ]
+    print(f"Tractores parecidos a {tractor_id}: {len(results)} vecinos.")
+    entry = response_cache.put(cache_key, dumps(results), "application/json", store=snapshot.is_current())
+    return response_cache.respond(request, entry)
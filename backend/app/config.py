@@ -9,6 +9,26 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("No se encontró la variable de entorno DATABASE_URL")
+# URL del motor asíncrono (por defecto se deriva de DATABASE_URL: asyncpg / aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# --- Pools de conexiones a la base de datos (lectura / escritura) ---
+# Réplica de sólo lectura opcional para las rutas de consulta (por defecto, la misma BD).
+# Con réplica, el snapshot de filtros puede leer datos con retraso: lo acota FILTER_SNAPSHOT_MAX_AGE_SECONDS.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+ASYNC_DATABASE_READ_URL = os.getenv("ASYNC_DATABASE_READ_URL")
+# Los nombres anteriores (un solo pool) siguen valiendo como valor por defecto de los dos
+_DB_POOL_SIZE = os.getenv("DB_POOL_SIZE")
+_DB_MAX_OVERFLOW = os.getenv("DB_MAX_OVERFLOW")
+# Lectura: catálogo, facetas, PDFs y carga del snapshot
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", _DB_POOL_SIZE or "10"))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", _DB_MAX_OVERFLOW or "20"))
+# Escritura: extracción, minería, backfill y registro de URLs
+DB_WRITE_POOL_SIZE = int(os.getenv("DB_WRITE_POOL_SIZE", _DB_POOL_SIZE or "5"))
+DB_WRITE_MAX_OVERFLOW = int(os.getenv("DB_WRITE_MAX_OVERFLOW", _DB_MAX_OVERFLOW or "5"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+# Tiempo máximo por sentencia en Postgres (0 = sin límite)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
 
 # Lee tus claves de API
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
@@ -17,4 +37,93 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 # Esto hace que nuestro scraper parezca un navegador real
 BROWSER_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
-}
\ No newline at end of file
+}
+
+# --- Caché de páginas scrapeadas ---
+# Directorio local donde se guardan el HTML crudo y el texto limpio de cada URL
+SCRAPE_CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR", "cache/scrape")
+SCRAPE_CACHE_TTL_SECONDS = int(os.getenv("SCRAPE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+SCRAPE_CACHE_MAX_MB = int(os.getenv("SCRAPE_CACHE_MAX_MB", "200"))
+# Tope de descarga por página: el resto del cuerpo se descarta sin leerlo
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(3 * 1024 * 1024)))
+
+# --- Cliente HTTP compartido (pool de conexiones) ---
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+# Peticiones simultáneas máximas contra un mismo host (para no saturar tractordata.com)
+HTTP_PER_HOST_CONCURRENCY = int(os.getenv("HTTP_PER_HOST_CONCURRENCY", "4"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv("HTTP_BACKOFF_BASE_SECONDS", "0.5"))
+# Tope a la espera de un 'Retry-After': un host mal configurado no puede aparcar un worker indefinidamente
+HTTP_RETRY_AFTER_MAX_SECONDS = float(os.getenv("HTTP_RETRY_AFTER_MAX_SECONDS", "30"))
+
+# --- Selector de contexto (ventanas relevantes antes de llamar al LLM) ---
+CONTEXT_WINDOW_WORDS = int(os.getenv("CONTEXT_WINDOW_WORDS", "80"))
+CONTEXT_TOP_K = int(os.getenv("CONTEXT_TOP_K", "4"))
+# Páginas más cortas que esto se envían completas
+CONTEXT_MIN_CHARS = int(os.getenv("CONTEXT_MIN_CHARS", "2000"))
+
+# --- Memo persistente de extracciones del LLM ---
+LLM_MEMO_DIR = os.getenv("LLM_MEMO_DIR", "cache/llm_memo")
+LLM_MEMO_TTL_SECONDS = int(os.getenv("LLM_MEMO_TTL_SECONDS", str(30 * 24 * 3600)))
+LLM_MEMO_MAX_MB = int(os.getenv("LLM_MEMO_MAX_MB", "50"))
+
+# --- Ejecución no bloqueante del AnalystAgent ---
+# Hilos dedicados a las llamadas (síncronas) de DSPy/Groq, fuera del event loop
+ANALYST_MAX_WORKERS = int(os.getenv("ANALYST_MAX_WORKERS", "8"))
+
+# --- Trabajos de minería en el servidor ---
+# Directorio con el checkpoint (JSON) de cada trabajo, para poder reanudarlo
+MINING_JOBS_DIR = os.getenv("MINING_JOBS_DIR", "cache/jobs")
+# Tractores procesándose a la vez (sumando todos los trabajos)
+MINING_MAX_CONCURRENCY = int(os.getenv("MINING_MAX_CONCURRENCY", "4"))
+# Eventos que se guardan por trabajo para reenviar a quien se reconecta (Last-Event-ID)
+MINING_EVENT_HISTORY = int(os.getenv("MINING_EVENT_HISTORY", "500"))
+
+# --- Límites de tasa por proveedor (token buckets compartidos) ---
+# Groq (plan gratuito): ~30 peticiones/minuto por modelo
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+DDG_REQUESTS_PER_MINUTE = float(os.getenv("DDG_REQUESTS_PER_MINUTE", "20"))
+# Reintentos tras un 429 (esperando lo que indique 'Retry-After')
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+
+# --- Caché de búsquedas web (consulta -> URL) ---
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+# Las búsquedas sin resultado se recuerdan menos tiempo
+SEARCH_NEGATIVE_TTL_SECONDS = int(os.getenv("SEARCH_NEGATIVE_TTL_SECONDS", str(3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+# --- Motor de /tractors/filter ---
+# "snapshot": columnas del catálogo en memoria (NumPy), "sql": consulta a la base de datos
+FILTER_ENGINE = os.getenv("FILTER_ENGINE", "snapshot")
+# Recarga el snapshot aunque no cambie la versión (escrituras desde otros procesos)
+FILTER_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("FILTER_SNAPSHOT_MAX_AGE_SECONDS", "60"))
+# Intervalo mínimo entre recargas: mientras tanto se sirve el snapshot anterior
+FILTER_SNAPSHOT_MIN_RELOAD_SECONDS = float(os.getenv("FILTER_SNAPSHOT_MIN_RELOAD_SECONDS", "2"))
+# Tamaño máximo de página (?limit=)
+FILTER_MAX_PAGE_SIZE = int(os.getenv("FILTER_MAX_PAGE_SIZE", "500"))
+# Filas por lote del cursor del servidor en el modo NDJSON
+FILTER_STREAM_BATCH_SIZE = int(os.getenv("FILTER_STREAM_BATCH_SIZE", "1000"))
+# Bins por defecto de los histogramas de /tractors/facets
+FACET_DEFAULT_BINS = int(os.getenv("FACET_DEFAULT_BINS", "20"))
+
+# --- Búsqueda difusa de /tractors/search ---
+# pg_trgm si está disponible; si no, índice de trigramas en memoria
+# Puntuación mínima (0-1): fracción de los trigramas de la consulta que deben aparecer
+TRACTOR_SEARCH_MIN_SCORE = float(os.getenv("TRACTOR_SEARCH_MIN_SCORE", "0.4"))
+TRACTOR_SEARCH_MAX_RESULTS = int(os.getenv("TRACTOR_SEARCH_MAX_RESULTS", "50"))
+
+# --- Tractores parecidos (/tractors/{id}/similar) ---
+SIMILAR_MAX_K = int(os.getenv("SIMILAR_MAX_K", "50"))
+
+# --- Ranking multicriterio y frontera de Pareto (/tractors/rank) ---
+RANK_MAX_OBJECTIVES = int(os.getenv("RANK_MAX_OBJECTIVES", "8"))
+RANK_MAX_RESULTS = int(os.getenv("RANK_MAX_RESULTS", "200"))
+
+# --- Caché de respuestas de lectura (ETag / 304) ---
+# Una escritura en este proceso invalida al instante; el TTL acota el retraso
+# cuando escribe otro proceso
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "64"))
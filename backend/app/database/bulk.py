@@ -0,0 +1,109 @@
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.database.models import Tractor
+
+# --- Escritura masiva de tractores ---
+# Un INSERT ... ON CONFLICT (model) DO UPDATE por grupo de filas en lugar de
+# query + setattr + commit por variable. Evita además la carrera entre dos
+# extracciones que crean el mismo modelo a la vez (la restricción UNIQUE resuelve).
+
+# Filas por sentencia INSERT multi-VALUES (los parámetros por sentencia tienen límite)
+UPSERT_CHUNK_SIZE = 500
+
+_tractor_table = Tractor.__table__
+
+
+def _merge_rows(rows: list[dict]) -> list[dict]:
+    """
+    Une las filas repetidas del mismo 'model' (gana el último valor de cada columna):
+    Postgres no permite que un mismo INSERT ... ON CONFLICT toque dos veces la misma fila.
+    """
+    merged: dict[str, dict] = {}
+    for row in rows:
+        merged.setdefault(row["model"], {}).update(row)
+    return list(merged.values())
+
+
+def _group_by_columns(rows: list[dict]) -> dict[tuple[str, ...], list[dict]]:
+    """
+    Agrupa las filas por el conjunto de columnas que traen: cada grupo es una
+    sola sentencia y no pisa con NULL las columnas que una fila no trae.
+    """
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups
+
+
+def dialect_insert(db: Session):
+    """
+    'insert' del dialecto de la sesión (con soporte ON CONFLICT).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"El upsert no soporta el dialecto '{dialect}'")
+
+
+def _upsert_statement(insert, columns: tuple[str, ...], chunk: list[dict]):
+    stmt = insert(_tractor_table).values(chunk)
+    set_ = {
+        c: getattr(stmt.excluded, c)
+        for c in columns
+        if c not in ("model", "company")
+    }
+    # 'company' sólo se rellena si estaba vacía (igual que al crear el tractor)
+    if "company" in columns:
+        set_["company"] = func.coalesce(_tractor_table.c.company, stmt.excluded.company)
+
+    if set_:
+        return stmt.on_conflict_do_update(index_elements=["model"], set_=set_)
+    return stmt.on_conflict_do_nothing(index_elements=["model"])
+
+
+def upsert_tractors(db: Session, rows: list[dict]) -> dict[str, int]:
+    """
+    Inserta o actualiza muchos tractores en pocas sentencias (sin hacer commit).
+
+    Args:
+        rows: [{"model": ..., "company": ..., "<columna>": valor, ...}]; 'model' es obligatorio.
+
+    Returns:
+        {"inserted": int, "updated": int, "statements": int}
+    """
+    rows = _merge_rows(rows)
+    counts = {"inserted": 0, "updated": 0, "statements": 0}
+    if not rows:
+        return counts
+
+    insert = dialect_insert(db)
+    dialect = db.get_bind().dialect.name
+
+    for columns, group in _group_by_columns(rows).items():
+        for i in range(0, len(group), UPSERT_CHUNK_SIZE):
+            chunk = group[i:i + UPSERT_CHUNK_SIZE]
+            stmt = _upsert_statement(insert, columns, chunk)
+
+            if dialect == "postgresql":
+                # xmax = 0 sólo en las filas recién insertadas (una fila actualizada tiene xmax propio)
+                inserted_flags = db.execute(stmt.returning(literal_column("(xmax = 0)"))).scalars().all()
+                inserted = sum(1 for flag in inserted_flags if flag)
+                counts["inserted"] += inserted
+                counts["updated"] += len(inserted_flags) - inserted
+            else:
+                # SQLite (desarrollo local): contamos los existentes antes de escribir
+                models = [row["model"] for row in chunk]
+                existing = db.execute(
+                    select(func.count()).where(_tractor_table.c.model.in_(models))
+                ).scalar_one()
+                db.execute(stmt)
+                counts["inserted"] += len(chunk) - existing
+                counts["updated"] += existing
+
+            counts["statements"] += 1
+
+    return counts
@@ -1,18 +1,99 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from app.config import DATABASE_URL
-
-# Crea el "motor" que hablará con la base de datos Postgres
-# 'pool_pre_ping=True' ayuda a manejar conexiones inactivas
-engine = create_engine(
-    DATABASE_URL, 
-    pool_pre_ping=True
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config import (
+    DATABASE_URL, ASYNC_DATABASE_URL, DATABASE_READ_URL, ASYNC_DATABASE_READ_URL,
+    DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW, DB_WRITE_POOL_SIZE, DB_WRITE_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS, DB_STATEMENT_TIMEOUT_MS
 )
+from app.database.pool_metrics import PoolMetrics, instrumented_pool_class
+
+
+def _async_url(url: str):
+    """
+    'postgresql://...' -> 'postgresql+asyncpg://...', 'sqlite:///...' -> 'sqlite+aiosqlite:///...'
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg")
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def _engine_options(url, is_async: bool, pool_size: int, max_overflow: int) -> dict:
+    """
+    Pool y 'statement_timeout' de config.py (SQLite usa su pool por defecto y no tiene timeout por sentencia).
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "postgresql":
+        return {}
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+    }
+    if DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def _is_memory_sqlite(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+# Métricas de cada pool, por nombre (las expone /admin/pools)
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def _create(name: str, url, is_async: bool, pool_size: int, max_overflow: int):
+    """
+    Motor con su propio pool instrumentado ('pool_pre_ping=True' ayuda a manejar conexiones inactivas).
+    """
+    metrics = pool_metrics[name] = PoolMetrics(name)
+    options = _engine_options(url, is_async, pool_size, max_overflow)
+    if not _is_memory_sqlite(url): # SQLite en memoria necesita su pool de una sola conexión
+        options["poolclass"] = instrumented_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, metrics)
+    if is_async:
+        new_engine = create_async_engine(url, pool_pre_ping=True, **options)
+        metrics.attach(new_engine.sync_engine)
+    else:
+        new_engine = create_engine(url, pool_pre_ping=True, **options)
+        metrics.attach(new_engine)
+    return new_engine
+
 
-# Crea una fábrica de sesiones
+# --- Escritura (BD principal) ---
+# Síncrono: lo usan los hilos de fondo (minería, backfill, registro de URLs)
+engine = _create("write", DATABASE_URL, False, DB_WRITE_POOL_SIZE, DB_WRITE_MAX_OVERFLOW)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Asíncrono (asyncpg) para las rutas de extracción: una consulta no bloquea el event loop.
+# 'expire_on_commit=False': los objetos siguen legibles después del commit sin otra consulta
+async_engine = _create(
+    "write_async", ASYNC_DATABASE_URL or _async_url(DATABASE_URL), True, DB_WRITE_POOL_SIZE, DB_WRITE_MAX_OVERFLOW
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# --- Lectura (réplica si DATABASE_READ_URL existe, si no la misma BD con su propio pool) ---
+# Las consultas pesadas del catálogo no compiten con la minería por las mismas conexiones.
+_read_url = DATABASE_READ_URL or DATABASE_URL
+# Síncrono: carga del snapshot de filtros
+read_engine = _create("read", _read_url, False, DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW)
+# Asíncrono: /tractors/filter, /tractors/facets, /generate-pdf
+async_read_engine = _create(
+    "read_async", ASYNC_DATABASE_READ_URL or _async_url(_read_url), True, DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW
+)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Base para todos nuestros modelos (tablas)
 Base = declarative_base()
 
@@ -25,4 +106,21 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """
+    Igual que get_db, con una AsyncSession (para usar con 'await' en las rutas async).
+    Va al motor de escritura: para las rutas que guardan datos.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """
+    AsyncSession del motor de lectura (réplica o pool propio): para las rutas de sólo consulta.
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,124 @@
+from typing import Any
+
+from sqlalchemy import case, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.filters import TRACTOR_FILTERS, FilterSpec, apply_sql
+from app.database.models import Tractor
+
+# --- Facetas de /tractors/facets ---
+# Para el conjunto filtrado actual: mínimo, máximo, nulos e histograma de bins fijos
+# de cada columna numérica, y el recuento de valores de las columnas categóricas.
+# La misma definición de bins la usan el motor SQL (agregados en la BD) y el snapshot
+# (NumPy), así que ambos devuelven exactamente los mismos números.
+
+# Columnas numéricas con filtro de rango (las de los sliders del SelectionModule)
+FACET_NUMERIC_COLUMNS = tuple(dict.fromkeys(
+    column for spec in TRACTOR_FILTERS if spec.kind in ("min", "max") for column in spec.columns
+))
+FACET_CATEGORY_COLUMNS = ("company", "drive_type", "rear_type")
+
+_tractor_table = Tractor.__table__
+
+
+def parse_facet_columns(columns: str | None) -> tuple[str, ...]:
+    """
+    'rated_power_net_kw,pump_flow_lpm' -> columnas pedidas. None = todas.
+    Lanza ValueError si alguna no tiene faceta.
+    """
+    if not columns:
+        return FACET_NUMERIC_COLUMNS
+    requested = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [c for c in requested if c not in FACET_NUMERIC_COLUMNS]
+    if unknown:
+        raise ValueError(f"Columnas sin faceta: {', '.join(unknown)}. Válidas: {', '.join(FACET_NUMERIC_COLUMNS)}")
+    return tuple(dict.fromkeys(requested))
+
+
+def histogram_edges(lo: float, hi: float, bins: int) -> list[float]:
+    """
+    Bordes de 'bins' intervalos iguales entre lo y hi. Si lo == hi, un solo intervalo.
+    El bin k es [edges[k], edges[k+1]); el último incluye el máximo (como np.histogram).
+    """
+    if lo == hi:
+        return [lo, hi]
+    return [lo + (hi - lo) * k / bins for k in range(bins)] + [hi]
+
+
+def numeric_facet(lo, hi, count: int, total: int, counts: list[int] | None, edges: list[float] | None) -> dict:
+    return {
+        "min": lo,
+        "max": hi,
+        "count": count,
+        "nulls": total - count,
+        "histogram": {"edges": edges or [], "counts": counts or []},
+    }
+
+
+def category_facet(counts: dict[str, int]) -> list[dict]:
+    """
+    Valores de más a menos frecuentes (desempate alfabético).
+    """
+    return [{"value": v, "count": n} for v, n in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+
+
+async def sql_facets(db: AsyncSession, filters: list[tuple[FilterSpec, Any]], columns: tuple[str, ...], bins: int) -> dict:
+    """
+    Motor SQL. Los bordes del histograma dependen del mínimo y máximo filtrados,
+    así que son tres sentencias agregadas (ninguna devuelve filas de tractores):
+      1. total + min/max/count de todas las columnas en un solo SELECT,
+      2. histogramas de todas las columnas en un solo SELECT (recuentos acumulados col >= borde),
+      3. recuento de valores de las columnas categóricas (UNION ALL de GROUP BY).
+    """
+    def filtered(*cols):
+        return apply_sql(select(*cols).select_from(Tractor), filters)
+
+    # 1. Estadísticas básicas
+    stats_cols = [func.count().label("total")]
+    for name in columns:
+        column = _tractor_table.c[name]
+        stats_cols += [func.min(column), func.max(column), func.count(column)]
+    stats = (await db.execute(filtered(*stats_cols))).one()
+    total = stats[0]
+
+    bounds = {}
+    for i, name in enumerate(columns):
+        lo, hi, count = stats[1 + 3 * i: 4 + 3 * i]
+        bounds[name] = (lo, hi, count)
+
+    # 2. Histogramas: count(col >= borde_k) para cada borde interior; bin k = acumulado_k - acumulado_k+1
+    hist_cols, hist_layout = [], []
+    for name in columns:
+        lo, hi, count = bounds[name]
+        if not count:
+            continue
+        edges = histogram_edges(float(lo), float(hi), bins)
+        column = _tractor_table.c[name]
+        inner = edges[1:-1]
+        hist_layout.append((name, edges, len(hist_cols), len(inner)))
+        hist_cols += [func.count(case((column >= edge, 1))) for edge in inner]
+    cumulative = (await db.execute(filtered(*hist_cols))).one() if hist_cols else ()
+
+    result = {"total": total, "numeric": {}, "categories": {}}
+    layout = {name: (edges, start, n) for name, edges, start, n in hist_layout}
+    for name in columns:
+        lo, hi, count = bounds[name]
+        if name not in layout:
+            result["numeric"][name] = numeric_facet(None, None, 0, total, None, None)
+            continue
+        edges, start, n = layout[name]
+        ge = [count, *cumulative[start:start + n], 0]
+        counts = [ge[k] - ge[k + 1] for k in range(len(edges) - 1)]
+        result["numeric"][name] = numeric_facet(lo, hi, count, total, counts, edges)
+
+    # 3. Valores categóricos
+    parts = []
+    for name in FACET_CATEGORY_COLUMNS:
+        column = _tractor_table.c[name]
+        part = filtered(literal(name).label("facet"), column.label("value"), func.count().label("n"))
+        parts.append(part.filter(column.isnot(None)).group_by(column))
+    categories = {name: {} for name in FACET_CATEGORY_COLUMNS}
+    for facet, value, n in await db.execute(union_all(*parts)):
+        categories[facet][value] = n
+    result["categories"] = {name: category_facet(counts) for name, counts in categories.items()}
+    return result
@@ -0,0 +1,122 @@
+from typing import Any, NamedTuple
+
+from sqlalchemy import func
+
+from app.database.models import Tractor
+
+# --- Especificación declarativa de los filtros de /tractors/filter ---
+# Cada parámetro de la ruta se describe una sola vez: qué columna(s) mira y cómo.
+# La usan los dos motores de filtrado: SQL (apply_sql) y el snapshot en memoria
+# (services/tractor_snapshot.py), así que ambos devuelven los mismos tractores.
+# El orden coincide en las columnas numéricas, no siempre en las de texto: el snapshot
+# ordena por código Unicode y la BD según su collation ('deere' < 'Fendt' en PostgreSQL
+# con es_ES/en_US, al revés en el snapshot y en SQLite). Un cursor de un motor no sirve
+# para pedir la página siguiente al otro si se ordena por texto.
+
+
+class FilterSpec(NamedTuple):
+    param: str # Nombre del parámetro de la ruta
+    kind: str # "contains" | "equals" | "bool" | "min" | "max"
+    columns: tuple[str, ...] # Varias columnas = la primera no nula (coalesce)
+
+
+def _range(param_min: str, param_max: str, *columns: str) -> list[FilterSpec]:
+    return [FilterSpec(param_min, "min", columns), FilterSpec(param_max, "max", columns)]
+
+
+TRACTOR_FILTERS: list[FilterSpec] = [
+    # --- Filtros de Texto ---
+    FilterSpec("company", "contains", ("company",)),
+    FilterSpec("model", "contains", ("model",)),
+    FilterSpec("drive_type", "equals", ("drive_type",)),
+    FilterSpec("rear_type", "equals", ("rear_type",)),
+
+    # --- Filtros Booleanos ---
+    FilterSpec("enganche_delantero", "bool", ("enganche_delantero",)),
+    FilterSpec("differential_lock", "bool", ("differential_lock",)),
+    FilterSpec("has_precision_agriculture", "bool", ("has_precision_agriculture",)),
+
+    # --- Filtros de Rango (Motor) ---
+    *_range("cylinders_min", "cylinders_max", "numero_de_cilindros_num"),
+    *_range("disp_min_l", "disp_max_l", "displacement_l"),
+    *_range("comp_min", "comp_max", "compression_ratio_num"),
+    *_range("oil_cap_min_l", "oil_cap_max_l", "oil_capacity_l"),
+    *_range("starter_min_v", "starter_max_v", "starter_volts_v"),
+    *_range("power_net_min_kw", "power_net_max_kw", "rated_power_net_kw"),
+    *_range("power_gross_min_kw", "power_gross_max_kw", "max_power_gross_kw"),
+    *_range("rated_rpm_min", "rated_rpm_max", "rated_rpm_num"),
+    *_range("torque_min_nm", "torque_max_nm", "torque_nm"),
+    *_range("torque_rpm_min", "torque_rpm_max", "torque_rpm_num"),
+
+    # --- Filtros de Rango (Transmisión) ---
+    *_range("gears_fwd_min", "gears_fwd_max", "cambios_adelante"),
+    *_range("gears_rev_min", "gears_rev_max", "cambios_atras"),
+
+    # --- Filtros de Rango (Hidráulica) ---
+    *_range("pump_flow_min_lpm", "pump_flow_max_lpm", "pump_flow_lpm"),
+    *_range("pressure_min_bar", "pressure_max_bar", "pressure_bar"),
+    *_range("scv_flow_min_lpm", "scv_flow_max_lpm", "rear_scv_flow_lpm"),
+    *_range("rear_valves_min", "rear_valves_max", "rear_valves"),
+    *_range("front_valves_min", "front_valves_max", "front_valves"),
+    *_range("capacity_min_l", "capacity_max_l", "capacity_l"),
+
+    # --- Filtros de Rango (PTO) ---
+    *_range("pto_rpm_min", "pto_rpm_max", "engine_rpm_at_pto_num"),
+
+    # --- Filtros de Rango (Dimensiones y Peso) ---
+    *_range("length_min_m", "length_max_m", "length_m"),
+    *_range("width_min_m", "width_max_m", "width_m"),
+    # Altura de referencia: con ROPS si existe, si no la altura normal
+    *_range("height_min_m", "height_max_m", "height_rops_m", "height_m"),
+    *_range("wheelbase_min_m", "wheelbase_max_m", "wheelbase_m"),
+    *_range("clearance_min_m", "clearance_max_m", "ground_clearance_m"),
+    *_range("weight_ship_min_kg", "weight_ship_max_kg", "shipping_weight_kg"),
+    *_range("weight_ballast_min_kg", "weight_ballast_max_kg", "ballasted_weight_kg"),
+
+    # --- Filtros de Rango (Eléctrico) ---
+    *_range("batt_volts_min_v", "batt_volts_max_v", "battery_volts_v"),
+    *_range("batt_ah_min", "batt_ah_max", "battery_AH_num"),
+
+    # --- Filtros de Rango (Enganche) ---
+    *_range("lift_cap_min_kg", "lift_cap_max_kg", "rear_lift_capacity_kg"),
+
+    # --- Filtros de Rango (Combustible) ---
+    *_range("fuel_cap_min_l", "fuel_cap_max_l", "fuel_tank_capacity_l"),
+]
+
+
+def active_filters(params: dict[str, Any]) -> list[tuple[FilterSpec, Any]]:
+    """
+    Filtros que aplican a una petición, con su valor.
+    Igual que la ruta original: los booleanos cuentan si no son None;
+    el resto sólo si tienen valor (un mínimo de 0 o un texto vacío se ignoran).
+    """
+    active = []
+    for spec in TRACTOR_FILTERS:
+        value = params.get(spec.param)
+        if (value is not None) if spec.kind == "bool" else bool(value):
+            active.append((spec, value))
+    return active
+
+
+def _sql_column(columns: tuple[str, ...]):
+    if len(columns) == 1:
+        return getattr(Tractor, columns[0])
+    return func.coalesce(*[getattr(Tractor, c) for c in columns])
+
+
+def apply_sql(query, filters: list[tuple[FilterSpec, Any]]):
+    """
+    Motor SQL: añade un WHERE por filtro activo a una query de 'Tractor'.
+    """
+    for spec, value in filters:
+        column = _sql_column(spec.columns)
+        if spec.kind == "contains":
+            query = query.filter(column.ilike(f"%{value}%"))
+        elif spec.kind in ("equals", "bool"):
+            query = query.filter(column == value)
+        elif spec.kind == "min":
+            query = query.filter(column >= value)
+        elif spec.kind == "max":
+            query = query.filter(column <= value)
+    return query
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, Index
+from sqlalchemy import Column, Integer, String, Boolean, Float, Index, DateTime, func
 from app.database.connection import Base
 
 class Tractor(Base):
@@ -12,6 +12,7 @@ class Tractor(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # --- Identificación Principal ---
+    # En Postgres también tienen índices GIN de trigramas (database/search.py) para ILIKE y /tractors/search
     model = Column(String, unique=True, index=True, nullable=False)
     company = Column(String, index=True)
 
@@ -149,4 +150,22 @@ class Tractor(Base):
     fuel_tank_capacity_l = Column(Float, index=True, nullable=True) # FILTRO (Litros)
 
     # --- Mecatronica ---
-    has_precision_agriculture = Column(Boolean)
\ No newline at end of file
+    has_precision_agriculture = Column(Boolean)
+
+
+class SourceURL(Base):
+    """
+    Base de conocimiento de fichas técnicas: tractor -> URL fiable.
+    Reemplaza el diccionario KNOWN_TRACTOR_URLS del buscador y crece sola
+    con cada URL que acepta la búsqueda web.
+    """
+    __tablename__ = "source_urls"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Tokens normalizados del modelo (ej: "new holland t7 190"), la clave de búsqueda
+    key = Column(String, unique=True, index=True, nullable=False)
+    name = Column(String) # Texto original (ej: "New Holland T7.190")
+    url = Column(String, nullable=False)
+    origin = Column(String) # "seed" | "web" | "manual"
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
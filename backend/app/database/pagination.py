@@ -0,0 +1,88 @@
+import base64
+import json
+from typing import Any, NamedTuple
+
+from sqlalchemy import and_, or_
+
+from app.database.models import Tractor
+
+# --- Paginación por cursor (keyset) y orden de /tractors/filter ---
+# El orden es siempre: NULLs al final, la columna pedida (asc o desc) y 'id' como desempate.
+# El cursor guarda (valor de la columna, id) de la última fila entregada: la página
+# siguiente empieza justo después, sin OFFSET (el coste no crece con el número de página).
+
+_tractor_table = Tractor.__table__
+
+# Sólo columnas con índice en la tabla (el ORDER BY + keyset los aprovecha)
+SORTABLE_COLUMNS = {
+    column.name for column in _tractor_table.columns
+    if column.index or column.unique or column.primary_key
+}
+
+
+class SortSpec(NamedTuple):
+    column: str
+    descending: bool = False
+
+    def __str__(self) -> str:
+        return f"-{self.column}" if self.descending else self.column
+
+
+class PageCursor(NamedTuple):
+    sort: str # Orden con el que se generó (ej: '-rated_power_net_kw')
+    value: Any # Valor de la columna en la última fila (None = NULL)
+    id: int # Id de la última fila
+
+
+def parse_sort(sort: str | None) -> SortSpec:
+    """
+    'rated_power_net_kw' (ascendente) o '-rated_power_net_kw' (descendente). Por defecto, 'id'.
+    Lanza ValueError si la columna no se puede ordenar.
+    """
+    if not sort:
+        return SortSpec("id")
+    descending = sort.startswith("-")
+    column = sort.lstrip("+-").strip()
+    if column not in SORTABLE_COLUMNS:
+        raise ValueError(f"No se puede ordenar por '{column}'. Columnas válidas: {', '.join(sorted(SORTABLE_COLUMNS))}")
+    return SortSpec(column, descending)
+
+
+def encode_cursor(sort: SortSpec, row: dict) -> str:
+    payload = json.dumps([str(sort), row[sort.column], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: SortSpec) -> PageCursor:
+    """
+    Lanza ValueError si el cursor está mal formado o se generó con otro orden.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_str, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        decoded = PageCursor(sort_str, value, int(last_id))
+    except Exception:
+        raise ValueError("Cursor inválido.")
+    if decoded.sort != str(sort):
+        raise ValueError(f"El cursor se generó con sort='{decoded.sort}', no con sort='{sort}'.")
+    return decoded
+
+
+def apply_sql_page(query, sort: SortSpec, cursor: PageCursor | None, limit: int | None):
+    """
+    Motor SQL: ORDER BY + condición keyset + LIMIT (pide una fila de más para saber si hay otra página).
+    """
+    column = getattr(Tractor, sort.column)
+    if cursor is not None:
+        if cursor.value is None:
+            # Ya estamos en la cola de NULLs: sólo quedan NULLs con id mayor
+            query = query.filter(and_(column.is_(None), Tractor.id > cursor.id))
+        else:
+            beyond = column < cursor.value if sort.descending else column > cursor.value
+            query = query.filter(or_(beyond, and_(column == cursor.value, Tractor.id > cursor.id), column.is_(None)))
+
+    ordered = column.desc() if sort.descending else column.asc()
+    query = query.order_by(ordered.nulls_last(), Tractor.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
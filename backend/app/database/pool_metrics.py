@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+
+# --- Instrumentación de los pools de conexiones ---
+# Cada motor (lectura / escritura, síncrono / async) tiene su PoolMetrics:
+#  - latencia de checkout: lo que tarda el pool en entregar una conexión (incluye la espera
+#    cuando están todas ocupadas, que es justo lo que queremos ver),
+#  - cola de espera: peticiones que están ahora mismo pidiendo conexión (y el máximo visto),
+#  - rotación: conexiones DBAPI abiertas, cerradas e invalidadas, timeouts del pool y fallos al conectar.
+# La espera se mide envolviendo Pool._do_get (SQLAlchemy no tiene un evento "antes del checkout");
+# el resto son eventos del pool. _do_get es privado: si una versión de SQLAlchemy lo quita,
+# el pool se crea sin envolver y sólo quedan los contadores de eventos.
+
+
+class PoolMetrics:
+    """
+    Contadores de un pool. Seguro entre hilos (el pool síncrono se usa desde el threadpool).
+    """
+
+    def __init__(self, name: str, samples: int = 1000):
+        self.name = name
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=samples) # Últimos checkouts, para los percentiles
+        self._engine = None
+        self.checkout_timing = True # False si no se pudo envolver Pool._do_get
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.timeouts = 0
+        self.connect_errors = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+
+    def start_wait(self):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def end_wait(self, seconds: float, error: BaseException | None = None):
+        with self._lock:
+            self.waiting -= 1
+            if error is None:
+                self.checkouts += 1
+                self.checkout_seconds += seconds
+                self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+                self._latencies.append(seconds)
+            elif isinstance(error, exc.TimeoutError):
+                self.timeouts += 1
+            else:
+                self.connect_errors += 1
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def attach(self, engine):
+        """
+        Escucha los eventos del pool del motor (síncrono: para un AsyncEngine, su .sync_engine).
+        Los eventos registrados en el motor sobreviven a engine.dispose().
+        """
+        self._engine = engine
+        event.listen(engine, "connect", lambda *args: self._count("connects"))
+        event.listen(engine, "close", lambda *args: self._count("closes"))
+        event.listen(engine, "close_detached", lambda *args: self._count("closes"))
+        event.listen(engine, "invalidate", lambda *args: self._count("invalidations"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        pool = self._engine.pool if self._engine is not None else None
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+
+        return {
+            "name": self.name,
+            "pool": type(pool).__name__ if pool is not None else None,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "checkout_timing": self.checkout_timing,
+            "checkouts": self.checkouts,
+            "checkout_ms_avg": round(self.checkout_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "checkout_ms_p50": percentile(0.50),
+            "checkout_ms_p95": percentile(0.95),
+            "checkout_ms_max": round(self.max_checkout_seconds * 1000, 3),
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "timeouts": self.timeouts,
+            "connect_errors": self.connect_errors,
+            "connects": self.connects,
+            "closes": self.closes,
+            "invalidations": self.invalidations,
+        }
+
+
+class _InstrumentedPool:
+    """
+    Mixin para un QueuePool: cronometra cada petición de conexión al pool.
+    'metrics' lo fija instrumented_pool_class (se conserva cuando el pool se recrea).
+    """
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        self.metrics.start_wait()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except BaseException as e:
+            self.metrics.end_wait(time.perf_counter() - start, e)
+            raise
+        self.metrics.end_wait(time.perf_counter() - start)
+        return connection
+
+
+def instrumented_pool_class(base: type, metrics: PoolMetrics) -> type:
+    """
+    Subclase de 'base' (QueuePool / AsyncAdaptedQueuePool) que reporta a 'metrics'.
+    Se pasa a create_engine(poolclass=...). Sin Pool._do_get devuelve 'base' tal cual.
+    """
+    if not callable(getattr(base, "_do_get", None)):
+        print(f"⚠️ Pool '{metrics.name}': {base.__name__} no tiene _do_get; sin métricas de checkout.")
+        metrics.checkout_timing = False
+        return base
+    return type(f"Instrumented{base.__name__}", (_InstrumentedPool, base), {"metrics": metrics})
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 # --- Esquemas para Extracción ---
 
@@ -19,6 +19,57 @@ class ExtractionResponse(BaseModel):
     status: str
     variable_name: str
     value: Optional[str]
+    source: Optional[str] = None # "adapter" (tabla estructurada) o "llm"
+
+class BatchExtractionRequest(BaseModel):
+    """
+    Lo que la API /extract/batch espera recibir en el body.
+    Un único scrapeo y una única escritura para todas las variables.
+    """
+    tractor_model: str
+    company: Optional[str] = None
+    variable_names: List[str]
+    source_url: str
+
+class BatchExtractionResponse(BaseModel):
+    """
+    Lo que la API /extract/batch devuelve.
+    """
+    status: str
+    tractor_model: str
+    extracted_count: int
+    results: List[ExtractionResponse]
+
+
+# --- Esquemas para Trabajos de Minería ---
+
+class MiningTractor(BaseModel):
+    """
+    Un tractor a minar. Si no se da 'url', el trabajo la busca.
+    """
+    company: Optional[str] = None
+    model: str
+    url: Optional[str] = None
+
+class MiningJobRequest(BaseModel):
+    """
+    Lo que la API /jobs/mining espera recibir en el body.
+    """
+    tractors: List[MiningTractor]
+    variable_names: List[str]
+
+class MiningJobStatus(BaseModel):
+    """
+    Resumen del estado de un trabajo de minería.
+    """
+    job_id: str
+    status: str
+    total: int
+    done: int
+    failed: int
+    extracted: int
+    created_at: float
+    updated_at: float
 
 
 # --- Esquema de Tractor Completo ---
@@ -142,6 +193,26 @@ class TractorPublic(BaseModel):
         # directamente desde el objeto SQLAlchemy (TractorDB).
         from_attributes = True
 
+# --- Proyección de campos (?fields=) ---
+
+TRACTOR_FIELDS = tuple(TractorPublic.model_fields)
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """
+    'company,model,rated_power_net_kw' -> ('id', 'company', 'model', 'rated_power_net_kw').
+    'id' siempre se incluye. None = todos los campos.
+    Lanza ValueError si algún campo no existe.
+    """
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in TractorPublic.model_fields]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}")
+    # Orden del schema completo, sin repetidos
+    return tuple(f for f in TRACTOR_FIELDS if f == "id" or f in requested)
+
     # ... (al final de tu archivo, después de TractorPublic) ...
 
 # --- Esquemas para Cálculo (Tarea 11) ---
@@ -163,4 +234,14 @@ class CalculationResponse(BaseModel):
     consumo_estimado_l_h: float
     capacidad_trabajo_ha_h: float
     tractor_model: str # Para confirmar el modelo usado
-    tractor_power_kw: float # Para confirmar la potencia usada
\ No newline at end of file
+    tractor_power_kw: float # Para confirmar la potencia usada
+
+
+# --- Esquemas de la Base de Conocimiento de URLs ---
+
+class SourceURLRequest(BaseModel):
+    """
+    Registro manual de la ficha técnica de un tractor (ej: desde el panel de administración).
+    """
+    name: str # Ej: "John Deere 5075E"
+    url: str
@@ -0,0 +1,72 @@
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import Tractor
+
+# --- Búsqueda difusa por nombre (marca + modelo) con pg_trgm ---
+# ILIKE '%texto%' no puede usar los índices B-tree: recorre la tabla entera.
+# Con la extensión pg_trgm, un índice GIN de trigramas sirve tanto para ILIKE (el filtro
+# 'company' / 'model' de /tractors/filter lo aprovecha sin cambiar la consulta) como para
+# la similitud de /tractors/search, que tolera erratas ("T7 190" ~ "T7.190").
+# Sin pg_trgm (SQLite, o sin permisos para crear la extensión) la búsqueda usa el índice
+# de n-gramas en memoria (services/trigram_index.py).
+
+# Texto de búsqueda: debe ser EXACTAMENTE la expresión del índice para que el planificador lo use
+SEARCH_TEXT_SQL = "(coalesce(company, '') || ' ' || model)"
+
+TRIGRAM_INDEXES = {
+    "ix_tractors_model_trgm": "model",
+    "ix_tractors_company_trgm": "company",
+    "ix_tractors_search_trgm": SEARCH_TEXT_SQL,
+}
+
+_search_text = literal_column(SEARCH_TEXT_SQL)
+_pg_trgm = False
+
+
+def ensure_trigram_indexes(bind) -> bool:
+    """
+    Crea la extensión pg_trgm y los índices GIN si faltan (create_all no añade índices
+    a una tabla que ya existe). Se llama al arrancar, después de create_all.
+
+    Returns:
+        True si la búsqueda puede usar pg_trgm.
+    """
+    global _pg_trgm
+    if bind.dialect.name != "postgresql":
+        return False
+    try:
+        with bind.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for name, expression in TRIGRAM_INDEXES.items():
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON tractors USING gin ({expression} gin_trgm_ops)"))
+    except Exception as e:
+        print(f"⚠️ pg_trgm no disponible ({e}). La búsqueda usará el índice de n-gramas en memoria.")
+        return False
+    _pg_trgm = True
+    print("✅ Índices de trigramas (pg_trgm) listos.")
+    return True
+
+
+def pg_trgm_enabled() -> bool:
+    return _pg_trgm
+
+
+async def sql_search(db: AsyncSession, query: str, limit: int, min_score: float) -> list[dict]:
+    """
+    Motor pg_trgm: 'texto %> consulta' usa el índice GIN; el umbral se fija sólo
+    para esta transacción. Puntuación = word_similarity (1.0 = la consulta aparece entera).
+    """
+    await db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(min_score), True)))
+    score = func.word_similarity(query, _search_text).label("score")
+    stmt = (
+        select(Tractor.id, Tractor.company, Tractor.model, score)
+        .where(_search_text.op("%>")(query))
+        .order_by(score.desc(), func.length(Tractor.model), Tractor.model)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [
+        {"id": row.id, "company": row.company, "model": row.model, "score": round(float(row.score), 4)}
+        for row in result
+    ]
@@ -0,0 +1,41 @@
+import threading
+import uuid
+
+# --- Versión del catálogo de tractores ---
+# Contador que suben todas las rutas de escritura de la tabla 'tractors'
+# (extracción, minería, backfill). Las cachés en memoria (snapshot de filtros...)
+# comparan su versión con esta para saber si deben recargarse.
+# El 'nonce' de arranque hace que la versión cambie también al reiniciar el proceso.
+
+
+class CatalogVersion:
+    """
+    Contador de versión del catálogo, seguro entre hilos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.nonce = uuid.uuid4().hex[:8]
+
+    def bump(self) -> str:
+        """
+        Marca el catálogo como modificado. Devuelve la nueva versión.
+        """
+        with self._lock:
+            self._counter += 1
+            return f"{self.nonce}-{self._counter}"
+
+    @property
+    def counter(self) -> int:
+        return self._counter
+
+    def current(self) -> str:
+        """
+        Versión actual (ej: '3f9a1c2e-17').
+        """
+        return f"{self.nonce}-{self._counter}"
+
+
+# Instancia única de la versión
+catalog_version = CatalogVersion()
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database.connection import engine, Base
+from app.database.search import ensure_trigram_indexes
 from contextlib import asynccontextmanager
 from sqlalchemy.exc import OperationalError
 import time
@@ -8,8 +9,12 @@ import time
 # Importamos los modelos para asegurar que SQLAlchemy los "vea" antes de crear tablas
 from app.database import models 
 
+from app.services.http_client import init_http_client, close_http_client
+from app.services.mining_jobs import mining_jobs
+from app.services.url_registry import url_registry
+
 # Importa tus rutas
-from app.api.routes import extraction, pdf, tractors, search, chat
+from app.api.routes import extraction, pdf, tractors, search, chat, admin, jobs
 
 def create_tables():
     """
@@ -22,6 +27,7 @@ def create_tables():
             print(f"Intentando crear tablas en la base de datos (intento {retries + 1}/{max_retries})...")
             Base.metadata.create_all(bind=engine)
             print("✅ Tablas de la base de datos creadas (si no existían).")
+            ensure_trigram_indexes(engine)
             return
         except OperationalError as e:
             print(f"La base de datos no está lista (Error: {e}). Reintentando en 3 segundos...")
@@ -39,8 +45,12 @@ def create_tables():
 async def lifespan(app: FastAPI):
     print("Iniciando aplicación...")
     create_tables()
+    url_registry.load()
+    await init_http_client()
     yield
     print("Apagando aplicación...")
+    await mining_jobs.shutdown()
+    await close_http_client()
 
 # --- Inicialización de la App ---
 app = FastAPI(
@@ -58,6 +68,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], 
     allow_headers=["*"], 
+    # El frontend necesita leer el cursor de la página siguiente y el ETag
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # --- Rutas de la API ---
@@ -67,6 +79,8 @@ app.include_router(pdf.router, prefix="/api/v1", tags=["PDF"])
 app.include_router(tractors.router, prefix="/api/v1", tags=["Tractores"])
 app.include_router(search.router, prefix="/api/v1", tags=["Search"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat Conversacional"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["Trabajos de Minería"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["Administración"])
 print("✅ Todos los routers incluidos.")
 
 @app.get("/", tags=["Root"])
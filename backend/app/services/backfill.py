@@ -0,0 +1,191 @@
+"""
+Backfill vectorizado de las columnas numéricas canónicas (*_kw, *_m, *_kg, *_l...).
+
+Recalcula cada columna numérica a partir de su columna String con las mismas
+reglas que usa la extracción (converter.VARIABLES), por columnas completas
+con pandas/NumPy, y escribe sólo lo que cambió.
+
+Uso (desde backend/):
+    python -m app.services.backfill                 # aplica los cambios
+    python -m app.services.backfill --dry-run       # sólo cuenta
+    python -m app.services.backfill --variables rated_power_net torque
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, select, update
+
+from app.database.connection import engine
+from app.database.models import Tractor
+from app.database.versioning import catalog_version
+from app.services.converter import VARIABLES, Canonical, parse_canonical
+
+BACKFILL_CHUNK_SIZE = 10_000
+
+_tractor_table = Tractor.__table__
+
+
+def _active_rules(variables: list[str] | None = None) -> dict[str, Canonical]:
+    """
+    Variables del registro cuya columna String y numérica existen en la tabla.
+    """
+    return {
+        name: spec
+        for name, spec in VARIABLES.items()
+        if (variables is None or name in variables)
+        and name in _tractor_table.c and spec.column in _tractor_table.c
+    }
+
+
+def convert_column(values: pd.Series, variable_name: str) -> pd.Series:
+    """
+    Aplica la conversión de una variable a una columna String completa.
+    Devuelve float64 con NaN donde no hay número o unidad reconocida.
+
+    En un catálogo los Strings se repiten mucho ("12", "2400 rpm"...):
+    se convierten sólo los valores distintos con el tokenizador compilado
+    y el resultado se reparte a todas las filas con sus códigos.
+    """
+    codes, uniques = pd.factorize(values)
+    if not len(uniques):
+        return pd.Series(np.nan, index=values.index, dtype="float64")
+
+    unique_result = np.fromiter(
+        (np.nan if (v := parse_canonical(variable_name, u)) is None else v for u in uniques),
+        dtype="float64", count=len(uniques)
+    )
+    if VARIABLES[variable_name].integer:
+        unique_result = np.round(unique_result)
+    result = np.where(codes >= 0, unique_result[np.maximum(codes, 0)], np.nan)
+    return pd.Series(result, index=values.index)
+
+
+def _changed(old: np.ndarray, new: np.ndarray, clear_unparsed: bool) -> np.ndarray:
+    old_nan = np.isnan(old)
+    new_nan = np.isnan(new)
+    differs = ~old_nan & ~new_nan & ~np.isclose(old, new, rtol=1e-9, atol=1e-9)
+    changed = differs | (old_nan & ~new_nan)
+    if clear_unparsed:
+        changed |= ~old_nan & new_nan
+    return changed
+
+
+def _write_rows(conn, columns: list[Canonical], ids: np.ndarray, values: np.ndarray):
+    """
+    UPDATE por lotes (executemany) de varias columnas numéricas para los ids dados.
+    'values' es una matriz (filas x columnas) alineada con 'ids'.
+    """
+    params = []
+    for row_id, row in zip(ids, values):
+        param = {"_id": int(row_id)}
+        for rule, v in zip(columns, row):
+            param[rule.column] = None if np.isnan(v) else (int(v) if rule.integer else float(v))
+        params.append(param)
+
+    stmt = (
+        update(_tractor_table)
+        .where(_tractor_table.c.id == bindparam("_id"))
+        .values({rule.column: bindparam(rule.column) for rule in columns})
+    )
+    conn.execute(stmt, params)
+
+
+def run_backfill(
+    variables: list[str] | None = None,
+    chunk_size: int = BACKFILL_CHUNK_SIZE,
+    dry_run: bool = False,
+    clear_unparsed: bool = False,
+) -> dict:
+    """
+    Recorre la tabla 'tractors' en bloques y recalcula las columnas numéricas.
+
+    Args:
+        variables: sólo estas variables String (por defecto, todas las que tienen regla).
+        dry_run: cuenta los cambios sin escribir nada.
+        clear_unparsed: pone a NULL los numéricos cuyo String ya no se puede convertir
+            (por defecto se conservan).
+
+    Returns:
+        {"rows_scanned", "rows_touched", "values_updated": {columna: n}, "elapsed_seconds", "dry_run"}
+    """
+    start = time.perf_counter()
+    rules = _active_rules(variables)
+    columns = ["id"] + sorted({c for name, rule in rules.items() for c in (name, rule.column)})
+    query = select(*[_tractor_table.c[c] for c in columns]).order_by(_tractor_table.c.id)
+
+    rows_scanned = 0
+    rows_touched = 0
+    values_updated = {rule.column: 0 for rule in rules.values()}
+
+    # Recorrido por keyset (id > último id visto): cada bloque es una consulta corta
+    # y sus cambios se confirman en su propia transacción
+    last_id = 0
+    wrote = False
+    while True:
+        with engine.begin() as conn:
+            chunk = pd.read_sql(query.where(_tractor_table.c.id > last_id).limit(chunk_size), conn)
+            if chunk.empty:
+                break
+            rows_scanned += len(chunk)
+            ids = chunk["id"].to_numpy()
+            last_id = int(ids[-1])
+            rule_list = list(rules.values())
+            changed = np.zeros((len(chunk), len(rule_list)), dtype=bool)
+            final_values = np.full((len(chunk), len(rule_list)), np.nan)
+
+            for j, (name, rule) in enumerate(rules.items()):
+                old = pd.to_numeric(chunk[rule.column], errors="coerce").to_numpy(dtype="float64")
+                converted = convert_column(chunk[name].astype("string"), name).to_numpy()
+                changed[:, j] = _changed(old, converted, clear_unparsed)
+                # Valor final de la celda: el nuevo si cambió, si no el que ya estaba
+                final_values[:, j] = np.where(changed[:, j], converted, old)
+                values_updated[rule.column] += int(changed[:, j].sum())
+
+            touched = changed.any(axis=1)
+            if not dry_run and touched.any():
+                # Un solo executemany por bloque: cada fila modificada se actualiza una vez
+                # con todas las columnas que cambiaron en algún punto del bloque
+                cols = np.flatnonzero(changed.any(axis=0))
+                _write_rows(conn, [rule_list[c] for c in cols], ids[touched], final_values[touched][:, cols])
+                wrote = True
+
+            rows_touched += int(touched.sum())
+
+    if wrote:
+        catalog_version.bump()
+
+    elapsed = time.perf_counter() - start
+    print(f"Backfill: {rows_scanned} filas revisadas, {rows_touched} modificadas en {elapsed:.2f}s"
+          f"{' (dry-run)' if dry_run else ''}.")
+    return {
+        "rows_scanned": rows_scanned,
+        "rows_touched": rows_touched,
+        "values_updated": {c: n for c, n in values_updated.items() if n},
+        "elapsed_seconds": round(elapsed, 3),
+        "dry_run": dry_run,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variables", nargs="*", help="Variables String a recalcular (por defecto, todas)")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Cuenta los cambios sin escribir")
+    parser.add_argument("--clear-unparsed", action="store_true",
+                        help="Pone a NULL los numéricos cuyo String ya no se puede convertir")
+    args = parser.parse_args()
+
+    report = run_backfill(
+        variables=args.variables,
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run,
+        clear_unparsed=args.clear_unparsed,
+    )
+    for column, n in sorted(report["values_updated"].items()):
+        print(f"  {column:<28} {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+from app.config import CONTEXT_WINDOW_WORDS, CONTEXT_TOP_K, CONTEXT_MIN_CHARS
+
+# --- Selector de Contexto ---
+# En lugar de mandar la página completa al LLM, la partimos en ventanas solapadas,
+# las indexamos con BM25 y sólo enviamos las más relevantes para cada variable.
+
+# Aproximación estándar para modelos tipo Llama: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+
+# BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Bonus cuando la ventana contiene la frase completa de un sinónimo
+PHRASE_BONUS = 2.0
+# Bonus cuando la ventana contiene un número seguido de una unidad esperada
+UNIT_BONUS = 1.5
+
+# Sinónimos y etiquetas típicas (tractordata.com, fichas de fabricantes) por variable
+SYNONYMS = {
+    "marca_motor": ["engine", "diesel", "engine manufacturer"],
+    "numero_de_cilindros": ["cylinders", "cyl", "cylinder"],
+    "displacement": ["displacement", "engine displacement", "cc", "liter"],
+    "compression_ratio": ["compression", "compression ratio"],
+    "emission_control": ["emissions", "tier", "stage", "def", "dpf", "scr"],
+    "oil_capacity": ["oil capacity", "engine oil", "crankcase"],
+    "starter_volts": ["starter", "starter volts"],
+    "max_power_gross": ["max power", "gross power", "engine gross", "maximum power"],
+    "rated_rpm": ["rated rpm", "rated engine speed"],
+    "torque": ["torque", "max torque", "peak torque"],
+    "torque_rpm": ["torque rpm", "torque @"],
+    "rated_power_net": ["net power", "rated power", "engine net", "pto hp", "pto power", "drawbar"],
+    "clutch": ["clutch"],
+    "gears": ["gears", "transmission", "forward reverse", "powershift", "cvt"],
+    "cambios_adelante": ["forward gears", "forward"],
+    "cambios_atras": ["reverse gears", "reverse"],
+    "pump_flow": ["pump flow", "hydraulic flow", "total flow", "pump"],
+    "pressure": ["pressure", "relief pressure", "hydraulic pressure"],
+    "enganche_delantero": ["front hitch", "front 3-point"],
+    "rear_scv_flow": ["scv flow", "valve flow", "remote flow"],
+    "rear_valves": ["rear valves", "remote valves", "scv", "remotes"],
+    "front_valves": ["front valves", "front remotes"],
+    "capacity": ["hydraulic capacity", "hydraulic system capacity"],
+    "front_pto_type": ["front pto"],
+    "engine_rpm_at_pto": ["engine rpm pto", "pto rpm", "pto engine speed"],
+    "detalles_velocidades_pto": ["rear pto", "pto speeds", "pto"],
+    "length": ["length", "overall length"],
+    "width": ["width", "overall width"],
+    "height": ["height", "overall height", "height cab"],
+    "height_rops": ["height rops", "rops height"],
+    "wheelbase": ["wheelbase"],
+    "ground_clearance": ["ground clearance", "clearance"],
+    "shipping_weight": ["shipping weight", "operating weight", "weight"],
+    "ballasted_weight": ["ballasted weight", "ballasted"],
+    "max_weight": ["max weight", "maximum weight", "gross vehicle weight"],
+    "axle_clearance_front": ["front axle clearance"],
+    "axle_clearance_rear": ["rear axle clearance"],
+    "rear_tread": ["rear tread"],
+    "front_tread": ["front tread"],
+    "tire_front": ["front tire", "front tires", "ag front"],
+    "tire_rear": ["rear tire", "rear tires", "ag rear"],
+    "peso_delantero": ["front weight", "front axle weight"],
+    "peso_trasero": ["rear weight", "rear axle weight"],
+    "differential_lock": ["differential lock", "diff lock"],
+    "drive_type": ["4wd", "2wd", "mfwd", "chassis", "drive"],
+    "final_drives": ["final drives", "final drive"],
+    "battery_volts": ["battery volts", "battery"],
+    "battery_group": ["battery group"],
+    "battery_AH": ["battery ah", "amp hours", "cca"],
+    "rear_type": ["rear hitch", "3-point", "category", "hitch"],
+    "rear_lift_capacity": ["rear lift", "lift capacity", "lift"],
+    "fuel_tank_capacity": ["fuel tank", "fuel capacity", "fuel"],
+    "has_precision_agriculture": ["gps", "autotrac", "guidance", "precision"],
+}
+
+# Unidades esperadas por variable (para el bonus de "número + unidad")
+UNIT_HINTS = {
+    "displacement": ["l", "cc", "ci", "cu in"],
+    "oil_capacity": ["l", "qts", "gal"],
+    "starter_volts": ["v"],
+    "max_power_gross": ["hp", "kw"],
+    "rated_power_net": ["hp", "kw"],
+    "rated_rpm": ["rpm"],
+    "torque": ["nm", "lb-ft", "lbs-ft"],
+    "torque_rpm": ["rpm"],
+    "pump_flow": ["gpm", "lpm", "l/min"],
+    "rear_scv_flow": ["gpm", "lpm", "l/min"],
+    "pressure": ["psi", "bar"],
+    "capacity": ["l", "gal"],
+    "engine_rpm_at_pto": ["rpm"],
+    "length": ["in", "ft", "m", "mm", "cm"],
+    "width": ["in", "ft", "m", "mm", "cm"],
+    "height": ["in", "ft", "m", "mm", "cm"],
+    "height_rops": ["in", "ft", "m", "mm", "cm"],
+    "wheelbase": ["in", "ft", "m", "mm", "cm"],
+    "ground_clearance": ["in", "ft", "m", "mm", "cm"],
+    "axle_clearance_front": ["in", "ft", "m", "mm", "cm"],
+    "axle_clearance_rear": ["in", "ft", "m", "mm", "cm"],
+    "shipping_weight": ["lbs", "lb", "kg"],
+    "ballasted_weight": ["lbs", "lb", "kg"],
+    "max_weight": ["lbs", "lb", "kg"],
+    "peso_delantero": ["lbs", "lb", "kg"],
+    "peso_trasero": ["lbs", "lb", "kg"],
+    "battery_volts": ["v"],
+    "battery_AH": ["ah", "cca"],
+    "rear_lift_capacity": ["lbs", "lb", "kg"],
+    "fuel_tank_capacity": ["l", "gal"],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[./-][a-z0-9]+)*")
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _unit_pattern(units: list[str]) -> re.Pattern:
+    alternativas = "|".join(re.escape(u) for u in sorted(units, key=len, reverse=True))
+    return re.compile(rf"\d[\d.,]*\s*(?:{alternativas})(?![a-z])", re.IGNORECASE)
+
+
+_UNIT_PATTERNS = {variable: _unit_pattern(units) for variable, units in UNIT_HINTS.items()}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class PageIndex:
+    """
+    Índice BM25 en memoria sobre las ventanas (solapadas) de una página.
+    """
+
+    def __init__(self, text: str, window_words: int):
+        words = text.split()
+        stride = max(1, window_words // 2)
+
+        # Cada ventana es un rango [inicio, fin) de palabras del texto original
+        self.words = words
+        self.spans = []
+        for start in range(0, max(len(words) - stride, 1), stride):
+            self.spans.append((start, min(start + window_words, len(words))))
+
+        self.windows_text = [" ".join(words[s:e]) for s, e in self.spans]
+        self.windows_lower = [w.lower() for w in self.windows_text]
+        self.term_freqs = [Counter(_tokenize(w)) for w in self.windows_text]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        self.doc_freq = Counter()
+        for tf in self.term_freqs:
+            self.doc_freq.update(tf.keys())
+
+    def _idf(self, term: str) -> float:
+        n = len(self.spans)
+        df = self.doc_freq.get(term, 0)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def score(self, variable_name: str) -> list[float]:
+        """
+        Puntúa cada ventana para una variable (BM25 + bonus de frase y de unidad).
+        """
+        frases = [variable_name.replace("_", " ").lower()] + SYNONYMS.get(variable_name, [])
+        terminos = set()
+        for frase in frases:
+            terminos.update(_tokenize(frase))
+
+        unit_re = _UNIT_PATTERNS.get(variable_name)
+        scores = []
+        for i, tf in enumerate(self.term_freqs):
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / (self.avg_length or 1))
+            s = 0.0
+            for term in terminos:
+                f = tf.get(term, 0)
+                if f:
+                    s += self._idf(term) * f * (BM25_K1 + 1) / (f + length_norm)
+
+            if any(frase in self.windows_lower[i] for frase in frases if " " in frase):
+                s += PHRASE_BONUS
+            if unit_re is not None and unit_re.search(self.windows_text[i]):
+                s += UNIT_BONUS
+            scores.append(s)
+        return scores
+
+    def top_spans(self, variable_name: str, k: int) -> list[tuple[int, int]]:
+        scores = self.score(variable_name)
+        ranking = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        return [self.spans[i] for i in ranking[:k] if scores[i] > 0]
+
+    def render(self, spans: list[tuple[int, int]]) -> str:
+        """
+        Une las ventanas elegidas en orden de aparición, fusionando las que se solapan.
+        """
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return " ... ".join(" ".join(self.words[s:e]) for s, e in merged)
+
+
+class ContextSelector:
+    """
+    Elige las ventanas de la página relevantes para una o varias variables
+    y lleva la cuenta de los tokens ahorrados.
+    """
+
+    def __init__(self, window_words: int, top_k: int, min_chars: int, max_indexes: int = 32):
+        self.window_words = window_words
+        self.top_k = top_k
+        self.min_chars = min_chars
+        self.max_indexes = max_indexes
+
+        # Índices recientes por hash de la página (la misma página se consulta muchas veces)
+        self._indexes: "OrderedDict[str, PageIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.tokens_in = 0
+        self.tokens_sent = 0
+
+    def _get_index(self, text: str) -> PageIndex:
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+
+        index = PageIndex(text, self.window_words)
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+    def select(self, text: str, variable_names: list[str]) -> tuple[str, dict]:
+        """
+        Devuelve (contexto_reducido, métricas). Si la página es corta,
+        o no hay ninguna ventana relevante, devuelve el texto completo.
+        """
+        tokens_originales = estimate_tokens(text)
+        contexto = text
+
+        if len(text) > self.min_chars and variable_names:
+            index = self._get_index(text)
+            # Con varias variables repartimos las ventanas, pero al menos 2 por variable
+            k = self.top_k if len(variable_names) == 1 else max(2, self.top_k // 2)
+            spans = set()
+            for variable_name in variable_names:
+                spans.update(index.top_spans(variable_name, k))
+            if spans:
+                contexto = index.render(list(spans))
+
+        tokens_enviados = estimate_tokens(contexto)
+        with self._lock:
+            self.calls += 1
+            self.tokens_in += tokens_originales
+            self.tokens_sent += tokens_enviados
+
+        metrics = {
+            "tokens_original": tokens_originales,
+            "tokens_sent": tokens_enviados,
+            "tokens_saved": tokens_originales - tokens_enviados,
+        }
+        print(f"Context Selector: {variable_names[:3]}{'...' if len(variable_names) > 3 else ''} "
+              f"{tokens_originales} -> {tokens_enviados} tokens (ahorro: {metrics['tokens_saved']}).")
+        return contexto, metrics
+
+    def stats(self) -> dict:
+        saved = self.tokens_in - self.tokens_sent
+        return {
+            "calls": self.calls,
+            "tokens_in": self.tokens_in,
+            "tokens_sent": self.tokens_sent,
+            "tokens_saved": saved,
+            "saved_ratio": round(saved / self.tokens_in, 4) if self.tokens_in else 0.0,
+        }
+
+
+# Instancia única compartida por el AnalystAgent
+context_selector = ContextSelector(
+    window_words=CONTEXT_WINDOW_WORDS,
+    top_k=CONTEXT_TOP_K,
+    min_chars=CONTEXT_MIN_CHARS
+)
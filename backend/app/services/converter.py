@@ -1,136 +1,275 @@
 import re
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import NamedTuple, Tuple, Optional
 
 # --- Constantes de Conversión (Imperial a Internacional) ---
 HP_TO_KW = 0.7457
+CV_TO_KW = 0.7355
 LBS_FT_TO_NM = 1.35582
+KGM_TO_NM = 9.80665
 CC_TO_L = 0.001
+CU_IN_TO_L = 0.0163871
+QUART_US_TO_L = 0.946353
 GPM_TO_LPM = 3.78541
 PSI_TO_BAR = 0.0689476
+KPA_TO_BAR = 0.01
+MPA_TO_BAR = 10.0
 LBS_TO_KG = 0.453592
 FEET_TO_M = 0.3048
 GALLON_US_TO_L = 3.78541
 INCH_TO_M = 0.0254
 
-def _extract_number(text: str) -> Optional[float]:
+# --- Unidades por magnitud ---
+# Alias (en minúsculas) -> factor a la unidad canónica de la magnitud.
+# Las magnitudes sin unidades ('count', 'ratio') sólo aceptan números sueltos.
+UNITS: dict[str, dict[str, float]] = {
+    "power": {  # kW
+        "kw": 1.0, "kilowatts": 1.0,
+        "hp": HP_TO_KW, "bhp": HP_TO_KW, "horsepower": HP_TO_KW,
+        "cv": CV_TO_KW, "ps": CV_TO_KW,
+    },
+    "torque": {  # Nm
+        "nm": 1.0, "n·m": 1.0, "n-m": 1.0, "n m": 1.0,
+        "lb-ft": LBS_FT_TO_NM, "lbs-ft": LBS_FT_TO_NM, "lb ft": LBS_FT_TO_NM, "lbf-ft": LBS_FT_TO_NM,
+        "ft-lb": LBS_FT_TO_NM, "ft-lbs": LBS_FT_TO_NM, "ft lb": LBS_FT_TO_NM, "ft lbs": LBS_FT_TO_NM,
+        "kgm": KGM_TO_NM, "kgf·m": KGM_TO_NM,
+    },
+    "volume": {  # Litros
+        "l": 1.0, "lt": 1.0, "ltr": 1.0, "liters": 1.0, "litres": 1.0, "litros": 1.0, "liter": 1.0, "litre": 1.0,
+        "gal": GALLON_US_TO_L, "gals": GALLON_US_TO_L, "gallons": GALLON_US_TO_L, "galones": GALLON_US_TO_L,
+        "qt": QUART_US_TO_L, "qts": QUART_US_TO_L, "quarts": QUART_US_TO_L,
+        "cc": CC_TO_L, "cm³": CC_TO_L, "cm3": CC_TO_L,
+        "ci": CU_IN_TO_L, "cu in": CU_IN_TO_L, "in³": CU_IN_TO_L,
+    },
+    "flow": {  # Litros/minuto
+        "lpm": 1.0, "l/min": 1.0,
+        "gpm": GPM_TO_LPM,
+    },
+    "pressure": {  # bar
+        "bar": 1.0, "psi": PSI_TO_BAR, "kpa": KPA_TO_BAR, "mpa": MPA_TO_BAR,
+    },
+    "length": {  # Metros
+        "m": 1.0, "meters": 1.0, "metres": 1.0, "metros": 1.0,
+        "cm": 0.01, "mm": 0.001,
+        "ft": FEET_TO_M, "feet": FEET_TO_M, "pies": FEET_TO_M, "'": FEET_TO_M,
+        "in": INCH_TO_M, "inches": INCH_TO_M, "pulgadas": INCH_TO_M, '"': INCH_TO_M,
+    },
+    "mass": {  # kg
+        "kg": 1.0, "kgs": 1.0,
+        "lb": LBS_TO_KG, "lbs": LBS_TO_KG, "libras": LBS_TO_KG,
+    },
+    "voltage": {"v": 1.0, "volt": 1.0, "volts": 1.0, "voltios": 1.0},
+    "rpm": {"rpm": 1.0, "r/min": 1.0},
+    "charge": {"ah": 1.0, "a-h": 1.0, "amp hours": 1.0},
+    "count": {},
+    "ratio": {},
+}
+
+
+class Canonical(NamedTuple):
+    column: str # Columna numérica canónica
+    dimension: str # Clave de UNITS
+    integer: bool = False # Se guarda redondeado a entero (RPM, nº de cilindros)
+    unitless: bool = False # Acepta un número sin unidad (ej: "12" para voltios)
+
+
+# --- Registro de variables: String extraído -> columna numérica ---
+# Una sola tabla para la extracción (get_canonical_values, valor a valor)
+# y para el backfill (services/backfill.py, columna a columna).
+VARIABLES: dict[str, Canonical] = {
+    # --- Engine ---
+    "numero_de_cilindros": Canonical("numero_de_cilindros_num", "count", integer=True, unitless=True),
+    "displacement": Canonical("displacement_l", "volume"),
+    "compression_ratio": Canonical("compression_ratio_num", "ratio", unitless=True), # Asume que es X:1
+    "oil_capacity": Canonical("oil_capacity_l", "volume"),
+    "starter_volts": Canonical("starter_volts_v", "voltage", unitless=True),
+    "max_power_gross": Canonical("max_power_gross_kw", "power"),
+    "rated_power_net": Canonical("rated_power_net_kw", "power"),
+    "rated_rpm": Canonical("rated_rpm_num", "rpm", integer=True, unitless=True),
+    "torque": Canonical("torque_nm", "torque"),
+    "torque_rpm": Canonical("torque_rpm_num", "rpm", integer=True, unitless=True),
+
+    # --- Hydraulics ---
+    "pump_flow": Canonical("pump_flow_lpm", "flow"),
+    "rear_scv_flow": Canonical("rear_scv_flow_lpm", "flow"),
+    "pressure": Canonical("pressure_bar", "pressure"),
+    "capacity": Canonical("capacity_l", "volume"),
+
+    # --- PTO ---
+    "engine_rpm_at_pto": Canonical("engine_rpm_at_pto_num", "rpm", integer=True, unitless=True),
+
+    # --- DimensionsWeight ---
+    **{
+        name: Canonical(f"{name}_m", "length")
+        for name in ["length", "width", "height", "height_rops", "wheelbase", "ground_clearance", "axle_clearance_front", "axle_clearance_rear"]
+    },
+    **{
+        name: Canonical(f"{name}_kg", "mass")
+        for name in ["shipping_weight", "ballasted_weight", "max_weight", "peso_delantero", "peso_trasero", "rear_lift_capacity"]
+    },
+
+    # --- ElectricalSystem ---
+    "battery_volts": Canonical("battery_volts_v", "voltage", unitless=True),
+    "battery_AH": Canonical("battery_AH_num", "charge", unitless=True),
+
+    # --- FuelFluids ---
+    "fuel_tank_capacity": Canonical("fuel_tank_capacity_l", "volume"),
+}
+
+
+# --- Tokenizador compilado (una sola vez al importar) ---
+# alias -> (magnitud, factor): el regex sólo separa "número [rango] [palabra]"
+# y la unidad se resuelve con un acceso O(1) a este diccionario.
+_ALIASES: dict[str, tuple[str, float]] = {
+    alias.replace(" ", "-"): (dimension, factor)
+    for dimension, aliases in UNITS.items()
+    for alias, factor in aliases.items()
+}
+
+# Miles separados por espacio ("12 500", también con espacio fino o no separable) o con [.,]
+_NUMBER = r"[1-9]\d{0,2}(?:[ \u00a0\u202f]\d{3})+(?!\d)(?:[.,]\d+)?|\d+(?:[.,]\d+)*"
+
+_TOKEN_RE = re.compile(
+    # Número (o rango 'a-b', 'a to b', 'a a b') seguido opcionalmente de una palabra completa:
+    # 'l' no coincide con 'lbs' ni 'm' con 'mph' porque la palabra se lee entera ('cm3' incluida)
+    rf"(?P<num>{_NUMBER})(?:\s*(?:-|–|to|a)\s*(?P<num2>{_NUMBER}))?"
+    rf"\s*(?P<unit>'|\"|[^\W\d_]+(?:[-/·][^\W\d_]+)*(?:3(?!\d))?)?"
+)
+# Segunda palabra de las unidades compuestas con espacio ('lb ft', 'cu in', 'amp hours')
+_COMPOUND_HEADS = {alias.split()[0] for aliases in UNITS.values() for alias in aliases if " " in alias}
+_COMPOUND_TAIL_RE = re.compile(r" ([^\W\d_]+)")
+# Pulgadas después de pies: 6 ft 2 in, 6' 2"
+_INCH_TAIL_RE = re.compile(rf"\s*({_NUMBER})\s*(?:in|inches|pulgadas|\")(?![^\W\d_])")
+
+# Unidades en las que un único separador con 3 cifras es un decimal y no miles:
+# "4.485 L" de cilindrada o "2,870 m" de batalla (ningún tractor tiene 4485 L ni 2870 m).
+# Las unidades pequeñas de la misma magnitud sí llevan miles: "6,788 cc", "2,870 mm".
+DECIMAL_GROUP_DIMENSIONS = ("volume", "length")
+DECIMAL_GROUP_MIN_FACTOR = FEET_TO_M # l, gal, qt, m, ft (no cc, ci, mm, cm, in)
+
+# Grupos de exactamente 3 cifras sin cero inicial: "2,850" y "5.670" son miles, "0,750" no
+_THOUSANDS_COMMA_RE = re.compile(r"[1-9]\d{0,2}(?:,\d{3})+")
+_THOUSANDS_DOT_RE = re.compile(r"[1-9]\d{0,2}(?:\.\d{3})+")
+_GROUP_SPACE_RE = re.compile(r"[ \u00a0\u202f]")
+
+
+def _parse_number(text: str, decimal_groups: bool = False) -> Optional[float]:
     """
-    Extrae el primer número (int o float) de un string.
-    Maneja formatos como "1,200.50" y "1.200,50" y "108.6".
+    Convierte un número con separadores: "1,200.50" (US), "1.200,50" (EU),
+    "12 500" (miles con espacio), "2,850" y "5.670" (miles), "108,6" (decimal europeo) y "108.6".
+    Un único separador seguido de exactamente 3 cifras se lee como miles, sea coma o punto,
+    salvo con 'decimal_groups' (unidades grandes de DECIMAL_GROUP_DIMENSIONS): "4.485" -> 4.485.
     """
-    if not text:
-        return None
-    
-    # Intenta encontrar un número, limpiando comas de miles y manejando comas decimales
-    # "1,200.50" (US) o "1.200,50" (EU) o "108.6"
-    match = re.search(r'([\d.,]+)', text)
-    if not match:
-        return None
-    
-    number_str = match.group(1)
-    
+    text = _GROUP_SPACE_RE.sub("", text)
+    if "," not in text and "." not in text:
+        return float(text) # Caso común: "2400"
+    if decimal_groups and text.count(",") + text.count(".") == 1:
+        text = text.replace(",", ".")
+    elif "," in text and "." in text:
+        # El separador que aparece al final es el decimal
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", "") if _THOUSANDS_COMMA_RE.fullmatch(text) else text.replace(",", ".")
+    elif _THOUSANDS_DOT_RE.fullmatch(text):
+        text = text.replace(".", "")
+    if text.count(".") > 1:
+        parts = text.split(".")
+        text = "".join(parts[:-1]) + "." + parts[-1]
     try:
-        # Estrategia de limpieza:
-        # Si hay comas y puntos, asumimos que el punto es decimal y las comas son de miles.
-        if ',' in number_str and '.' in number_str:
-            number_str = number_str.replace(',', '')
-        # Si solo hay comas, asumimos que es un decimal europeo.
-        elif ',' in number_str:
-            number_str = number_str.replace(',', '.')
-        
-        # Si hay múltiples puntos (ej. "1.200"), los eliminamos todos menos el último
-        if number_str.count('.') > 1:
-             parts = number_str.split('.')
-             number_str = "".join(parts[:-1]) + "." + parts[-1]
-
-        return float(number_str)
-    
+        return float(text)
     except ValueError:
-        print(f"Converter: No se pudo convertir '{match.group(1)}' a float.")
         return None
 
 
+def _token_value(match: re.Match, decimal_groups: bool = False) -> Optional[float]:
+    first = _parse_number(match["num"], decimal_groups)
+    if first is None or not match["num2"]:
+        return first
+    # Rango: se toma el punto medio ("2,100-2,400 rpm" -> 2250)
+    second = _parse_number(match["num2"], decimal_groups)
+    return first if second is None else (first + second) / 2
+
+
+def _resolve_unit(unit: str, text: str, end: int) -> tuple[Optional[tuple[str, float]], int]:
+    """
+    Busca la unidad en el diccionario de alias; si no está, prueba con la palabra
+    siguiente ('lb' + 'ft' -> 'lb-ft'). Devuelve ((magnitud, factor) | None, fin).
+    """
+    tail = _COMPOUND_TAIL_RE.match(text, end) if unit in _COMPOUND_HEADS else None
+    if tail:
+        compound = _ALIASES.get(f"{unit}-{tail[1]}")
+        if compound:
+            return compound, tail.end()
+    return _ALIASES.get(unit), end
+
+
+# Los Strings de un catálogo se repiten mucho ("12 V", "2400 rpm"): se memoriza el resultado
+PARSE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_canonical(variable_name: str, value_string: str) -> Optional[float]:
+    """
+    Valor canónico de 'value_string' para la magnitud de la variable, o None.
+    Recorre los pares número-unidad y gana el primero cuya unidad es de la magnitud
+    buscada ("310 lb-ft @ 1,400 rpm" -> torque 420.3 Nm, torque_rpm 1400).
+    Si la variable lo permite, usa el primer número sin unidad conocida como respaldo.
+    """
+    spec = VARIABLES.get(variable_name)
+    if spec is None or not value_string:
+        return None
+
+    text = value_string.lower()
+    unitless_value = None
+    for match in _TOKEN_RE.finditer(text):
+        unit = match["unit"]
+        resolved = None
+        if unit is not None:
+            resolved, end = _resolve_unit(unit, text, match.end())
+
+        if resolved is None:
+            # Número suelto o seguido de una palabra que no es unidad ("4 cyl", "17.5:1")
+            if spec.unitless and unitless_value is None:
+                unitless_value = _token_value(match)
+            continue
+
+        dimension, factor = resolved
+        if dimension != spec.dimension:
+            continue
+        decimal_groups = dimension in DECIMAL_GROUP_DIMENSIONS and factor >= DECIMAL_GROUP_MIN_FACTOR
+        number = _token_value(match, decimal_groups)
+        if number is None:
+            continue
+
+        if factor == FEET_TO_M and spec.dimension == "length":
+            inches = _INCH_TAIL_RE.match(text, end)
+            if inches and (extra := _parse_number(inches[1])) is not None:
+                return number * FEET_TO_M + extra * INCH_TO_M
+        return number * factor
+
+    return unitless_value
+
+
 def get_canonical_values(variable_name: str, value_string: str) -> Tuple[Optional[str], Optional[float]]:
     """
     Toma un nombre de variable y un string extraído (ej: "108.6 hp")
     y devuelve la columna numérica y el valor canónico (ej: "rated_power_net_kw", 81.0).
 
+    Las columnas Integer se redondean al entero más cercano ("2,099.6 rpm" -> 2100),
+    igual que en el backfill; antes se truncaban con int() y guardaban 2099.
+
     Returns:
         (str: nombre_columna_numerica, float: valor_canonico)
     """
-    
-    number = _extract_number(value_string)
-    if number is None:
-        return None, None # No se encontró ningún número en el string
-
-    value_lower = value_string.lower()
-
-    # --- Engine ---
-    if variable_name == "numero_de_cilindros":
-        return "numero_de_cilindros_num", int(number)
-    if variable_name == "displacement":
-        if "l" in value_lower and "cc" not in value_lower: return "displacement_l", number
-        if "cc" in value_lower or "cm³" in value_lower: return "displacement_l", number * CC_TO_L
-    if variable_name == "compression_ratio":
-        return "compression_ratio_num", number # Asume que es X:1
-    if variable_name == "oil_capacity":
-        if "l" in value_lower: return "oil_capacity_l", number
-        if "gal" in value_lower: return "oil_capacity_l", number * GALLON_US_TO_L
-    if variable_name == "starter_volts":
-        return "starter_volts_v", number
-    if variable_name in ["max_power_gross", "rated_power_net"]:
-        col_name = f"{variable_name}_kw"
-        if "kw" in value_lower: return col_name, number
-        if "hp" in value_lower: return col_name, number * HP_TO_KW
-    if variable_name == "rated_rpm":
-        return "rated_rpm_num", int(number)
-    if variable_name == "torque":
-        if "nm" in value_lower: return "torque_nm", number
-        if "lbs-ft" in value_lower or "lb-ft" in value_lower: return "torque_nm", number * LBS_FT_TO_NM
-    if variable_name == "torque_rpm":
-        return "torque_rpm_num", int(number)
+    spec = VARIABLES.get(variable_name)
+    if spec is None:
+        return None, None # No hay una conversión para esta variable
 
-    # --- Hydraulics ---
-    if variable_name in ["pump_flow", "rear_scv_flow"]:
-        col_name = f"{variable_name}_lpm"
-        if "lpm" in value_lower or "l/min" in value_lower: return col_name, number
-        if "gpm" in value_lower: return col_name, number * GPM_TO_LPM
-    if variable_name == "pressure":
-        if "bar" in value_lower: return "pressure_bar", number
-        if "psi" in value_lower: return "pressure_bar", number * PSI_TO_BAR
-    if variable_name == "capacity":
-        if "l" in value_lower: return "capacity_l", number
-        if "gal" in value_lower: return "capacity_l", number * GALLON_US_TO_L
-
-    # --- PTO ---
-    if variable_name == "engine_rpm_at_pto":
-        return "engine_rpm_at_pto_num", int(number)
-        
-    # --- DimensionsWeight ---
-    if variable_name in ["length", "width", "height", "height_rops", "wheelbase", "ground_clearance", "axle_clearance_front", "axle_clearance_rear"]:
-        col_name = f"{variable_name}_m"
-        if "m" in value_lower or "metros" in value_lower: return col_name, number
-        if "ft" in value_lower or "pies" in value_lower: return col_name, number * FEET_TO_M
-        if "in" in value_lower or "pulgadas" in value_lower: return col_name, number * INCH_TO_M
-    if variable_name in ["shipping_weight", "ballasted_weight", "max_weight", "peso_delantero", "peso_trasero"]:
-        col_name = f"{variable_name}_kg"
-        if "kg" in value_lower: return col_name, number
-        if "lbs" in value_lower or "libras" in value_lower: return col_name, number * LBS_TO_KG
-        
-    # --- ElectricalSystem ---
-    if variable_name == "battery_volts":
-        return "battery_volts_v", number
-    if variable_name == "battery_AH":
-        return "battery_AH_num", number
-
-    # --- HitchDrawbar ---
-    if variable_name == "rear_lift_capacity":
-        if "kg" in value_lower: return "rear_lift_capacity_kg", number
-        if "lbs" in value_lower: return "rear_lift_capacity_kg", number * LBS_TO_KG
-        
-    # --- FuelFluids ---
-    if variable_name == "fuel_tank_capacity":
-        if "l" in value_lower: return "fuel_tank_capacity_l", number
-        if "gal" in value_lower: return "fuel_tank_capacity_l", number * GALLON_US_TO_L
+    value = parse_canonical(variable_name, value_string)
+    if value is None:
+        return None, None # No se encontró un número con una unidad válida
 
-    # No se encontró una conversión para esta variable
-    return None, None
\ No newline at end of file
+    return spec.column, int(round(value)) if spec.integer else value
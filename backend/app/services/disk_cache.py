@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+class DiskCache:
+    """
+    Caché persistente en disco (un archivo JSON por entrada) con TTL
+    y expulsión LRU acotada por tamaño total en bytes.
+
+    Cada entrada se guarda bajo el SHA-256 de su clave, por lo que
+    el nombre del archivo no depende de caracteres raros de la clave.
+    El índice LRU vive en memoria y se reconstruye al arrancar a partir
+    de la fecha de modificación de los archivos.
+    """
+
+    def __init__(self, name: str, directory: str, ttl_seconds: float, max_bytes: int):
+        self.name = name
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # hash -> tamaño en bytes (el orden del OrderedDict es el orden LRU)
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    # --- Helpers internos ---
+
+    @staticmethod
+    def hash_key(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _path(self, key_hash: str) -> str:
+        return os.path.join(self.directory, f"{key_hash}.json")
+
+    def _load_index(self):
+        """
+        Reconstruye el índice LRU ordenando los archivos existentes por mtime.
+        """
+        archivos = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            archivos.append((st.st_mtime, filename[:-5], st.st_size))
+
+        for _, key_hash, size in sorted(archivos):
+            self._index[key_hash] = size
+            self._total_bytes += size
+
+        print(f"DiskCache [{self.name}]: {len(self._index)} entradas cargadas ({self._total_bytes} bytes).")
+
+    def _remove(self, key_hash: str):
+        size = self._index.pop(key_hash, 0)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key_hash))
+        except OSError:
+            pass
+
+    def _evict_if_needed(self):
+        while self._total_bytes > self.max_bytes and self._index:
+            oldest = next(iter(self._index))
+            self._remove(oldest)
+            self.evictions += 1
+
+    # --- API pública ---
+
+    def get(self, key: str) -> dict | None:
+        """
+        Devuelve el valor guardado para 'key', o None si no existe o expiró.
+        """
+        key_hash = self.hash_key(key)
+        with self._lock:
+            if key_hash not in self._index:
+                self.misses += 1
+                return None
+
+            path = self._path(key_hash)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key_hash)
+                self.misses += 1
+                return None
+
+            if self.ttl_seconds and time.time() - entry.get("stored_at", 0) > self.ttl_seconds:
+                self._remove(key_hash)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            # Marcamos la entrada como usada recientemente (en memoria y en disco)
+            self._index.move_to_end(key_hash)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+            self.hits += 1
+            return entry["value"]
+
+    def set(self, key: str, value: dict):
+        """
+        Guarda 'value' (serializable a JSON) bajo 'key' y aplica la expulsión LRU.
+        """
+        key_hash = self.hash_key(key)
+        data = json.dumps(
+            {"key": key, "stored_at": time.time(), "value": value},
+            ensure_ascii=False
+        ).encode("utf-8")
+
+        with self._lock:
+            if key_hash in self._index:
+                self._remove(key_hash)
+
+            # Escritura atómica: archivo temporal + rename
+            path = self._path(key_hash)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self._index[key_hash] = len(data)
+            self._total_bytes += len(data)
+            self._evict_if_needed()
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Elimina una entrada. Devuelve True si existía.
+        """
+        key_hash = self.hash_key(key)
+        with self._lock:
+            if key_hash not in self._index:
+                return False
+            self._remove(key_hash)
+            return True
+
+    def invalidate_where(self, predicate: Callable[[dict], bool]) -> int:
+        """
+        Elimina las entradas cuyo valor cumple 'predicate'.
+        Recorre los archivos en disco, así que es una operación de administración.
+        Devuelve cuántas se borraron.
+        """
+        removed = 0
+        with self._lock:
+            for key_hash in list(self._index):
+                try:
+                    with open(self._path(key_hash), "r", encoding="utf-8") as f:
+                        value = json.load(f)["value"]
+                except (OSError, ValueError, KeyError):
+                    continue
+                if predicate(value):
+                    self._remove(key_hash)
+                    removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """
+        Elimina todas las entradas. Devuelve cuántas se borraron.
+        """
+        with self._lock:
+            count = len(self._index)
+            for key_hash in list(self._index):
+                self._remove(key_hash)
+            return count
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._index),
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,119 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.models import Tractor
+from app.database.bulk import upsert_tractors
+from app.database.versioning import catalog_version
+from app.agents.analyst_agent import AnalystAgent
+from app.services.converter import get_canonical_values
+
+# --- Servicio de Extracción ---
+# Lógica compartida por las rutas de extracción y por los trabajos de minería:
+# adaptadores del sitio + LLM para lo que falte, y escritura en la BD.
+
+# Creamos una única instancia del agente para reutilizar (carga el modelo de IA una sola vez)
+try:
+    analyst = AnalystAgent()
+    print("Agente Analista cargado en el servicio de extracción.")
+except Exception as e:
+    print(f"ERROR CRÍTICO: No se pudo cargar el AnalystAgent: {e}")
+    analyst = None
+
+
+def valid_variables(variable_names: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Separa (sin duplicados, en orden) las variables que existen como columna en 'Tractor'.
+
+    Returns:
+        (validas, invalidas)
+    """
+    columnas_validas = Tractor.__table__.columns.keys()
+    variables = list(dict.fromkeys(variable_names))
+    validas = [v for v in variables if v in columnas_validas]
+    invalidas = [v for v in variables if v not in columnas_validas]
+    return validas, invalidas
+
+
+async def extract_page_values(page: dict, variable_names: list[str]) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Resuelve las variables de una página ya scrapeada:
+    primero con los valores estructurados del adaptador del sitio,
+    después con el LLM (multi-variable) sólo para las que faltan.
+
+    Returns:
+        (encontrados, desde_adaptador): {variable: valor} de todo lo encontrado
+        y el subconjunto que salió del adaptador (sin LLM).
+    """
+    desde_adaptador = {v: page["structured"][v] for v in variable_names if page["structured"].get(v)}
+    pendientes = [v for v in variable_names if v not in desde_adaptador]
+    print(f"Adaptador del sitio: {len(desde_adaptador)}/{len(variable_names)} variables resueltas sin LLM.")
+
+    valores = await analyst.arun_batch(page["text"], pendientes) if pendientes else {}
+    encontrados = {k: v for k, v in valores.items() if v != "N/A"}
+    encontrados.update(desde_adaptador)
+    return encontrados, desde_adaptador
+
+
+def converted_columns(tractor_model: str, variable_name: str, valor_str: str) -> dict:
+    """
+    Columnas a escribir para un valor extraído: el String original y,
+    si el convertidor lo reconoce, su valor numérico canónico.
+    """
+    print(f"Actualizando DB (String): {tractor_model} -> {variable_name} = '{valor_str}'")
+    columnas = {variable_name: valor_str}
+
+    # Convertir y guardar el valor numérico
+    col_name_num, num_value = get_canonical_values(variable_name, valor_str)
+
+    if col_name_num and num_value is not None:
+        # Segunda verificación de seguridad: ¿existe la columna numérica?
+        if hasattr(Tractor, col_name_num):
+            print(f"Actualizando DB (Numérico): {tractor_model} -> {col_name_num} = {num_value}")
+            columnas[col_name_num] = num_value
+        else:
+            # Esto es un log para nosotros, por si olvidamos añadir una col_num en models.py
+            print(f"ADVERTENCIA: El convertidor devolvió la columna '{col_name_num}' pero esta no existe en 'models.py'.")
+
+    return columnas
+
+
+def build_tractor_row(tractor_model: str, company: str | None, encontrados: dict[str, str]) -> dict:
+    """
+    Fila lista para 'upsert_tractors': modelo, empresa y todas las columnas String + numéricas.
+    """
+    row = {"model": tractor_model}
+    if company:
+        row["company"] = company
+    for variable_name, valor_str in encontrados.items():
+        row.update(converted_columns(tractor_model, variable_name, valor_str))
+    return row
+
+
+def store_tractor_values(db: Session, tractor_model: str, company: str | None, encontrados: dict[str, str]) -> dict[str, int]:
+    """
+    Inserta o actualiza el tractor con todos los valores en UNA sola sentencia
+    (INSERT ... ON CONFLICT) y hace commit.
+    Es síncrono: quien lo llame desde código async debe usar el threadpool.
+
+    Returns:
+        {"inserted", "updated", "statements"} según 'upsert_tractors'.
+    """
+    counts = upsert_tractors(db, [build_tractor_row(tractor_model, company, encontrados)])
+    if counts["inserted"]:
+        print(f"Creando nueva entrada en la BD para el tractor: {tractor_model}")
+    db.commit()
+    catalog_version.bump()
+    return counts
+
+
+async def store_tractor_values_async(db: AsyncSession, tractor_model: str, company: str | None, encontrados: dict[str, str]) -> dict[str, int]:
+    """
+    Versión para las rutas async: misma sentencia (upsert_tractors corre con run_sync
+    sobre la conexión asíncrona) y commit sin ocupar un hilo del threadpool.
+    """
+    counts = await db.run_sync(upsert_tractors, [build_tractor_row(tractor_model, company, encontrados)])
+    if counts["inserted"]:
+        print(f"Creando nueva entrada en la BD para el tractor: {tractor_model}")
+    await db.commit()
+    catalog_version.bump()
+    return counts
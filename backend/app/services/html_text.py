@@ -0,0 +1,76 @@
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+    import lxml.html
+    HAS_LXML = True
+except ImportError: # lxml es opcional: sin él usamos el tokenizador de la librería estándar
+    HAS_LXML = False
+
+# --- HTML -> texto visible ---
+# Reemplaza el recorrido con BeautifulSoup('html.parser') + find_all + decompose:
+# con lxml todo el trabajo ocurre en C; sin lxml, un tokenizador por eventos
+# ignora los subárboles ruidosos sin construir ningún árbol.
+
+# Etiquetas "ruidosas" cuyo contenido no es parte de la ficha técnica
+SKIP_TAGS = ("script", "style", "nav", "footer", "header", "aside", "form")
+_SKIP_SET = frozenset(SKIP_TAGS)
+
+# Parser que deben usar los demás módulos que sí necesitan BeautifulSoup (adaptadores)
+BS_PARSER = "lxml" if HAS_LXML else "html.parser"
+
+
+def _html_to_text_lxml(html: str) -> str:
+    try:
+        root = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        # Documento vacío, o un str con declaración de encoding que lxml rechaza
+        return _html_to_text_events(html)
+    # Elimina los subárboles completos pero conserva el texto que viene después de ellos
+    etree.strip_elements(root, *SKIP_TAGS, with_tail=False)
+    return " ".join(t for t in (s.strip() for s in root.itertext()) if t)
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Tokenizador por eventos: acumula el texto fuera de las etiquetas ruidosas.
+    'skip_depth' cuenta cuántas etiquetas ruidosas hay abiertas en este punto.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_SET:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_SET and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            data = data.strip()
+            if data:
+                self.parts.append(data)
+
+
+def _html_to_text_events(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return " ".join(parser.parts)
+
+
+def html_to_text(html: str) -> str:
+    """
+    Convierte HTML en texto visible, eliminando navegación, scripts y estilos.
+    Los fragmentos de texto se separan con un espacio (igual que get_text(" ", strip=True)).
+    """
+    if not html:
+        return ""
+    if HAS_LXML:
+        return _html_to_text_lxml(html)
+    return _html_to_text_events(html)
@@ -0,0 +1,156 @@
+import asyncio
+import math
+import random
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import (
+    BROWSER_HEADERS,
+    HTTP_TIMEOUT_SECONDS,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_PER_HOST_CONCURRENCY,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_BASE_SECONDS,
+    HTTP_RETRY_AFTER_MAX_SECONDS,
+    SCRAPE_MAX_BYTES,
+)
+
+# Códigos que vale la pena reintentar (límite de tasa y errores temporales del servidor)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Tipos de contenido que el scraper sabe convertir a texto
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+class UnsupportedContentType(Exception):
+    """
+    La URL devolvió algo que no es HTML (PDF, imagen, zip...). Se aborta
+    la descarga con sólo las cabeceras leídas.
+    """
+
+# --- Estado global del cliente ---
+# Un único cliente para toda la aplicación: reutiliza conexiones TCP/TLS (keep-alive y HTTP/2)
+_client: httpx.AsyncClient | None = None
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=HTTP_TIMEOUT_SECONDS,
+        headers=BROWSER_HEADERS,
+        follow_redirects=True, # Sigue redirecciones (ej. http a https)
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+async def init_http_client():
+    """
+    Crea el cliente compartido. Se llama desde el 'lifespan' de main.py.
+    """
+    global _client
+    if _client is None:
+        _client = _create_client()
+        print("HTTP Client: Cliente compartido creado (HTTP/2, pool de conexiones).")
+
+
+async def close_http_client():
+    """
+    Cierra el cliente compartido y libera sus conexiones.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _host_semaphores.clear()
+        print("HTTP Client: Cliente compartido cerrado.")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Devuelve el cliente compartido. Si la app no pasó por el 'lifespan'
+    (ej: scripts sueltos), lo crea bajo demanda.
+    """
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = (urlsplit(url).hostname or "").lower()
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(HTTP_PER_HOST_CONCURRENCY)
+        _host_semaphores[host] = semaphore
+    return semaphore
+
+
+def _backoff_delay(attempt: int, retry_after: str | None = None) -> float:
+    """
+    Espera antes del siguiente intento: respeta 'Retry-After' si el servidor lo envía
+    (acotado a HTTP_RETRY_AFTER_MAX_SECONDS), si no usa backoff exponencial con jitter completo.
+    """
+    if retry_after:
+        try:
+            delay = float(retry_after)
+            if not math.isnan(delay):
+                return min(max(delay, 0.0), HTTP_RETRY_AFTER_MAX_SECONDS)
+        except ValueError: # Fecha HTTP u otro formato: backoff normal
+            pass
+    return random.uniform(0, HTTP_BACKOFF_BASE_SECONDS * (2 ** attempt))
+
+
+async def fetch_html(url: str, max_bytes: int = SCRAPE_MAX_BYTES, max_retries: int = HTTP_MAX_RETRIES) -> str:
+    """
+    GET en streaming para páginas HTML: revisa el Content-Type antes de leer el cuerpo
+    y deja de leer al llegar a 'max_bytes' (la página se trunca, no se carga entera en memoria).
+
+    Raises:
+        UnsupportedContentType si la respuesta no es HTML.
+        httpx.HTTPStatusError / httpx.RequestError si fallan todos los intentos.
+    """
+    client = get_http_client()
+
+    for attempt in range(max_retries + 1):
+        try:
+            async with _host_semaphore(url):
+                async with client.stream("GET", url) as response:
+                    if response.status_code in RETRYABLE_STATUS and attempt < max_retries:
+                        delay = _backoff_delay(attempt, response.headers.get("Retry-After"))
+                    else:
+                        response.raise_for_status()
+
+                        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                        if content_type and content_type not in HTML_CONTENT_TYPES:
+                            raise UnsupportedContentType(f"Content-Type '{content_type}' no es HTML")
+
+                        body = bytearray()
+                        async for chunk in response.aiter_bytes():
+                            body += chunk
+                            if len(body) >= max_bytes:
+                                print(f"HTTP Client: {url[:70]} supera {max_bytes} bytes. Se trunca la descarga.")
+                                del body[max_bytes:]
+                                break
+
+                        try:
+                            return body.decode(response.charset_encoding or "utf-8", errors="replace")
+                        except LookupError: # charset desconocido en la cabecera
+                            return body.decode("utf-8", errors="replace")
+
+            print(f"HTTP Client: {response.status_code} en {url[:70]}. Reintento {attempt + 1}/{max_retries} en {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+        except httpx.TransportError as e:
+            if attempt >= max_retries:
+                raise
+            delay = _backoff_delay(attempt)
+            print(f"HTTP Client: Error de red en {url[:70]} ({e}). Reintento {attempt + 1}/{max_retries} en {delay:.2f}s")
+            await asyncio.sleep(delay)
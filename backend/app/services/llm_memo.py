@@ -0,0 +1,69 @@
+import hashlib
+
+from app.config import LLM_MEMO_DIR, LLM_MEMO_TTL_SECONDS, LLM_MEMO_MAX_MB
+from app.services.disk_cache import DiskCache
+
+
+class ExtractionMemo:
+    """
+    Memo persistente de las respuestas del LLM.
+    Clave: (hash de la página, variable, modelo, versión de la firma).
+    Si la página no cambió, repetir la extracción no vuelve a llamar a Groq.
+    """
+
+    def __init__(self, cache: DiskCache):
+        self.cache = cache
+
+    @staticmethod
+    def context_hash(contexto: str) -> str:
+        return hashlib.sha256(contexto.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _key(context_hash: str, variable_name: str, model: str, signature_version: str) -> str:
+        return f"{context_hash}|{variable_name}|{model}|{signature_version}"
+
+    def get(self, context_hash: str, variable_name: str, model: str, signature_version: str) -> str | None:
+        entry = self.cache.get(self._key(context_hash, variable_name, model, signature_version))
+        return entry["value"] if entry else None
+
+    def set(self, context_hash: str, variable_name: str, model: str, signature_version: str, value: str):
+        self.cache.set(
+            self._key(context_hash, variable_name, model, signature_version),
+            {
+                "value": value,
+                "context_hash": context_hash,
+                "variable_name": variable_name,
+                "model": model,
+                "signature_version": signature_version,
+            }
+        )
+
+    def invalidate(self, variable_name: str | None = None, model: str | None = None,
+                   context_hash: str | None = None) -> int:
+        """
+        Borra las respuestas guardadas que coinciden con los filtros dados.
+        Sin filtros, vacía el memo completo.
+        """
+        if variable_name is None and model is None and context_hash is None:
+            return self.cache.clear()
+
+        def matches(entry: dict) -> bool:
+            return (
+                (variable_name is None or entry.get("variable_name") == variable_name)
+                and (model is None or entry.get("model") == model)
+                and (context_hash is None or entry.get("context_hash") == context_hash)
+            )
+
+        return self.cache.invalidate_where(matches)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+# Instancia única compartida por el AnalystAgent
+extraction_memo = ExtractionMemo(DiskCache(
+    name="llm_memo",
+    directory=LLM_MEMO_DIR,
+    ttl_seconds=LLM_MEMO_TTL_SECONDS,
+    max_bytes=LLM_MEMO_MAX_MB * 1024 * 1024
+))
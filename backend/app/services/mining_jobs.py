@@ -0,0 +1,325 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field, asdict
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import MINING_JOBS_DIR, MINING_MAX_CONCURRENCY, MINING_EVENT_HISTORY
+from app.database.connection import SessionLocal
+from app.services.scraper import scrape_page
+from app.services.searcher import search_google_free
+from app.services.extraction_service import (
+    valid_variables, extract_page_values, store_tractor_values
+)
+
+# --- Trabajos de Minería ---
+# Reemplazan el bucle del navegador (/investigar todos): el servidor recorre
+# búsqueda -> scrapeo -> extracción -> guardado para cada tractor, con un pool
+# acotado de workers, emite el progreso como eventos y guarda un checkpoint
+# en disco para poder cancelar y reanudar.
+
+# Estados de un trabajo
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted" # El servidor se apagó con el trabajo en marcha
+FINISHED_STATES = {COMPLETED, CANCELLED, INTERRUPTED}
+
+# Eventos 'stage' que emite cada tractor (search, scrape, extract, store)
+_STAGES_PER_TRACTOR = 4
+
+
+@dataclass
+class MiningJob:
+    id: str
+    tractors: list[dict] # [{"company", "model", "url"}]
+    variable_names: list[str]
+    status: str = PENDING
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # tractor_model -> {"status": "done"|"failed", "extracted": int, "url": str, "error": str}
+    results: dict = field(default_factory=dict)
+    # Último 'seq' emitido: se guarda en el checkpoint para que al reanudar la secuencia
+    # siga (y el Last-Event-ID del navegador no repita ni se salte eventos)
+    last_seq: int = 0
+
+    @staticmethod
+    def tractor_key(tractor: dict) -> str:
+        return f"{tractor.get('company') or ''} {tractor['model']}".strip()
+
+    def pending_tractors(self) -> list[dict]:
+        return [t for t in self.tractors if self.results.get(self.tractor_key(t), {}).get("status") != "done"]
+
+    def summary(self) -> dict:
+        done = sum(1 for r in self.results.values() if r["status"] == "done")
+        failed = sum(1 for r in self.results.values() if r["status"] == "failed")
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": len(self.tractors),
+            "done": done,
+            "failed": failed,
+            "extracted": sum(r.get("extracted", 0) for r in self.results.values()),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class MiningJobManager:
+    """
+    Ejecuta los trabajos de minería en el event loop de la app y reparte
+    su progreso a los clientes suscritos (SSE).
+    """
+
+    def __init__(self, directory: str, max_concurrency: int, event_history: int = MINING_EVENT_HISTORY):
+        self.directory = directory
+        self.max_concurrency = max_concurrency
+        self.event_history = event_history
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.jobs: dict[str, MiningJob] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        # Historial acotado de eventos (para reenviar a quien se suscriba tarde) y colas de suscriptores
+        self._events: dict[str, deque[dict]] = {}
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+        # Un lock por trabajo: las escrituras en hilos llegan al disco en el orden en que se pidieron
+        self._checkpoint_locks: dict[str, asyncio.Lock] = {}
+        self._shutting_down = False
+
+        self._load_checkpoints()
+
+    # --- Checkpoints ---
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _write_checkpoint(self, job_id: str, data: str):
+        tmp_path = f"{self._path(job_id)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(job_id))
+
+    def _save_checkpoint(self, job: MiningJob):
+        job.updated_at = time.time()
+        self._write_checkpoint(job.id, json.dumps(asdict(job), ensure_ascii=False))
+
+    async def _save_checkpoint_async(self, job: MiningJob):
+        """
+        Igual que _save_checkpoint, con la escritura en un hilo (se llama tras cada tractor).
+        El JSON se genera en el event loop, donde el trabajo no cambia mientras se copia.
+        """
+        lock = self._checkpoint_locks.setdefault(job.id, asyncio.Lock())
+        async with lock:
+            job.updated_at = time.time()
+            data = json.dumps(asdict(job), ensure_ascii=False)
+            await asyncio.to_thread(self._write_checkpoint, job.id, data)
+
+    def _load_checkpoints(self):
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), "r", encoding="utf-8") as f:
+                    job = MiningJob(**json.load(f))
+            except (OSError, ValueError, TypeError) as e:
+                print(f"❌ Mining Jobs: Checkpoint ilegible '{filename}': {e}")
+                continue
+            # Si el servidor se cayó a mitad del trabajo, queda listo para reanudar. Los eventos
+            # 'stage' posteriores al último checkpoint no están contados en last_seq: se salta
+            # un margen para no reutilizar ids que el navegador ya vio
+            if job.status in (PENDING, RUNNING):
+                job.status = INTERRUPTED
+                job.last_seq += _STAGES_PER_TRACTOR * self.max_concurrency
+            self.jobs[job.id] = job
+            self._events[job.id] = deque(maxlen=self.event_history)
+        if self.jobs:
+            print(f"Mining Jobs: {len(self.jobs)} trabajos cargados desde checkpoints.")
+
+    # --- Eventos ---
+
+    def _emit(self, job: MiningJob, event_type: str, **data):
+        job.last_seq += 1
+        event = {"seq": job.last_seq, "type": event_type, "job_id": job.id, "ts": time.time(), **data}
+        # El historial guarda una copia sin los valores extraídos (sólo los suscriptores en directo los reciben)
+        history = self._events.setdefault(job.id, deque(maxlen=self.event_history))
+        history.append({k: v for k, v in event.items() if k != "values"})
+        for queue in self._subscribers.get(job.id, set()):
+            queue.put_nowait(event)
+
+    async def subscribe(self, job_id: str, last_seq: int = 0):
+        """
+        Generador asíncrono de eventos: primero los ya emitidos (después de 'last_seq'),
+        luego los nuevos, hasta que el trabajo termina. Si parte de lo perdido ya salió
+        del historial, empieza con un 'job_status' con el resumen actual.
+        """
+        job = self.jobs[job_id]
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            history = list(self._events.get(job_id, []))
+            if history and history[0]["seq"] > last_seq + 1:
+                yield {"seq": last_seq, "type": "job_status", "job_id": job_id, "ts": time.time(), **job.summary()}
+            finished = False
+            for event in history:
+                if event["seq"] > last_seq:
+                    yield event
+                    last_seq = event["seq"]
+                    finished = event["type"] == "job_status" and event["status"] in FINISHED_STATES
+
+            if job.status in FINISHED_STATES and job_id not in self._tasks:
+                # Sin el cierre en el historial (ej: trabajo cargado de un checkpoint), se envía el resumen
+                if not finished:
+                    yield {"seq": last_seq, "type": "job_status", "job_id": job_id, "ts": time.time(), **job.summary()}
+                return
+
+            while True:
+                event = await queue.get()
+                if event["seq"] <= last_seq:
+                    continue
+                yield event
+                last_seq = event["seq"]
+                if event["type"] == "job_status" and event["status"] in FINISHED_STATES:
+                    return
+        finally:
+            self._subscribers[job_id].discard(queue)
+
+    # --- Ciclo de vida de los trabajos ---
+
+    def submit(self, tractors: list[dict], variable_names: list[str]) -> MiningJob:
+        validas, invalidas = valid_variables(variable_names)
+        if invalidas:
+            print(f"ADVERTENCIA: Variables no válidas ignoradas en el trabajo: {invalidas}")
+
+        job = MiningJob(id=uuid.uuid4().hex[:12], tractors=tractors, variable_names=validas)
+        self.jobs[job.id] = job
+        self._events[job.id] = deque(maxlen=self.event_history)
+        self._save_checkpoint(job)
+        self._start(job)
+        return job
+
+    def resume(self, job_id: str) -> MiningJob:
+        job = self.jobs[job_id]
+        if job_id not in self._tasks:
+            print(f"Mining Jobs: Reanudando trabajo {job_id} ({len(job.pending_tractors())} tractores pendientes).")
+            self._start(job)
+        return job
+
+    async def cancel(self, job_id: str) -> MiningJob:
+        job = self.jobs[job_id]
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        return job
+
+    async def shutdown(self):
+        """
+        Cancela los trabajos en curso guardando su checkpoint (se podrán reanudar).
+        Quedan como INTERRUPTED, y ése es también el estado que reciben los suscriptores.
+        """
+        self._shutting_down = True
+        for job_id in list(self._tasks):
+            await self.cancel(job_id)
+
+    def _start(self, job: MiningJob):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks[job.id] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: MiningJob):
+        job.status = RUNNING
+        self._emit(job, "job_status", **job.summary())
+        await self._save_checkpoint_async(job) # Después de emitir: el checkpoint incluye su 'seq'
+
+        # Pool acotado de workers sobre una cola con los tractores pendientes
+        queue: asyncio.Queue = asyncio.Queue()
+        for tractor in job.pending_tractors():
+            queue.put_nowait(tractor)
+
+        async def worker():
+            while True:
+                try:
+                    tractor = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                async with self._semaphore:
+                    await self._process_tractor(job, tractor)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_concurrency, queue.qsize()))]
+        try:
+            await asyncio.gather(*workers)
+            job.status = COMPLETED
+        except asyncio.CancelledError:
+            for w in workers:
+                w.cancel()
+            job.status = INTERRUPTED if self._shutting_down else CANCELLED
+            raise
+        finally:
+            self._tasks.pop(job.id, None)
+            self._emit(job, "job_status", **job.summary())
+            await self._save_checkpoint_async(job)
+            print(f"Mining Jobs: Trabajo {job.id} terminó con estado '{job.status}'.")
+
+    async def _process_tractor(self, job: MiningJob, tractor: dict):
+        model_key = MiningJob.tractor_key(tractor)
+        url = tractor.get("url")
+
+        try:
+            # 1. Búsqueda (sólo si no nos dieron la URL)
+            if not url:
+                self._emit(job, "stage", tractor=model_key, stage="search")
+                query = f"{model_key} technical specs tractordata"
+                url = await search_google_free(query)
+                if not url:
+                    raise LookupError("No se encontró una ficha técnica fiable.")
+
+            # 2. Scrapeo
+            self._emit(job, "stage", tractor=model_key, stage="scrape", url=url)
+            page = await scrape_page(url)
+            if not page:
+                raise LookupError("No se pudo scrapear el contenido de la URL.")
+
+            # 3. Extracción (adaptador del sitio + LLM)
+            self._emit(job, "stage", tractor=model_key, stage="extract")
+            encontrados, _ = await extract_page_values(page, job.variable_names)
+
+            # 4. Guardado (una transacción por tractor)
+            if encontrados:
+                self._emit(job, "stage", tractor=model_key, stage="store")
+                await run_in_threadpool(self._store, model_key, tractor.get("company"), encontrados)
+
+            job.results[model_key] = {"status": "done", "extracted": len(encontrados), "url": url}
+            self._emit(job, "tractor_done", tractor=model_key, url=url, extracted=len(encontrados), values=encontrados)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Mining Jobs: Falló '{model_key}' en el trabajo {job.id}: {e}")
+            job.results[model_key] = {"status": "failed", "extracted": 0, "url": url, "error": str(e)}
+            self._emit(job, "tractor_failed", tractor=model_key, error=str(e))
+
+        await self._save_checkpoint_async(job)
+
+    @staticmethod
+    def _store(tractor_model: str, company: str | None, encontrados: dict[str, str]):
+        db = SessionLocal()
+        try:
+            store_tractor_values(db, tractor_model, company, encontrados)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Instancia única del gestor de trabajos
+mining_jobs = MiningJobManager(directory=MINING_JOBS_DIR, max_concurrency=MINING_MAX_CONCURRENCY)
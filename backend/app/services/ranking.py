@@ -0,0 +1,224 @@
+import math
+from typing import Any, NamedTuple
+
+import numpy as np
+from sqlalchemy import Boolean, Float, Integer, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.filters import FilterSpec, apply_sql
+from app.database.models import Tractor
+
+# --- Ranking multicriterio y frontera de Pareto (/tractors/rank) ---
+# El comprador elige objetivos ("más potencia", "menos peso", "más caudal") con un peso cada uno.
+# Sobre los tractores que cumplen los filtros y tienen TODOS los objetivos:
+#   - score: media ponderada de cada objetivo normalizado a [0, 1] (1 = el mejor del conjunto),
+#   - Pareto: los tractores que ningún otro supera en todos los objetivos a la vez.
+# Todo con arrays NumPy: lo usan el snapshot y el motor SQL (que sólo trae las columnas pedidas).
+
+
+class Objective(NamedTuple):
+    column: str
+    direction: str # "max" | "min"
+    weight: float
+
+    def __str__(self) -> str:
+        return f"{self.column}:{self.direction}:{self.weight:g}"
+
+
+_tractor_table = Tractor.__table__
+
+# Columnas numéricas de 'Tractor' que pueden ser objetivo (no el id ni los booleanos)
+RANK_COLUMNS = tuple(
+    column.name for column in _tractor_table.columns
+    if isinstance(column.type, (Float, Integer)) and not isinstance(column.type, Boolean) and not column.primary_key
+)
+
+
+def parse_objectives(objectives: str, max_objectives: int) -> tuple[Objective, ...]:
+    """
+    'rated_power_net_kw:max:3,shipping_weight_kg:min' -> objetivos (peso 1 si se omite).
+    Lanza ValueError si el formato, la columna, la dirección o el peso no son válidos.
+    """
+    parsed: dict[str, Objective] = {}
+    for part in (p.strip() for p in objectives.split(",")):
+        if not part:
+            continue
+        pieces = part.split(":")
+        if len(pieces) not in (2, 3):
+            raise ValueError(f"Objetivo '{part}' inválido: usa 'columna:max|min[:peso]'")
+        column, direction = pieces[0], pieces[1].lower()
+        if column not in RANK_COLUMNS:
+            raise ValueError(f"Columna '{column}' no es numérica. Válidas: {', '.join(RANK_COLUMNS)}")
+        if direction not in ("max", "min"):
+            raise ValueError(f"Dirección '{pieces[1]}' inválida en '{part}': usa 'max' o 'min'")
+        try:
+            weight = float(pieces[2]) if len(pieces) == 3 else 1.0
+        except ValueError:
+            raise ValueError(f"Peso '{pieces[2]}' inválido en '{part}'")
+        if not (math.isfinite(weight) and weight > 0):
+            raise ValueError(f"El peso de '{column}' debe ser un número finito mayor que 0")
+        parsed[column] = Objective(column, direction, weight)
+    if not parsed:
+        raise ValueError("Indica al menos un objetivo (ej: 'rated_power_net_kw:max,shipping_weight_kg:min')")
+    if len(parsed) > max_objectives:
+        raise ValueError(f"Como mucho {max_objectives} objetivos")
+    return tuple(parsed.values())
+
+
+def objective_signature(objectives: tuple[Objective, ...]) -> str:
+    """
+    Firma canónica (orden alfabético): el mismo conjunto de objetivos comparte entrada de caché.
+    """
+    return ",".join(sorted(str(o) for o in objectives))
+
+
+async def sql_objective_values(db: AsyncSession, filters: list[tuple[FilterSpec, Any]], columns: tuple[str, ...]):
+    """
+    Motor SQL: sólo id, marca, modelo y las columnas de los objetivos de las filas filtradas.
+    Devuelve lo mismo que TractorSnapshot.objective_values.
+    """
+    stmt = apply_sql(select(Tractor.id, Tractor.company, Tractor.model, *[_tractor_table.c[c] for c in columns]), filters)
+    rows = (await db.execute(stmt)).all()
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    names = [(row[1], row[2]) for row in rows]
+    values = np.array(
+        [[np.nan if v is None else float(v) for v in row[3:]] for row in rows], dtype=np.float64
+    ).reshape(len(rows), len(columns))
+    return ids, names, values
+
+
+# Candidatos que se confirman a la vez en la eliminación por bloques (>2 objetivos)
+_PARETO_BATCH = 32
+
+
+def _dominated_by(columns: np.ndarray, point: np.ndarray) -> np.ndarray:
+    """
+    Columnas de 'columns' (objetivos x puntos) a las que 'point' domina: <= en todo y < en alguno.
+    Un vector 1-D por objetivo: mucho más rápido que reducir sobre un eje de 2-4 elementos.
+    """
+    not_better = columns[0] >= point[0]
+    worse = columns[0] > point[0]
+    for j in range(1, len(point)):
+        not_better &= columns[j] >= point[j]
+        worse |= columns[j] > point[j]
+    return not_better & worse
+
+
+def pareto_front(costs: np.ndarray) -> np.ndarray:
+    """
+    Máscara de los puntos no dominados (menor coste = mejor en todas las columnas).
+    Dos puntos idénticos no se dominan: o están los dos en la frontera o ninguno.
+      - 2 objetivos: ordenar por el primero y quedarse con los que mejoran el mínimo
+        acumulado del segundo, O(n log n).
+      - Más objetivos: eliminación por bloques. En orden de suma creciente sólo un punto
+        anterior puede dominar a otro, así que el frente de cada lote de candidatos es
+        definitivo y de una pasada descarta todo lo que domina. O(n · tamaño del frente).
+    """
+    n, k = costs.shape
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    if k == 1:
+        return costs[:, 0] == costs[:, 0].min()
+
+    if k == 2:
+        order = np.lexsort((costs[:, 1], costs[:, 0]))
+        first, second = costs[order, 0], costs[order, 1]
+        best_before = np.minimum.accumulate(np.concatenate(([np.inf], second[:-1])))
+        sorted_front = second < best_before
+        # Los repetidos (consecutivos tras ordenar) heredan el resultado del primero de su grupo
+        repeated = np.concatenate(([False], (first[1:] == first[:-1]) & (second[1:] == second[:-1])))
+        group = np.cumsum(~repeated) - 1
+        sorted_front = sorted_front[~repeated][group]
+        front = np.empty(n, dtype=bool)
+        front[order] = sorted_front
+        return front
+
+    order = np.argsort(costs.sum(axis=1), kind="stable")
+    columns = np.ascontiguousarray(costs[order].T) # objetivos x puntos
+    survivors = order
+    confirmed = 0 # columns[:, :confirmed] ya son frontera
+    while confirmed < columns.shape[1]:
+        batch = columns[:, confirmed:confirmed + _PARETO_BATCH]
+        in_front = np.ones(batch.shape[1], dtype=bool)
+        for q in range(batch.shape[1]):
+            in_front &= ~_dominated_by(batch, batch[:, q])
+        rest = columns[:, confirmed + batch.shape[1]:]
+        dominated = np.zeros(rest.shape[1], dtype=bool)
+        for q in np.flatnonzero(in_front):
+            dominated |= _dominated_by(rest, batch[:, q])
+        keep = np.concatenate([np.ones(confirmed, dtype=bool), in_front, ~dominated])
+        columns, survivors = columns[:, keep], survivors[keep]
+        confirmed += int(in_front.sum())
+    front = np.zeros(n, dtype=bool)
+    front[survivors] = True
+    return front
+
+
+def rank(
+    ids: np.ndarray,
+    names: list[tuple[str | None, str]],
+    values: np.ndarray,
+    objectives: tuple[Objective, ...],
+    limit: int,
+    pareto_limit: int,
+) -> dict:
+    """
+    Args:
+        ids, names: id y (company, model) de cada tractor filtrado.
+        values: matriz n x objetivos (NaN = dato que falta).
+
+    Returns:
+        {"total", "complete", "objectives", "top": [...], "pareto_count", "pareto": [...]}
+    """
+    complete = ~np.isnan(values).any(axis=1)
+    positions = np.flatnonzero(complete)
+    matrix = values[positions]
+    result = {
+        "total": len(ids),
+        "complete": len(positions),
+        "objectives": [o._asdict() for o in objectives],
+        "top": [],
+        "pareto_count": 0,
+        "pareto": [],
+    }
+    if not len(positions):
+        return result
+
+    # Costes (menor = mejor): los objetivos 'max' cambian de signo
+    maximize = np.array([o.direction == "max" for o in objectives])
+    costs = np.where(maximize, -matrix, matrix)
+
+    # Beneficio normalizado a [0, 1] en el conjunto: 1 = mejor valor, 0 = peor
+    lo, hi = costs.min(axis=0), costs.max(axis=0)
+    benefit = (hi - costs) / np.where(hi > lo, hi - lo, 1.0)
+    benefit[:, hi == lo] = 1.0 # Todos iguales en ese objetivo
+    weights = np.array([o.weight for o in objectives])
+    weights = weights / weights.max() # Sólo cuentan las proporciones; pesos enormes no desbordan la suma
+    scores = benefit @ weights / weights.sum()
+
+    on_front = pareto_front(costs)
+
+    def entry(i: int) -> dict:
+        position = positions[i]
+        company, model = names[position]
+        return {
+            "id": int(ids[position]),
+            "company": company,
+            "model": model,
+            "score": round(float(scores[i]), 4),
+            "pareto": bool(on_front[i]),
+            "values": {o.column: _plain(o.column, values[position, j]) for j, o in enumerate(objectives)},
+        }
+
+    # Orden: score descendente, desempate por id (estable entre motores)
+    order = np.lexsort((ids[positions], -scores))
+    front_order = order[on_front[order]]
+    result["top"] = [entry(i) for i in order[:limit]]
+    result["pareto_count"] = int(on_front.sum())
+    result["pareto"] = [entry(i) for i in front_order[:pareto_limit]]
+    return result
+
+
+def _plain(column: str, value: float):
+    # Las columnas Integer llegan como float64: se devuelven como enteros (como en /tractors/filter)
+    return int(value) if isinstance(_tractor_table.c[column].type, Integer) else float(value)
@@ -0,0 +1,206 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Any, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import GROQ_REQUESTS_PER_MINUTE, DDG_REQUESTS_PER_MINUTE, RATE_LIMIT_MAX_RETRIES
+
+# --- Limitador de Tasa ---
+# Un token bucket por (proveedor, modelo), compartido por el AnalystAgent,
+# el chat y el buscador. La tasa se adapta sola: baja a la mitad ante un 429
+# (respetando 'Retry-After') y vuelve a subir poco a poco con cada éxito.
+
+# Límite nominal (peticiones/minuto) de cada proveedor
+PROVIDER_LIMITS = {
+    "groq": GROQ_REQUESTS_PER_MINUTE,
+    "duckduckgo": DDG_REQUESTS_PER_MINUTE,
+}
+
+# Ráfaga permitida (tokens acumulables) por proveedor
+PROVIDER_BURST = {
+    "groq": 5,
+    "duckduckgo": 3, # Una búsqueda lanza sus 3 estrategias a la vez
+}
+
+# Adaptación AIMD: disminución multiplicativa, aumento aditivo
+DECREASE_FACTOR = 0.5
+INCREASE_FRACTION = 0.05
+MIN_RATE_FRACTION = 0.1
+
+
+class TokenBucket:
+    """
+    Token bucket seguro entre hilos. Cada petición reserva un token;
+    si no hay, la espera se calcula según la tasa actual.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, burst: int = 1):
+        self.name = name
+        self.max_rate = requests_per_minute / 60.0 # tokens por segundo
+        self.rate = self.max_rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        # Hasta cuándo el proveedor nos pidió no llamar (Retry-After)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.rate_limited = 0
+        self.total_wait_seconds = 0.0
+
+    def _reserve(self) -> float:
+        """
+        Reserva un token y devuelve cuántos segundos hay que esperar para usarlo.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            # Los tokens pueden quedar negativos: son reservas en cola
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            wait = max(wait, self.blocked_until - now)
+
+            self.acquired += 1
+            self.total_wait_seconds += wait
+            return wait
+
+    def acquire(self):
+        """
+        Versión bloqueante (para código síncrono que ya corre en un hilo).
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * INCREASE_FRACTION)
+
+    def on_rate_limited(self, retry_after: float | None = None):
+        with self._lock:
+            now = time.monotonic()
+            self.rate_limited += 1
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate * DECREASE_FACTOR)
+            self.tokens = min(self.tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.blocked_until = max(self.blocked_until, now + pause)
+        print(f"Rate Limiter [{self.name}]: 429 recibido. Nueva tasa: {self.rate * 60:.1f}/min, pausa de {pause:.1f}s.")
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "rate_per_minute": round(self.rate * 60, 2),
+            "max_rate_per_minute": round(self.max_rate * 60, 2),
+            "acquired": self.acquired,
+            "rate_limited": self.rate_limited,
+            "total_wait_seconds": round(self.total_wait_seconds, 2),
+        }
+
+
+class RateLimiterRegistry:
+    """
+    Un bucket por (proveedor, modelo); se crean bajo demanda.
+    """
+
+    def __init__(self, limits: dict[str, float]):
+        self.limits = limits
+        self._buckets: dict[tuple[str, str | None], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, model: str | None = None) -> TokenBucket:
+        key = (provider, model)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                name = f"{provider}:{model}" if model else provider
+                bucket = TokenBucket(name, self.limits[provider], PROVIDER_BURST.get(provider, 1))
+                self._buckets[key] = bucket
+            return bucket
+
+    def stats(self) -> list[dict]:
+        return [bucket.stats() for bucket in self._buckets.values()]
+
+
+rate_limiters = RateLimiterRegistry(PROVIDER_LIMITS)
+
+
+# --- Detección de errores de límite de tasa ---
+
+_RETRY_IN_RE = re.compile(r"try again in (?:(\d+)m)?([\d.]+)s", re.IGNORECASE)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    429 de Groq/LiteLLM (status_code) o 'Ratelimit' de DuckDuckGo (nombre de la clase).
+    """
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return "ratelimit" in type(error).__name__.lower()
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """
+    Lee 'Retry-After' de la respuesta HTTP del error o, si no viene,
+    el "Please try again in 7.5s" que Groq pone en el mensaje.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+    match = _RETRY_IN_RE.search(str(error))
+    if match:
+        minutes = float(match.group(1) or 0)
+        return minutes * 60 + float(match.group(2))
+    return None
+
+
+def call_with_rate_limit(bucket: TokenBucket, func: Callable[[], Any], max_retries: int = RATE_LIMIT_MAX_RETRIES) -> Any:
+    """
+    Ejecuta 'func' (síncrona) respetando el bucket y reintentando tras un 429.
+    Cualquier otro error se propaga tal cual.
+    """
+    for attempt in range(max_retries + 1):
+        bucket.acquire()
+        try:
+            result = func()
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt >= max_retries:
+                raise
+            bucket.on_rate_limited(retry_after_seconds(e))
+            continue
+        bucket.on_success()
+        return result
+
+
+async def acall_with_rate_limit(bucket: TokenBucket, func: Callable[[], Any], max_retries: int = RATE_LIMIT_MAX_RETRIES) -> Any:
+    """
+    Igual que call_with_rate_limit, pero espera sin bloquear el event loop
+    y ejecuta 'func' (síncrona) en el threadpool.
+    """
+    for attempt in range(max_retries + 1):
+        await bucket.acquire_async()
+        try:
+            result = await run_in_threadpool(func)
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt >= max_retries:
+                raise
+            bucket.on_rate_limited(retry_after_seconds(e))
+            continue
+        bucket.on_success()
+        return result
@@ -0,0 +1,162 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from urllib.parse import quote
+
+from fastapi import Request, Response
+
+from app.config import RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_MB
+from app.database.versioning import catalog_version
+
+# --- Caché de respuestas de lectura + GET condicional (ETag / 304) ---
+# /tractors/filter y /generate-pdf sólo cambian cuando se escribe en 'tractors'.
+# La clave incluye la versión del catálogo (database/versioning.py): tras una escritura
+# las entradas viejas dejan de encontrarse y salen solas por LRU.
+# El ETag es el hash del cuerpo (fuerte): si al recalcular sale el mismo contenido,
+# el cliente sigue recibiendo 304 aunque la versión haya cambiado.
+# El TTL acota lo desactualizado que puede estar un proceso cuando escribe otro.
+
+
+class CachedResponse(NamedTuple):
+    expires_at: float
+    body: bytes
+    etag: str
+    media_type: str
+    headers: dict[str, str]
+
+
+def etag_for(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def matches_if_none_match(request: Request, etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match (RFC 9110): admite listas, '*' y prefijo W/.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def attachment_header(filename: str) -> str:
+    """
+    Content-Disposition de descarga (como FileResponse: filename* si no es ASCII).
+    """
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+class ResponseCache:
+    """
+    Caché en memoria clave -> respuesta serializada, con TTL y LRU acotada por bytes.
+    """
+
+    def __init__(self, ttl_seconds: float, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(endpoint: str, request: Request, *extra: str, exclude: tuple[str, ...] = ()) -> str:
+        """
+        Clave normalizada: endpoint + parámetros ordenados + versión del catálogo.
+        '?b=2&a=1' y '?a=1&b=2' comparten entrada.
+        'exclude': parámetros que la ruta ya normaliza ella misma y pasa en 'extra'.
+        """
+        params = "&".join(
+            f"{k}={v}" for k, v in sorted(request.query_params.multi_items()) if k not in exclude
+        )
+        return "|".join([endpoint, request.url.path, params, *extra, catalog_version.current()])
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= len(entry.body)
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self, key: str, body: bytes, media_type: str, headers: dict[str, str] | None = None, store: bool = True
+    ) -> CachedResponse:
+        """
+        Guarda la respuesta y la devuelve. 'store=False': se sirve pero no se guarda
+        (calculada sobre un snapshot anterior a la versión de la clave).
+        """
+        entry = CachedResponse(
+            expires_at=time.monotonic() + self.ttl_seconds,
+            body=body,
+            etag=etag_for(body),
+            media_type=media_type,
+            headers=headers or {},
+        )
+        if not store or len(body) > self.max_bytes:
+            return entry # Desactualizada o demasiado grande para guardarla, pero se sirve igual
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._total_bytes += len(body)
+            while self._total_bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def respond(self, request: Request, entry: CachedResponse) -> Response:
+        """
+        304 si el cliente ya tiene esta versión, si no la respuesta completa.
+        'no-cache': el navegador guarda la respuesta pero revalida siempre con If-None-Match.
+        """
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if matches_if_none_match(request, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers={**entry.headers, **headers})
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        return removed
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "name": "responses",
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Instancia única de la caché de respuestas
+response_cache = ResponseCache(
+    ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+    max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024
+)
@@ -1,52 +1,105 @@
+import asyncio
+import hashlib
 import httpx
-from bs4 import BeautifulSoup
-from app.config import BROWSER_HEADERS # Importamos los headers desde la config central
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from app.config import SCRAPE_CACHE_DIR, SCRAPE_CACHE_TTL_SECONDS, SCRAPE_CACHE_MAX_MB
+from app.services.disk_cache import DiskCache
+from app.services.http_client import fetch_html, UnsupportedContentType
+from app.services.html_text import html_to_text
+from app.services.site_adapters import extract_structured
 
-async def scrape_url(url: str) -> str | None:
+# --- Caché persistente de páginas (HTML crudo + texto limpio) ---
+scrape_cache = DiskCache(
+    name="scrape",
+    directory=SCRAPE_CACHE_DIR,
+    ttl_seconds=SCRAPE_CACHE_TTL_SECONDS,
+    max_bytes=SCRAPE_CACHE_MAX_MB * 1024 * 1024
+)
+
+# Parámetros de tracking que no cambian el contenido de la página
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+
+def normalize_url(url: str) -> str:
     """
-    Descarga el contenido de una URL y extrae todo el texto visible,
-    eliminando etiquetas de navegación, scripts, y estilos.
+    Normaliza una URL para usarla como clave de caché:
+    esquema y host en minúsculas, sin puerto por defecto, sin fragmento,
+    sin barra final, sin parámetros de tracking y con la query ordenada.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
 
-    Args:
-        url (str): La URL de la cual extraer el contenido.
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _parse_page(url: str, html: str) -> dict:
+    """
+    Trabajo de CPU sobre el HTML: texto limpio + valores estructurados (adaptadores).
+    """
+    clean_text = html_to_text(html)
+    return {
+        "url": url,
+        "html": html,
+        "text": clean_text,
+        "content_hash": hashlib.sha256(clean_text.encode("utf-8")).hexdigest(),
+        "structured": extract_structured(url, html)
+    }
+
+
+async def scrape_page(url: str) -> dict | None:
+    """
+    Descarga (o lee de la caché) una URL y devuelve la página procesada.
 
     Returns:
-        str | None: Un string con el texto limpio de la página, o None si falla.
+        dict | None: {"url", "html", "text", "content_hash", "structured"} o None si falla.
+            'structured' es {variable_name: valor_crudo} según los adaptadores del sitio.
     """
+    cache_key = normalize_url(url)
+    # La caché lee/escribe JSON de hasta SCRAPE_MAX_BYTES en disco: siempre en un hilo
+    cached = await asyncio.to_thread(scrape_cache.get, cache_key)
+    if cached:
+        print(f"Scraper Service: ⚡ Caché HIT para {url[:70]} ({len(cached['text'])} caracteres).")
+        if "structured" not in cached:
+            # Entrada anterior a los adaptadores: la completamos una sola vez
+            cached["structured"] = await asyncio.to_thread(extract_structured, url, cached["html"])
+            await asyncio.to_thread(scrape_cache.set, cache_key, cached)
+        return cached
+
     print(f"Scraper Service: Iniciando scrapeo de {url[:70]}...")
     
     try:
-        # Usamos un cliente asíncrono con timeout
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                url, 
-                headers=BROWSER_HEADERS, 
-                follow_redirects=True # Sigue redirecciones (ej. http a https)
-            )
-            
-            # Lanza un error si la petición no fue exitosa (ej. 404, 500)
-            response.raise_for_status()
-        
-        # 1. Parsear el HTML
-        soup = BeautifulSoup(response.text, "html.parser")
+        # Usamos el cliente compartido (pool de conexiones, límite por host y reintentos)
+        # Descarga en streaming con tope de bytes; aborta si no es HTML
+        # Lanza un error si la petición no fue exitosa (ej. 404, 500)
+        html = await fetch_html(url)
         
-        # 2. Eliminar etiquetas "ruidosas" (scripts, estilos, menús, etc.)
-        tags_to_remove = ["script", "style", "nav", "footer", "header", "aside", "form"]
-        for tag in soup.find_all(tags_to_remove):
-            tag.decompose() # Elimina la etiqueta y su contenido
-            
-        # 3. Extraer el texto restante
-        # Usamos 'separator=" "' para asegurar espacios entre párrafos
-        # y 'strip=True' para limpiar espacios en blanco al inicio/final
-        clean_text = soup.get_text(separator=" ", strip=True)
+        # 1-3. Parsear y limpiar el HTML (CPU) en un hilo, sin bloquear el event loop
+        page = await asyncio.to_thread(_parse_page, url, html)
         
-        if not clean_text:
+        if not page["text"]:
             print(f"Scraper Service: La URL {url} no devolvió texto visible.")
             return None
             
-        print(f"Scraper Service: Scrapeo exitoso. {len(clean_text)} caracteres extraídos.")
-        return clean_text
+        print(f"Scraper Service: Scrapeo exitoso. {len(page['text'])} caracteres extraídos.")
 
+        # 4. Guardar HTML crudo, texto limpio y valores estructurados en la caché
+        await asyncio.to_thread(scrape_cache.set, cache_key, page)
+        return page
+
+    except UnsupportedContentType as e:
+        print(f"Scraper Service: Se omite {url[:70]}: {e}.")
+        return None
     except httpx.HTTPStatusError as e:
         print(f"❌ Scraper Error (HTTP): No se pudo acceder a {url}. Status: {e.response.status_code}")
         return None
@@ -55,4 +108,19 @@ async def scrape_url(url: str) -> str | None:
         return None
     except Exception as e:
         print(f"❌ Scraper Error (Inesperado): Ocurrió un error al procesar {url}. Error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+async def scrape_url(url: str) -> str | None:
+    """
+    Descarga el contenido de una URL y extrae todo el texto visible,
+    eliminando etiquetas de navegación, scripts, y estilos.
+
+    Args:
+        url (str): La URL de la cual extraer el contenido.
+
+    Returns:
+        str | None: Un string con el texto limpio de la página, o None si falla.
+    """
+    page = await scrape_page(url)
+    return page["text"] if page else None
@@ -1,117 +1,291 @@
-from duckduckgo_search import DDGS
-import time
-import random
+import asyncio
 import logging
+import time
+from collections import OrderedDict
+
+from duckduckgo_search import DDGS
+
+from app.config import SEARCH_CACHE_TTL_SECONDS, SEARCH_NEGATIVE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES
+from app.services.rate_limiter import rate_limiters, is_rate_limit_error, retry_after_seconds
+from app.services.url_registry import url_registry, normalize_tokens
 
 # Configuración de logging para ver qué pasa en la terminal
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SearchService")
 
-# --- 🧠 BASE DE CONOCIMIENTO (Tus URLs Maestras) ---
-# Aquí defines los tractores que YA conoces para evitar buscar en Google.
-# ¡Esto es lo que hace que el sistema sea ultra-rápido y fiable!
-KNOWN_TRACTOR_URLS = {
-    # Formato: "modelo en minúsculas": "url exacta"
-    "john deere 6r 110": "https://www.tractordata.com/farm-tractors/011/2/3/11237-john-deere-6r-110.html",
-    "john deere 8r 370": "https://www.tractordata.com/farm-tractors/010/1/1-john-deere-8r-370.html",
-    "fendt 1050 vario": "https://www.tractordata.com/farm-tractors/009/4/9/9499-fendt-1050-vario.html",
-    "new holland t7.190": "https://www.tractordata.com/farm-tractors/009/3/0/9305-new-holland-t7-190.html",
-    # ... ¡Añade aquí todos los tractores de tu lista de tesis! ...
-}
-
-def search_google_free(query: str, max_retries=3) -> str | None:
+# Filtros de Seguridad (Blacklist)
+BLACKLIST = [
+    "zhihu", "facebook", "pinterest", "instagram", "youtube",
+    "tiktok", "twitter", "x.com", "reddit", "quora", "linkedin",
+    "baidu", "zhidao", "amazon", "ebay", "alibaba", "temu",
+    "bilibili", "johnlennon", "spotify", "apple"
+]
+
+BAD_EXTENSIONS = (".pdf", ".doc", ".docx", ".xls", ".xlsx", ".jpg", ".png", ".zip")
+
+
+class SearchCache:
+    """
+    Caché en memoria consulta -> URL con TTL y tamaño acotado (LRU).
+    También guarda los resultados negativos (None) con un TTL más corto,
+    para no repetir una búsqueda web que acaba de fallar.
+    """
+
+    def __init__(self, ttl_seconds: float, negative_ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        # clave -> (expira_en, url | None)
+        self._entries: "OrderedDict[str, tuple[float, str | None]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> tuple[bool, str | None]:
+        """
+        Returns:
+            (encontrado, url): url puede ser None si es un resultado negativo vigente.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        if entry[1] is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return True, entry[1]
+
+    def set(self, key: str, url: str | None):
+        ttl = self.ttl_seconds if url else self.negative_ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, url)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.negative_hits + self.misses
+        return {
+            "name": "search",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / total, 4) if total else 0.0,
+        }
+
+
+search_cache = SearchCache(
+    ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=SEARCH_NEGATIVE_TTL_SECONDS,
+    max_entries=SEARCH_CACHE_MAX_ENTRIES
+)
+
+
+class _InflightSearch:
+    """
+    Búsqueda web en curso, compartida por todas las peticiones con la misma clave.
+    Corre en su propia tarea: cancelar a quien la lanzó no la cancela para los demás.
+    """
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+# Búsquedas web en curso por clave: dos peticiones iguales comparten el resultado
+_inflight: dict[str, _InflightSearch] = {}
+
+
+def _ddg_text(strategy: str) -> list[dict]:
+    """
+    Llamada bloqueante a DuckDuckGo (se ejecuta en un hilo).
+    """
+    with DDGS() as ddgs:
+        # region='wt-wt' (Global)
+        return list(ddgs.text(strategy, region='wt-wt', max_results=8))
+
+
+def _accept_result(res: dict, clean_query: str) -> bool:
+    url = res['href']
+    title = res['title']
+    url_lower = url.lower()
+    title_lower = title.lower()
+
+    # A. Filtro de Dominio
+    if any(blocked in url_lower for blocked in BLACKLIST):
+        logger.info(f"   Saltando bloqueado: {url}")
+        return False
+
+    # B. Filtro de Idioma (.cn, .ru)
+    if ".cn" in url_lower or "/cn/" in url_lower or ".ru" in url_lower:
+        logger.info(f"   Saltando región: {url}")
+        return False
+
+    # C. Filtro de Archivos
+    if url_lower.endswith(BAD_EXTENSIONS):
+        logger.info(f"   Saltando archivo: {url}")
+        return False
+
+    # D. Validación de Relevancia
+    # ¿El resultado menciona al menos parte de lo que buscamos?
+    keywords = clean_query.lower().split()
+    significant_keywords = [k for k in keywords if len(k) > 2] # Ignora palabras cortas
+
+    if significant_keywords and not any(k in title_lower or k in url_lower for k in significant_keywords):
+        logger.info(f"   Saltando irrelevante: {title}")
+        return False
+
+    return True
+
+
+async def _run_strategy(strategy: str, clean_query: str) -> tuple[str | None, bool]:
+    """
+    Ejecuta una estrategia (hasta 2 intentos).
+
+    Returns:
+        (primera URL aceptable o None, si alguna búsqueda llegó a responder).
+        Si todos los intentos fallaron (error, 429) no hay respuesta: el None no es definitivo.
+    """
+    # Límite de tasa compartido para DuckDuckGo (en lugar de pausas fijas)
+    ddg_bucket = rate_limiters.get("duckduckgo")
+    logger.info(f"🔎 Probando estrategia web: '{strategy}'")
+    completed = False
+
+    for attempt in range(2):
+        try:
+            await ddg_bucket.acquire_async()
+            results = await asyncio.to_thread(_ddg_text, strategy)
+            ddg_bucket.on_success()
+            completed = True
+
+            if not results:
+                logger.warning(f"   Intento {attempt+1}: Sin resultados para '{strategy}'.")
+                continue
+
+            for res in results:
+                if _accept_result(res, clean_query):
+                    return res['href'], True
+            return None, True
+
+        except Exception as e:
+            logger.error(f"   Error en búsqueda web (intento {attempt+1}): {e}")
+            if is_rate_limit_error(e):
+                ddg_bucket.on_rate_limited(retry_after_seconds(e))
+
+    return None, completed
+
+
+async def _race_strategies(clean_query: str) -> tuple[str | None, bool]:
+    """
+    Lanza todas las estrategias a la vez: la primera URL aceptable gana
+    y las demás se cancelan.
+
+    Returns:
+        (url o None, si alguna estrategia llegó a completar una búsqueda).
+    """
+    search_strategies = [
+        f"site:tractordata.com {clean_query}",
+        f"site:deere.com OR site:cnhindustrial.com OR site:fendt.com OR site:specs-auto.com {clean_query} specs",
+        f"{clean_query} tractor technical specifications"
+    ]
+
+    tasks = [asyncio.create_task(_run_strategy(s, clean_query)) for s in search_strategies]
+    completed = False
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            url, done = await next_done
+            if url:
+                return url, True
+            completed = completed or done
+        return None, completed
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def search_google_free(query: str) -> str | None:
     """
     Busca en DuckDuckGo y devuelve la primera URL válida.
-    PRIORIDAD 1: Revisa la lista KNOWN_TRACTOR_URLS.
-    PRIORIDAD 2: Busca en internet filtrando basura (China, Redes Sociales, etc).
+    PRIORIDAD 1: Revisa la base de conocimiento (tabla 'source_urls').
+    PRIORIDAD 2: Caché de búsquedas recientes (incluye las que no encontraron nada).
+    PRIORIDAD 3: Busca en internet (estrategias en paralelo) filtrando basura (China, Redes Sociales, etc).
     """
-    
+
     # 1. Limpieza de la query
     clean_query = query.replace("specs tractordata", "").replace("site:tractordata.com", "").strip()
-    query_lower = clean_query.lower()
-    
+    cache_key = " ".join(normalize_tokens(clean_query))
+
     logger.info(f"Buscando recurso para: '{clean_query}'")
-    
+
     # 2. ⚡ ESTRATEGIA "MEMORIA FOTOGRÁFICA" (Bypass)
-    # Si el modelo está en nuestra lista, devolvemos la URL guardada inmediatamente.
-    for model_key, known_url in KNOWN_TRACTOR_URLS.items():
-        # Verificamos si 'john deere 6r 110' está dentro de la búsqueda del usuario
-        if model_key in query_lower:
-            logger.info(f"🚀 [Memoria] URL conocida encontrada para '{model_key}': {known_url}")
-            return known_url
+    # Si el modelo ya está registrado, devolvemos la URL guardada inmediatamente.
+    # Busca 'john deere 6r 110' entre los tokens de la consulta (sin recorrer toda la lista)
+    known = await asyncio.to_thread(url_registry.lookup, clean_query)
+    if known:
+        model_key, known_url = known
+        logger.info(f"🚀 [Memoria] URL conocida encontrada para '{model_key}': {known_url}")
+        return known_url
+
+    # 3. Caché de búsquedas web recientes (incluye las que no encontraron nada)
+    found, cached_url = search_cache.get(cache_key)
+    if found:
+        logger.info(f"⚡ [Caché] '{clean_query}' -> {cached_url}")
+        return cached_url
 
     # --- Si llegamos aquí, es un tractor nuevo. Iniciamos búsqueda web ---
 
-    # 3. Estrategias de búsqueda Web
-    search_strategies = [
-        f"site:tractordata.com {clean_query}",
-        f"site:deere.com OR site:cnhindustrial.com OR site:fendt.com OR site:specs-auto.com {clean_query} specs",
-        f"{clean_query} tractor technical specifications"
-    ]
+    # Si ya hay una búsqueda web idéntica en curso, esperamos su resultado
+    search = _inflight.get(cache_key)
+    if search is None:
+        search = _InflightSearch(asyncio.create_task(_search_web(clean_query, cache_key)))
+        _inflight[cache_key] = search
 
-    # 4. Filtros de Seguridad (Blacklist)
-    BLACKLIST = [
-        "zhihu", "facebook", "pinterest", "instagram", "youtube", 
-        "tiktok", "twitter", "x.com", "reddit", "quora", "linkedin", 
-        "baidu", "zhidao", "amazon", "ebay", "alibaba", "temu", 
-        "bilibili", "johnlennon", "spotify", "apple"
-    ]
-    
-    BAD_EXTENSIONS = (".pdf", ".doc", ".docx", ".xls", ".xlsx", ".jpg", ".png", ".zip")
+    search.waiters += 1
+    try:
+        # shield: una cancelación (ej: se canceló un trabajo de minería) sólo corta esta espera
+        return await asyncio.shield(search.task)
+    except asyncio.CancelledError:
+        # Si nadie más la espera, la búsqueda tampoco sirve: se cancela y se retira
+        if search.waiters == 1 and not search.task.done():
+            search.task.cancel()
+            if _inflight.get(cache_key) is search:
+                del _inflight[cache_key]
+        raise
+    finally:
+        search.waiters -= 1
 
-    with DDGS() as ddgs:
-        for strategy in search_strategies:
-            logger.info(f"🔎 Probando estrategia web: '{strategy}'")
-            
-            for attempt in range(2):
-                try:
-                    # region='wt-wt' (Global)
-                    results = list(ddgs.text(strategy, region='wt-wt', max_results=8))
-                    
-                    if not results:
-                        logger.warning(f"   Intento {attempt+1}: Sin resultados.")
-                        time.sleep(random.uniform(1, 2))
-                        continue
-
-                    for res in results:
-                        url = res['href']
-                        title = res['title']
-                        url_lower = url.lower()
-                        title_lower = title.lower()
-                        
-                        # A. Filtro de Dominio
-                        if any(blocked in url_lower for blocked in BLACKLIST):
-                            logger.info(f"   Saltando bloqueado: {url}")
-                            continue
-
-                        # B. Filtro de Idioma (.cn, .ru)
-                        if ".cn" in url_lower or "/cn/" in url_lower or ".ru" in url_lower:
-                             logger.info(f"   Saltando región: {url}")
-                             continue
-
-                        # C. Filtro de Archivos
-                        if url_lower.endswith(BAD_EXTENSIONS):
-                            logger.info(f"   Saltando archivo: {url}")
-                            continue
-
-                        # D. Validación de Relevancia
-                        # ¿El resultado menciona al menos parte de lo que buscamos?
-                        keywords = clean_query.lower().split()
-                        significant_keywords = [k for k in keywords if len(k) > 2] # Ignora palabras cortas
-                        
-                        if significant_keywords and not any(k in title_lower or k in url_lower for k in significant_keywords):
-                             logger.info(f"   Saltando irrelevante: {title}")
-                             continue
-
-                        # ¡URL Válida!
-                        logger.info(f"✅ URL WEB ACEPTADA: {url}")
-                        return url
-                    
-                except Exception as e:
-                    logger.error(f"   Error en búsqueda web (intento {attempt+1}): {e}")
-                    time.sleep(2)
-            
-            logger.info("   Estrategia fallida, pasando a la siguiente...")
-
-    logger.error("❌ Fallaron todas las estrategias. No se encontró una URL válida.")
-    return None
\ No newline at end of file
+
+async def _search_web(clean_query: str, cache_key: str) -> str | None:
+    """
+    Búsqueda web compartida: estrategias en paralelo, caché y base de conocimiento.
+    Un error se propaga tal cual a todas las peticiones que la esperan.
+    """
+    try:
+        # 4. Estrategias de búsqueda Web (en paralelo)
+        url, completed = await _race_strategies(clean_query)
+    finally:
+        search = _inflight.get(cache_key)
+        if search is not None and search.task is asyncio.current_task():
+            del _inflight[cache_key]
+
+    if not url:
+        if not completed:
+            # Ninguna búsqueda respondió (errores, 429): un corte pasajero no se cachea como "no existe"
+            logger.error("❌ Todas las estrategias fallaron con error. No se guarda en caché.")
+            return None
+        search_cache.set(cache_key, None)
+        logger.error("❌ Fallaron todas las estrategias. No se encontró una URL válida.")
+        return None
+
+    search_cache.set(cache_key, url)
+
+    # ¡URL Válida! La guardamos para no volver a buscarla
+    logger.info(f"✅ URL WEB ACEPTADA: {url}")
+    try:
+        await asyncio.to_thread(url_registry.remember, clean_query, url)
+    except Exception as e:
+        logger.error(f"   No se pudo guardar la URL en la base de conocimiento: {e}")
+    return url
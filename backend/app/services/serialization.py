@@ -0,0 +1,66 @@
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError: # orjson es opcional: sin él usamos el json de la librería estándar
+    HAS_ORJSON = False
+
+from app.database.schemas import TRACTOR_FIELDS
+
+# --- Serialización rápida de listas de tractores ---
+# Las filas (dicts de la BD o del snapshot) ya tienen los tipos de TractorPublic:
+# se proyectan a los campos pedidos y van directo al encoder, sin validar un
+# modelo Pydantic de ~110 campos por fila.
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def dumps(obj) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def project(row: dict, fields: tuple[str, ...] | None) -> dict:
+    """
+    Fila -> dict con los campos del schema público (en su orden), o sólo los pedidos.
+    """
+    return {name: row.get(name) for name in (fields or TRACTOR_FIELDS)}
+
+
+def rows_to_json(rows: Iterable[dict], fields: tuple[str, ...] | None = None) -> bytes:
+    """
+    Lista JSON completa ('[{...},{...}]').
+    """
+    return dumps([project(row, fields) for row in rows])
+
+
+def iter_ndjson(rows: Iterable[dict], fields: tuple[str, ...] | None = None, batch_size: int = 200) -> Iterator[bytes]:
+    """
+    Una línea JSON por tractor. Agrupa 'batch_size' líneas por trozo enviado
+    para no pagar una escritura de socket por fila.
+    """
+    batch = []
+    for row in rows:
+        batch.append(dumps(project(row, fields)))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+async def aiter_ndjson(rows: AsyncIterable[dict], fields: tuple[str, ...] | None = None, batch_size: int = 200) -> AsyncIterator[bytes]:
+    """
+    Igual que iter_ndjson, para filas que llegan de un cursor asíncrono de la BD.
+    """
+    batch = []
+    async for row in rows:
+        batch.append(dumps(project(row, fields)))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
@@ -0,0 +1,123 @@
+import warnings
+from typing import NamedTuple
+
+import numpy as np
+
+# --- "Tractores parecidos": k vecinos más cercanos sobre las especificaciones ---
+# Cada tractor es un vector de especificaciones numéricas estandarizadas (z-score).
+# El catálogo tiene muchos huecos, así que un KD-tree (que no admite NaN) no sirve:
+# la distancia se calcula sólo sobre las especificaciones que tienen los DOS tractores,
+# con todas las filas a la vez (unos pocos productos matriz-vector de NumPy).
+
+
+class SimilarityFeature(NamedTuple):
+    columns: tuple[str, ...] # Varias columnas = la primera no nula (como en los filtros)
+    weight: float
+
+
+SIMILARITY_FEATURES: list[SimilarityFeature] = [
+    # --- Motor ---
+    SimilarityFeature(("rated_power_net_kw",), 3.0),
+    SimilarityFeature(("max_power_gross_kw",), 2.0),
+    SimilarityFeature(("torque_nm",), 2.0),
+    SimilarityFeature(("displacement_l",), 1.0),
+    SimilarityFeature(("numero_de_cilindros_num",), 0.5),
+    SimilarityFeature(("rated_rpm_num",), 0.5),
+    # --- Transmisión ---
+    SimilarityFeature(("cambios_adelante",), 0.5),
+    SimilarityFeature(("cambios_atras",), 0.5),
+    # --- Hidráulica y enganche ---
+    SimilarityFeature(("pump_flow_lpm",), 1.0),
+    SimilarityFeature(("pressure_bar",), 0.5),
+    SimilarityFeature(("rear_lift_capacity_kg",), 1.0),
+    # --- Dimensiones y peso ---
+    SimilarityFeature(("shipping_weight_kg",), 2.0),
+    SimilarityFeature(("ballasted_weight_kg",), 1.0),
+    SimilarityFeature(("wheelbase_m",), 1.0),
+    SimilarityFeature(("length_m",), 0.5),
+    SimilarityFeature(("width_m",), 0.5),
+    SimilarityFeature(("height_rops_m", "height_m"), 0.5),
+    # --- Combustible ---
+    SimilarityFeature(("fuel_tank_capacity_l",), 0.5),
+]
+
+# Un vecino debe compartir al menos esta fracción del peso de las especificaciones
+# que tiene el tractor consultado (si no, dos tractores casi vacíos "se parecerían")
+MIN_SHARED_WEIGHT = 0.5
+
+
+class FeatureIndex:
+    """
+    Matriz estandarizada de una versión del catálogo, lista para consultas k-NN.
+
+    Para la consulta q y cada fila r, sobre las especificaciones f que tienen ambos:
+        distancia(q, r) = sqrt( sum_f w_f (z_rf - z_qf)^2 / sum_f w_f )
+    es decir, el error cuadrático medio ponderado en desviaciones típicas.
+    Desarrollando el cuadrado, todas las filas salen de UN producto matriz-matriz sobre
+    [Z^2 | Z | M] en float32 (la mitad de memoria que leer); los mejores candidatos se
+    recalculan después en float64 sin desarrollar, así que el orden final es exacto.
+    """
+
+    def __init__(self, ids: np.ndarray, columns: list[np.ndarray]):
+        self.ids = ids
+        self.weights = np.array([feature.weight for feature in SIMILARITY_FEATURES], dtype=np.float64)
+        raw = np.column_stack(columns) if columns else np.empty((len(ids), 0))
+        present = ~np.isnan(raw)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning) # Columnas enteramente vacías: media NaN
+            mean = np.nanmean(raw, axis=0)
+            std = np.nanstd(raw, axis=0)
+        std[~(std > 0)] = 1.0 # Columna constante o vacía: no escala
+        z = np.where(present, (raw - np.nan_to_num(mean)) / std, 0.0)
+
+        self.present = present.astype(np.float64) # M
+        self.z = z # Z (0 donde falta el dato)
+        self._stacked = np.hstack([z * z, z, self.present]).astype(np.float32)
+        self._positions = {int(i): p for p, i in enumerate(ids)}
+
+    def _exact_distances(self, rows: np.ndarray, query_weight: np.ndarray, query_z: np.ndarray) -> np.ndarray:
+        shared = self.present[rows] * query_weight
+        diff = self.z[rows] - query_z
+        return np.sqrt((shared * diff * diff).sum(axis=1) / shared.sum(axis=1))
+
+    def neighbours(self, tractor_id: int, k: int) -> list[tuple[int, float, int]] | None:
+        """
+        Los k tractores más cercanos (sin el propio).
+
+        Returns:
+            [(posición de la fila, distancia, especificaciones compartidas)], o None si el id no existe.
+        """
+        position = self._positions.get(tractor_id)
+        if position is None:
+            return None
+        query_present = self.present[position]
+        query_weight = self.weights * query_present
+        if not query_weight.any():
+            return []
+        query_z = self.z[position]
+
+        # [Z^2 | Z | M] @ [[w_q, 0], [-2 w_q z_q, 0], [w_q z_q^2, w_q]] -> (suma de cuadrados, peso compartido)
+        n = len(self.weights)
+        vectors = np.zeros((3 * n, 2), dtype=np.float32)
+        vectors[:n, 0] = query_weight
+        vectors[n:2 * n, 0] = -2.0 * query_weight * query_z
+        vectors[2 * n:, 0] = query_weight * query_z * query_z
+        vectors[2 * n:, 1] = query_weight
+        squared, shared_weight = (self._stacked @ vectors).T
+
+        eligible = shared_weight >= MIN_SHARED_WEIGHT * query_weight.sum()
+        eligible[position] = False
+        candidates = np.flatnonzero(eligible)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            approximate = np.maximum(squared[candidates], 0.0) / shared_weight[candidates]
+
+        # Margen para el redondeo de float32: se recalculan bastantes más de k
+        pool = max(4 * k, 64)
+        if len(candidates) > pool:
+            candidates = candidates[np.argpartition(approximate, pool - 1)[:pool]]
+        distance = self._exact_distances(candidates, query_weight, query_z)
+        order = np.lexsort((self.ids[candidates], distance))[:k]
+        candidates, distance = candidates[order], distance[order]
+        shared_count = (self.present[candidates] * query_present).sum(axis=1)
+        return [(int(p), float(d), int(c)) for p, d, c in zip(candidates, distance, shared_count)]
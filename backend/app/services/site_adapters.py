@@ -0,0 +1,247 @@
+import json
+import re
+from typing import Callable
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+from app.services.html_text import BS_PARSER
+
+# --- Adaptadores por Sitio ---
+# Muchas fichas técnicas (tractordata.com, fabricantes con JSON-LD) ya vienen
+# estructuradas como filas "etiqueta: valor". Un adaptador las convierte directamente
+# en {variable_name: valor_crudo} y el LLM sólo se usa para lo que falte.
+
+SiteAdapter = Callable[[BeautifulSoup], dict[str, str]]
+
+# dominio -> adaptador
+_ADAPTERS: dict[str, SiteAdapter] = {}
+
+
+def register_adapter(*domains: str):
+    """
+    Decorador para registrar un adaptador para uno o varios dominios
+    (también aplica a sus subdominios, ej: 'www.tractordata.com').
+    """
+    def decorator(func: SiteAdapter) -> SiteAdapter:
+        for domain in domains:
+            _ADAPTERS[domain.lower()] = func
+        return func
+    return decorator
+
+
+def get_adapter(url: str) -> SiteAdapter | None:
+    host = (urlsplit(url).hostname or "").lower()
+    while host:
+        if host in _ADAPTERS:
+            return _ADAPTERS[host]
+        # Subimos un nivel: 'www.tractordata.com' -> 'tractordata.com'
+        host = host.partition(".")[2]
+    return None
+
+
+def _normalize_label(label: str) -> str:
+    """
+    'Rear lift (at ends):' -> 'rear lift at ends'
+    """
+    label = label.lower().replace("\xa0", " ")
+    label = re.sub(r"[^a-z0-9]+", " ", label)
+    return label.strip()
+
+
+def _cell_text(cell) -> str:
+    return " ".join(cell.get_text(separator=" ", strip=True).split())
+
+
+# --- Mapeo etiqueta -> columna del modelo 'Tractor' ---
+# Las claves son etiquetas normalizadas. Las etiquetas ambiguas ("Volts", "Pressure",
+# "Front axle"...) sólo se aceptan como tupla (sección, etiqueta): fuera de su sección
+# se ignoran y la variable queda para el LLM. No se mapean "Engine:" (descripción completa
+# del motor, no la marca), "Drive" ni "Rear PTO:" (el tipo de toma, no sus velocidades).
+TRACTORDATA_LABELS: dict[str | tuple[str, str], str] = {
+    # Engine
+    "cylinders": "numero_de_cilindros",
+    "displacement": "displacement",
+    "compression": "compression_ratio",
+    "compression ratio": "compression_ratio",
+    "emissions": "emission_control",
+    "emission control": "emission_control",
+    "oil capacity": "oil_capacity",
+    "starter volts": "starter_volts",
+    "power gross": "max_power_gross",
+    "max power gross": "max_power_gross",
+    "engine gross": "max_power_gross",
+    "rated rpm": "rated_rpm",
+    "torque": "torque",
+    "torque rpm": "torque_rpm",
+    "engine net": "rated_power_net",
+    "power net": "rated_power_net",
+    "rated power net": "rated_power_net",
+    # Transmission
+    "clutch": "clutch",
+    "gears": "gears",
+    "transmission": "gears",
+    # Hydraulics
+    "pump flow": "pump_flow",
+    "total flow": "pump_flow",
+    ("hydraulics", "pressure"): "pressure",
+    "relief pressure": "pressure",
+    "valve flow": "rear_scv_flow",
+    "scv flow": "rear_scv_flow",
+    ("hydraulics", "capacity"): "capacity",
+    "hydraulic system": "capacity",
+    # PTO
+    "front pto": "front_pto_type",
+    ("pto", "engine rpm"): "engine_rpm_at_pto",
+    ("rear pto", "engine rpm"): "engine_rpm_at_pto",
+    "rear rpm": "detalles_velocidades_pto",
+    # Dimensions & weight
+    "length": "length",
+    "width": "width",
+    "height": "height",
+    "height cab": "height",
+    "height rops": "height_rops",
+    "wheelbase": "wheelbase",
+    "ground clearance": "ground_clearance",
+    "clearance": "ground_clearance",
+    "weight": "shipping_weight",
+    "shipping weight": "shipping_weight",
+    "operating weight": "shipping_weight",
+    "ballasted": "ballasted_weight",
+    "ballasted weight": "ballasted_weight",
+    "max weight": "max_weight",
+    "gross weight": "max_weight",
+    ("ground clearance", "front axle"): "axle_clearance_front",
+    ("ground clearance", "rear axle"): "axle_clearance_rear",
+    "rear tread": "rear_tread",
+    "front tread": "front_tread",
+    "ag front": "tire_front",
+    "ag rear": "tire_rear",
+    "front tire": "tire_front",
+    "rear tire": "tire_rear",
+    # Axles & drive
+    "chassis": "drive_type",
+    "final drives": "final_drives",
+    # Electrical
+    "battery volts": "battery_volts",
+    ("battery", "volts"): "battery_volts",
+    ("electrical", "volts"): "battery_volts",
+    "battery group": "battery_group",
+    "amp hours": "battery_AH",
+    "battery ah": "battery_AH",
+    # Hitch
+    ("three point hitch", "rear type"): "rear_type",
+    "rear type": "rear_type",
+    "rear lift": "rear_lift_capacity",
+    "rear lift at ends": "rear_lift_capacity",
+    # Fuel
+    "fuel tank": "fuel_tank_capacity",
+    ("capacity", "fuel"): "fuel_tank_capacity",
+}
+
+
+def _map_label(section: str, label: str) -> str | None:
+    return TRACTORDATA_LABELS.get((section, label)) or TRACTORDATA_LABELS.get(label)
+
+
+def _parse_label_value_tables(soup: BeautifulSoup) -> dict[str, str]:
+    """
+    Recorre las filas 'etiqueta | valor' de todas las tablas de la página.
+    Una fila con una sola celda, o con etiqueta y sin valor ("Ground clearance:" | ""),
+    se interpreta como cabecera de sección.
+    La primera aparición de cada variable gana (suele ser la ficha principal).
+    """
+    valores: dict[str, str] = {}
+    section = ""
+
+    for tr in soup.find_all("tr"):
+        cells = tr.find_all(["td", "th"], recursive=False)
+        if len(cells) == 1:
+            section = _normalize_label(_cell_text(cells[0]))
+            continue
+        if len(cells) < 2:
+            continue
+
+        label = _normalize_label(_cell_text(cells[0]))
+        value = _cell_text(cells[1])
+        if label and not value:
+            section = label
+            continue
+        if not label:
+            continue
+
+        variable = _map_label(section, label)
+        if variable and variable not in valores:
+            valores[variable] = value
+
+    return valores
+
+
+@register_adapter("tractordata.com")
+def tractordata_adapter(soup: BeautifulSoup) -> dict[str, str]:
+    """
+    tractordata.com: fichas con tablas de filas 'Etiqueta:' | 'valor'.
+    """
+    return _parse_label_value_tables(soup)
+
+
+def jsonld_adapter(soup: BeautifulSoup) -> dict[str, str]:
+    """
+    Adaptador genérico para páginas con JSON-LD (schema.org Product/Vehicle):
+    lee 'additionalProperty' [{name, value, unitText}] con el mismo mapeo de etiquetas.
+    """
+    valores: dict[str, str] = {}
+
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+
+        if isinstance(data, list):
+            nodos = data
+        elif isinstance(data, dict):
+            nodos = data.get("@graph", [data])
+        else:
+            continue
+
+        for nodo in nodos:
+            if not isinstance(nodo, dict):
+                continue
+            for prop in nodo.get("additionalProperty", []) or []:
+                if not isinstance(prop, dict) or "name" not in prop or "value" not in prop:
+                    continue
+                variable = _map_label("", _normalize_label(str(prop["name"])))
+                if not variable or variable in valores:
+                    continue
+                value = str(prop["value"])
+                if prop.get("unitText"):
+                    value = f"{value} {prop['unitText']}"
+                valores[variable] = value
+
+    return valores
+
+
+def extract_structured(url: str, html: str) -> dict[str, str]:
+    """
+    Aplica el adaptador del sitio (si existe) y el adaptador JSON-LD genérico.
+
+    Returns:
+        dict[str, str]: {variable_name: valor_crudo} (ej: {"rated_power_net": "110 hp [82.0 kW]"})
+    """
+    soup = BeautifulSoup(html, BS_PARSER)
+    valores: dict[str, str] = {}
+
+    adapter = get_adapter(url)
+    if adapter is not None:
+        try:
+            valores.update(adapter(soup))
+        except Exception as e:
+            print(f"❌ Site Adapter Error: El adaptador de {url[:70]} falló. Error: {e}")
+
+    for variable, value in jsonld_adapter(soup).items():
+        valores.setdefault(variable, value)
+
+    if valores:
+        print(f"Site Adapters: {len(valores)} variables estructuradas encontradas en {url[:70]}.")
+    return valores
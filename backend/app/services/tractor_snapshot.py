@@ -0,0 +1,360 @@
+import threading
+import time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, String, select
+
+from app.config import FILTER_SNAPSHOT_MAX_AGE_SECONDS, FILTER_SNAPSHOT_MIN_RELOAD_SECONDS
+from app.database.connection import read_engine
+from app.database.facets import FACET_CATEGORY_COLUMNS, histogram_edges, numeric_facet, category_facet
+from app.database.filters import FilterSpec
+from app.database.pagination import PageCursor, SortSpec
+from app.database.models import Tractor
+from app.database.versioning import catalog_version
+from app.services.trigram_index import TrigramIndex
+from app.services.similarity import SIMILARITY_FEATURES, FeatureIndex
+
+# --- Snapshot columnar del catálogo (motor de filtrado en memoria) ---
+# El catálogo es pequeño y casi sólo de lectura: se carga entero una vez por versión
+# y los filtros se evalúan como máscaras booleanas de NumPy, sin ida y vuelta a
+# Postgres ni hidratación de objetos ORM.
+#   - Columnas numéricas y booleanas: float64, NaN = NULL (True/False = 1.0/0.0).
+#   - Columnas de texto: codificadas por diccionario (códigos int + valores únicos, -1 = NULL).
+
+_tractor_table = Tractor.__table__
+
+
+class TractorSnapshot:
+    """
+    Una versión concreta de la tabla 'tractors' en arrays NumPy.
+    """
+
+    def __init__(self, rows: list[dict], version: str):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        # Filas completas (dicts) para la respuesta, en orden de id
+        self.rows = rows
+        self.size = len(rows)
+        self.ids = np.array([row["id"] for row in rows], dtype=np.int64)
+
+        self.numeric: dict[str, np.ndarray] = {}
+        self.strings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for column in _tractor_table.columns:
+            values = [row[column.name] for row in rows]
+            if isinstance(column.type, String):
+                codes, uniques = pd.factorize(np.array(values, dtype=object))
+                self.strings[column.name] = (codes, np.asarray(uniques, dtype=object))
+            else:
+                self.numeric[column.name] = np.array(
+                    [np.nan if v is None else float(v) for v in values], dtype=np.float64
+                )
+        self._coalesced: dict[tuple[str, ...], np.ndarray] = {}
+        self._search_index: TrigramIndex | None = None
+        self._feature_index: FeatureIndex | None = None
+
+    def is_current(self) -> bool:
+        """
+        False si el catálogo cambió desde que se cargó (se está sirviendo mientras se recarga).
+        """
+        return self.version == catalog_version.current()
+
+    def values(self, columns: tuple[str, ...]) -> np.ndarray:
+        """
+        Columna numérica (o la primera no nula de varias, como COALESCE).
+        """
+        if len(columns) == 1:
+            return self.numeric[columns[0]]
+        result = self._coalesced.get(columns)
+        if result is None:
+            result = self.numeric[columns[0]].copy()
+            for column in columns[1:]:
+                missing = np.isnan(result)
+                result[missing] = self.numeric[column][missing]
+            self._coalesced[columns] = result
+        return result
+
+    def _string_mask(self, column: str, accept) -> np.ndarray:
+        """
+        Evalúa 'accept' una vez por valor distinto y lo reparte a las filas por sus códigos.
+        """
+        codes, uniques = self.strings[column]
+        hits = np.fromiter((accept(u) for u in uniques), dtype=bool, count=len(uniques))
+        # Código -1 (NULL) -> último elemento añadido, siempre False
+        return np.append(hits, False)[codes]
+
+    def mask(self, filters: list[tuple[FilterSpec, Any]]) -> np.ndarray:
+        """
+        Máscara booleana de las filas que cumplen todos los filtros (mismas reglas que apply_sql).
+        """
+        result = np.ones(self.size, dtype=bool)
+        for spec, value in filters:
+            if spec.kind == "contains":
+                needle = str(value).lower()
+                result &= self._string_mask(spec.columns[0], lambda u: needle in u.lower())
+            elif spec.kind == "equals":
+                result &= self._string_mask(spec.columns[0], lambda u: u == value)
+            elif spec.kind == "bool":
+                result &= self.values(spec.columns) == float(value)
+            elif spec.kind == "min":
+                result &= self.values(spec.columns) >= value
+            elif spec.kind == "max":
+                result &= self.values(spec.columns) <= value
+        return result
+
+    def filter(self, filters: list[tuple[FilterSpec, Any]]) -> list[dict]:
+        return [self.rows[i] for i in np.flatnonzero(self.mask(filters))]
+
+    def sort_keys(self, column: str) -> np.ndarray:
+        """
+        Clave de orden float64 (NaN = NULL). Los textos se ordenan por su posición
+        entre los valores distintos ordenados por código Unicode (no por la collation
+        de la BD: ver database/filters.py).
+        """
+        if column in self.numeric:
+            return self.numeric[column]
+        result = self._coalesced.get((column, "rank"))
+        if result is None:
+            codes, uniques = self.strings[column]
+            ranks = np.empty(len(uniques), dtype=np.float64)
+            ranks[np.argsort(uniques)] = np.arange(len(uniques))
+            result = np.append(ranks, np.nan)[codes]
+            self._coalesced[(column, "rank")] = result
+        return result
+
+    def _after_mask(self, sort: SortSpec, cursor: PageCursor) -> np.ndarray:
+        """
+        Filas que van después del cursor (misma condición keyset que el motor SQL).
+        """
+        after_id = self.ids > cursor.id
+        if sort.column in self.numeric:
+            keys = self.numeric[sort.column]
+            is_null = np.isnan(keys)
+            if cursor.value is None:
+                return is_null & after_id
+            with np.errstate(invalid="ignore"):
+                beyond = keys < cursor.value if sort.descending else keys > cursor.value
+                same = keys == cursor.value
+        else:
+            codes = self.strings[sort.column][0]
+            is_null = codes < 0
+            if cursor.value is None:
+                return is_null & after_id
+            if sort.descending:
+                beyond = self._string_mask(sort.column, lambda u: u < cursor.value)
+            else:
+                beyond = self._string_mask(sort.column, lambda u: u > cursor.value)
+            same = self._string_mask(sort.column, lambda u: u == cursor.value)
+        return beyond | (same & after_id) | is_null
+
+    def page(
+        self,
+        filters: list[tuple[FilterSpec, Any]],
+        sort: SortSpec,
+        cursor: PageCursor | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[dict], bool]:
+        """
+        Filas filtradas y ordenadas (NULLs al final, desempate por id) a partir del cursor.
+
+        Returns:
+            (filas de la página, hay_más_páginas)
+        """
+        mask = self.mask(filters)
+        if cursor is not None:
+            mask &= self._after_mask(sort, cursor)
+        selected = np.flatnonzero(mask)
+
+        if sort.column != "id":
+            keys = self.sort_keys(sort.column)[selected]
+            is_null = np.isnan(keys)
+            primary = np.where(is_null, 0.0, -keys if sort.descending else keys)
+            # lexsort: la última clave es la principal
+            selected = selected[np.lexsort((self.ids[selected], primary, is_null))]
+
+        has_more = limit is not None and len(selected) > limit
+        if limit is not None:
+            selected = selected[:limit]
+        return [self.rows[i] for i in selected], has_more
+
+    def facets(self, filters: list[tuple[FilterSpec, Any]], columns: tuple[str, ...], bins: int) -> dict:
+        """
+        Mismas facetas que database/facets.sql_facets, en una sola pasada sobre la máscara.
+        """
+        mask = self.mask(filters)
+        total = int(mask.sum())
+        result = {"total": total, "numeric": {}, "categories": {}}
+
+        for name in columns:
+            values = self.numeric[name][mask]
+            values = values[~np.isnan(values)]
+            if not len(values):
+                result["numeric"][name] = numeric_facet(None, None, 0, total, None, None)
+                continue
+            lo, hi = values.min().item(), values.max().item()
+            edges = histogram_edges(lo, hi, bins)
+            # Bin k: edges[k] <= v < edges[k+1] (el último incluye el máximo), igual que el SQL
+            bin_index = np.searchsorted(np.array(edges[1:-1]), values, side="right")
+            counts = np.bincount(bin_index, minlength=len(edges) - 1).tolist()
+            result["numeric"][name] = numeric_facet(
+                self._as_column_type(name, lo), self._as_column_type(name, hi), len(values), total, counts, edges
+            )
+
+        for name in FACET_CATEGORY_COLUMNS:
+            codes, uniques = self.strings[name]
+            selected = codes[mask]
+            counts = np.bincount(selected[selected >= 0], minlength=len(uniques))
+            result["categories"][name] = category_facet(
+                {uniques[i]: int(n) for i, n in enumerate(counts) if n}
+            )
+        return result
+
+    def objective_values(self, filters: list[tuple[FilterSpec, Any]], columns: tuple[str, ...]):
+        """
+        Entradas de services/ranking.rank para las filas filtradas: (ids, [(company, model)], matriz n x columnas).
+        """
+        selected = np.flatnonzero(self.mask(filters))
+        names = [(self.rows[i]["company"], self.rows[i]["model"]) for i in selected]
+        values = np.column_stack([self.numeric[c][selected] for c in columns])
+        return self.ids[selected], names, values
+
+    def search(self, query: str, limit: int, min_score: float) -> list[dict]:
+        """
+        Búsqueda difusa por 'marca modelo' (el índice de trigramas se construye en la primera búsqueda).
+        """
+        if self._search_index is None:
+            self._search_index = TrigramIndex(
+                [row["id"] for row in self.rows],
+                [row["company"] for row in self.rows],
+                [row["model"] for row in self.rows],
+            )
+        return self._search_index.search(query, limit, min_score)
+
+    def similar(self, tractor_id: int, k: int) -> list[dict] | None:
+        """
+        Los k tractores con especificaciones más parecidas, con 'distance' y 'shared_features'.
+        None si el id no existe. La matriz de especificaciones se construye en la primera consulta.
+        """
+        if self._feature_index is None:
+            self._feature_index = FeatureIndex(self.ids, [self.values(f.columns) for f in SIMILARITY_FEATURES])
+        neighbours = self._feature_index.neighbours(tractor_id, k)
+        if neighbours is None:
+            return None
+        return [
+            {**self.rows[position], "distance": round(distance, 4), "shared_features": shared}
+            for position, distance, shared in neighbours
+        ]
+
+    @staticmethod
+    def _as_column_type(name: str, value: float):
+        # Las columnas Integer devuelven enteros (como min()/max() en SQL)
+        return int(value) if isinstance(_tractor_table.c[name].type, Integer) else value
+
+
+class SnapshotStore:
+    """
+    Guarda el snapshot vigente y lo recarga cuando cambia la versión del catálogo
+    (o cuando supera la edad máxima, por si otro proceso escribió en la tabla).
+
+    Sólo la primera carga es síncrona. Después, un snapshot desactualizado se sigue
+    sirviendo mientras un único hilo lo reconstruye, como mucho una vez cada
+    'min_reload_seconds': durante una minería cada tractor guardado cambia la versión,
+    y recargar la tabla entera en cada petición bloquearía a todos los lectores.
+    """
+
+    def __init__(self, max_age_seconds: float, min_reload_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        self.min_reload_seconds = min_reload_seconds
+        self._lock = threading.Lock()
+        self._snapshot: TractorSnapshot | None = None
+        self._rebuilding = False
+        self._last_attempt = 0.0
+        self.hits = 0
+        self.stale_hits = 0
+        self.loads = 0
+        self.last_load_seconds = 0.0
+
+    def _is_fresh(self, snapshot: TractorSnapshot | None) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.is_current()
+            and time.monotonic() - snapshot.loaded_at < self.max_age_seconds
+        )
+
+    def _load(self) -> TractorSnapshot:
+        # La versión se lee ANTES de la consulta: si alguien escribe mientras
+        # cargamos, el snapshot nace ya viejo y se recargará en la próxima petición
+        version = catalog_version.current()
+        start = time.perf_counter()
+        with read_engine.connect() as conn:
+            result = conn.execute(select(_tractor_table).order_by(_tractor_table.c.id))
+            rows = [dict(row) for row in result.mappings()]
+        snapshot = TractorSnapshot(rows, version)
+        self.last_load_seconds = time.perf_counter() - start
+        self.loads += 1
+        print(f"Snapshot: {snapshot.size} tractores cargados en memoria en {self.last_load_seconds:.2f}s (versión {version}).")
+        return snapshot
+
+    def _schedule_rebuild(self, snapshot: TractorSnapshot):
+        with self._lock:
+            if self._rebuilding or self._snapshot is not snapshot:
+                return
+            self._rebuilding = True
+        # Las escrituras que lleguen mientras esperamos entran en la misma recarga
+        # (y tras un fallo tampoco se reintenta antes del intervalo mínimo)
+        since = max(snapshot.loaded_at, self._last_attempt)
+        delay = max(0.0, since + self.min_reload_seconds - time.monotonic())
+        timer = threading.Timer(delay, self._rebuild)
+        timer.daemon = True
+        timer.start()
+
+    def _rebuild(self):
+        self._last_attempt = time.monotonic()
+        try:
+            self._snapshot = self._load()
+        except Exception as e:
+            # Se sigue sirviendo el anterior; la próxima petición lo reintenta
+            print(f"⚠️ Snapshot: error al recargar, se mantiene la versión anterior: {e}")
+        finally:
+            self._rebuilding = False
+
+    def get(self) -> TractorSnapshot:
+        """
+        Snapshot vigente, o el anterior mientras se recarga en segundo plano.
+        La primera carga es síncrona: desde async, usar el threadpool.
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            self.hits += 1
+            return snapshot
+        if snapshot is None:
+            with self._lock:
+                # Otra petición pudo cargarlo mientras esperábamos el lock
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                return self._snapshot
+        self._schedule_rebuild(snapshot)
+        self.stale_hits += 1
+        return snapshot
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "name": "tractor_snapshot",
+            "rows": snapshot.size if snapshot else 0,
+            "version": snapshot.version if snapshot else None,
+            "current_version": catalog_version.current(),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "rebuilding": self._rebuilding,
+            "loads": self.loads,
+            "last_load_seconds": round(self.last_load_seconds, 3),
+        }
+
+
+# Instancia única del snapshot
+tractor_snapshot = SnapshotStore(
+    max_age_seconds=FILTER_SNAPSHOT_MAX_AGE_SECONDS,
+    min_reload_seconds=FILTER_SNAPSHOT_MIN_RELOAD_SECONDS,
+)
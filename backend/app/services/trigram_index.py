@@ -0,0 +1,62 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+# --- Índice de trigramas en memoria (respaldo de pg_trgm) ---
+# Mismos trigramas que pg_trgm: minúsculas, palabras alfanuméricas (el resto separa),
+# cada palabra con dos espacios delante y uno detrás. "T7.190" y "t7 190" dan los
+# mismos trigramas, y una errata sólo cambia unos pocos.
+# Índice invertido trigrama -> posiciones: una consulta suma las listas de sus trigramas,
+# sin recorrer todos los nombres.
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    'T7.190' -> {'  t', ' t7', 't7 ', '  1', ' 19', '190', '90 '}
+    """
+    result = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+    """
+    Índice de los nombres 'marca modelo' de una versión del catálogo.
+    """
+
+    def __init__(self, ids: list[int], companies: list[str | None], models: list[str]):
+        self.ids = ids
+        self.companies = companies
+        self.models = models
+        postings: dict[str, list[int]] = defaultdict(list)
+        for position, (company, model) in enumerate(zip(companies, models)):
+            for trigram in trigrams(f"{company or ''} {model}"):
+                postings[trigram].append(position)
+        self._postings = {t: np.array(p, dtype=np.int32) for t, p in postings.items()}
+
+    def search(self, query: str, limit: int, min_score: float) -> list[dict]:
+        """
+        Puntuación = fracción de los trigramas de la consulta presentes en el nombre
+        (aproxima el word_similarity de pg_trgm: 1.0 = la consulta aparece entera).
+        Empates: el modelo más corto primero (el más parecido a lo escrito).
+        """
+        wanted = trigrams(query)
+        if not wanted or not self.ids:
+            return []
+        shared = np.zeros(len(self.ids), dtype=np.int32)
+        for trigram in wanted:
+            positions = self._postings.get(trigram)
+            if positions is not None:
+                shared[positions] += 1
+        scores = shared / len(wanted)
+        candidates = np.flatnonzero(scores >= min_score)
+        ranked = sorted(candidates, key=lambda i: (-scores[i], len(self.models[i]), self.models[i]))[:limit]
+        return [
+            {"id": self.ids[i], "company": self.companies[i], "model": self.models[i], "score": round(float(scores[i]), 4)}
+            for i in ranked
+        ]
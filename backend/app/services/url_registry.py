@@ -0,0 +1,160 @@
+import re
+import threading
+
+from app.database.connection import SessionLocal
+from app.database.models import SourceURL
+from app.database.bulk import dialect_insert
+
+# --- 🧠 BASE DE CONOCIMIENTO (URLs Maestras) ---
+# Antes era un diccionario recorrido entero en cada búsqueda ('model_key in query').
+# Ahora vive en la tabla 'source_urls' y en memoria como {tokens normalizados: url}:
+# una consulta se resuelve mirando sus n-gramas de tokens en el diccionario,
+# sin importar cuántos tractores haya registrados.
+# Una clave sólo vale para su modelo: debe llevar un token de modelo (con cifras:
+# '6r', '110', 't7', '5075e') y sólo resuelve consultas cuyos tokens de modelo
+# contiene todos ('john deere 6r' no responde por 'john deere 6r 250').
+
+# URLs semilla: se insertan en la tabla la primera vez (no pisan las existentes)
+KNOWN_TRACTOR_URLS = {
+    "john deere 6r 110": "https://www.tractordata.com/farm-tractors/011/2/3/11237-john-deere-6r-110.html",
+    "john deere 8r 370": "https://www.tractordata.com/farm-tractors/010/1/1-john-deere-8r-370.html",
+    "fendt 1050 vario": "https://www.tractordata.com/farm-tractors/009/4/9/9499-fendt-1050-vario.html",
+    "new holland t7.190": "https://www.tractordata.com/farm-tractors/009/3/0/9305-new-holland-t7-190.html",
+}
+
+# Palabras de relleno de las consultas que no identifican al tractor
+GENERIC_TOKENS = {
+    "specs", "spec", "specifications", "specification", "technical", "tractordata",
+    "tractor", "datasheet", "ficha", "tecnica", "técnica", "site", "com",
+}
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Una clave de un solo token ('fendt') capturaría cualquier consulta de la marca
+MIN_KEY_TOKENS = 2
+
+
+def normalize_tokens(text: str) -> tuple[str, ...]:
+    """
+    'New Holland T7.190 specs' -> ('new', 'holland', 't7', '190')
+    """
+    return tuple(t for t in _TOKEN_RE.findall(text.lower()) if t not in GENERIC_TOKENS)
+
+
+def model_tokens(tokens: tuple[str, ...]) -> set[str]:
+    """
+    Tokens que identifican al modelo (los que tienen alguna cifra): ('john', 'deere', '6r', '110') -> {'6r', '110'}
+    """
+    return {t for t in tokens if any(c.isdigit() for c in t)}
+
+
+def is_valid_key(tokens: tuple[str, ...]) -> bool:
+    """
+    Marca + modelo: al menos MIN_KEY_TOKENS tokens y uno de modelo ('john deere' no vale).
+    """
+    return len(tokens) >= MIN_KEY_TOKENS and bool(model_tokens(tokens))
+
+
+class UrlRegistry:
+    """
+    Índice en memoria (clave de tokens -> URL) respaldado por la tabla 'source_urls'.
+    Seguro entre hilos: el buscador corre en el threadpool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._urls: dict[str, str] = {}
+        # Longitud (en tokens) de la clave más larga: acota los n-gramas a revisar
+        self._max_tokens = 0
+        self._loaded = False
+
+    def _index(self, key: str, url: str):
+        self._urls[key] = url
+        self._max_tokens = max(self._max_tokens, len(key.split()))
+
+    def load(self):
+        """
+        Inserta las URLs semilla que falten y carga la tabla completa en memoria.
+        Se llama desde el 'lifespan' de main.py (o bajo demanda en el primer uso).
+        """
+        db = SessionLocal()
+        try:
+            seeds = [
+                {"key": " ".join(normalize_tokens(name)), "name": name, "url": url, "origin": "seed"}
+                for name, url in KNOWN_TRACTOR_URLS.items()
+            ]
+            db.execute(dialect_insert(db)(SourceURL.__table__).values(seeds).on_conflict_do_nothing(index_elements=["key"]))
+            db.commit()
+
+            rows = db.query(SourceURL.key, SourceURL.url).all()
+        finally:
+            db.close()
+
+        # Claves aprendidas antes de exigir un token de modelo (ej: 'john deere'): se ignoran
+        valid = [(key, url) for key, url in rows if is_valid_key(tuple(key.split()))]
+        with self._lock:
+            for key, url in valid:
+                self._index(key, url)
+            self._loaded = True
+        print(f"URL Registry: {len(valid)} URLs conocidas cargadas ({len(rows) - len(valid)} claves sin modelo ignoradas).")
+
+    def lookup(self, query: str) -> tuple[str, str] | None:
+        """
+        Busca la clave conocida más larga contenida (como tokens consecutivos) en la consulta
+        que cubra todos sus tokens de modelo. Si ninguna los cubre, None (se buscará en la web).
+
+        Returns:
+            (clave, url) o None.
+        """
+        if not self._loaded:
+            self.load()
+
+        tokens = normalize_tokens(query)
+        wanted = model_tokens(tokens)
+        if not wanted:
+            return None # Sólo marca: no identifica a ningún tractor
+        with self._lock:
+            # Primero los n-gramas más largos: 'john deere 6r 110' gana a 'john deere 6r'
+            for n in range(min(self._max_tokens, len(tokens)), 0, -1):
+                for i in range(len(tokens) - n + 1):
+                    key = " ".join(tokens[i:i + n])
+                    url = self._urls.get(key)
+                    if url and wanted <= set(tokens[i:i + n]):
+                        return key, url
+        return None
+
+    def remember(self, name: str, url: str, origin: str = "web") -> str | None:
+        """
+        Registra (o actualiza) la URL de un tractor en memoria y en la tabla.
+
+        Returns:
+            La clave normalizada, o None si el nombre no identifica a un tractor concreto.
+        """
+        tokens = normalize_tokens(name)
+        if not is_valid_key(tokens):
+            return None
+        key = " ".join(tokens)
+
+        db = SessionLocal()
+        try:
+            stmt = dialect_insert(db)(SourceURL.__table__).values(key=key, name=name, url=url, origin=origin)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={"name": stmt.excluded.name, "url": stmt.excluded.url, "origin": stmt.excluded.origin}
+            )
+            db.execute(stmt)
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._index(key, url)
+        print(f"URL Registry: Guardada '{key}' -> {url[:70]}")
+        return key
+
+    def stats(self) -> dict:
+        return {"urls": len(self._urls), "max_key_tokens": self._max_tokens}
+
+
+# Instancia única del registro
+url_registry = UrlRegistry()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: convertidor de unidades.
+
+Compara el convertidor original (cadena de if con subcadenas, benchmarks/legacy_converter.py)
+con el registro compilado de app.services.converter sobre un corpus de valores típicos
+de fichas técnicas, y lista los casos en que los resultados difieren.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_converter
+    python -m benchmarks.bench_converter --repeat 200 --show-diffs
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from app.services import converter
+from benchmarks import legacy_converter
+
+CORPUS = {
+    "rated_power_net": ["108.6 hp [81.0 kW]", "82 kW", "110 hp", "150 CV"],
+    "max_power_gross": ["125 hp [93.2 kW]", "93,2 kW"],
+    "displacement": ["4.5 L [276 ci]", "4500 cc", "276 ci", "6.8 L"],
+    "oil_capacity": ["15 qts [14.2 L]", "3.5 gal", "14 L"],
+    "torque": ["310 lb-ft @ 1,400 rpm", "420 Nm", "220 lbs-ft [298 Nm]"],
+    "torque_rpm": ["310 lb-ft @ 1,400 rpm", "1400"],
+    "rated_rpm": ["2,100-2,400 rpm", "2400"],
+    "pump_flow": ["11.3 gpm [42.8 lpm]", "40 l/min"],
+    "pressure": ["2,850 psi [196 bar]", "200 bar"],
+    "wheelbase": ["80.1 inches [203 cm]", "2.45 m", "2,450 mm"],
+    "height": ["9 ft 2 in", "2.8 m", "110 in [279 cm]"],
+    "shipping_weight": ["5,512 lbs [2500 kg]", "1.200,50 kg"],
+    "rear_lift_capacity": ["3,494 lbs [1585 kg]", "1585 kg"],
+    "fuel_tank_capacity": ["18.5 gal [70.0 L]", "70 litros"],
+    "starter_volts": ["12", "12 V"],
+    "numero_de_cilindros": ["4", "6 cyl"],
+    "compression_ratio": ["17.5:1"],
+    "battery_AH": ["100 Ah"],
+}
+
+
+def run(func, pairs: list[tuple[str, str]], repeat: int, clear_cache: bool = False) -> float:
+    # Los 'print' del convertidor original no deben entrar en la medición
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            if clear_cache:
+                converter.parse_canonical.cache_clear()
+            for variable, value in pairs:
+                func(variable, value)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--show-diffs", action="store_true", help="Muestra los valores en que difieren")
+    args = parser.parse_args()
+
+    pairs = [(variable, value) for variable, values in CORPUS.items() for value in values]
+    n_calls = len(pairs) * args.repeat
+
+    t_old = run(legacy_converter.get_canonical_values, pairs, args.repeat)
+    # En frío: se vacía la caché en cada pasada, todas las conversiones se tokenizan
+    t_cold = run(converter.get_canonical_values, pairs, args.repeat, clear_cache=True)
+    t_warm = run(converter.get_canonical_values, pairs, args.repeat)
+    print(f"{n_calls} conversiones")
+    print(f"original           : {n_calls / t_old:12,.0f} conv/s")
+    print(f"compilado (en frío): {n_calls / t_cold:12,.0f} conv/s  (x{t_old / t_cold:.1f})")
+    print(f"compilado (caché)  : {n_calls / t_warm:12,.0f} conv/s  (x{t_old / t_warm:.1f})")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        diffs = [
+            (variable, value, legacy_converter.get_canonical_values(variable, value), converter.get_canonical_values(variable, value))
+            for variable, value in pairs
+        ]
+    diffs = [d for d in diffs if d[2][0] != d[3][0] or (d[2][1] is None) != (d[3][1] is None)
+             or (d[2][1] is not None and abs(d[2][1] - d[3][1]) > 1e-6 * max(1.0, abs(d[2][1])))]
+    print(f"\n{len(diffs)}/{len(pairs)} valores difieren del convertidor original")
+    if args.show_diffs:
+        for variable, value, old, new in diffs:
+            print(f"  {variable:<20} {value!r:<26} original={old[1]!s:<22} compilado={new[1]}")
+
+
+if __name__ == "__main__":
+    main()
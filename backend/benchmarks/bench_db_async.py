@@ -0,0 +1,159 @@
+"""
+Benchmark: acceso a la BD desde rutas async bajo concurrencia.
+
+Lanza N peticiones concurrentes de la misma consulta de /tractors/filter (motor SQL,
+una página de 50 filas con filtros) con tres variantes del handler:
+  - sync en el loop : Session síncrona llamada directamente desde 'async def' (bloquea el loop),
+  - threadpool      : Session síncrona dentro de run_in_threadpool (lo que hacían las rutas antes),
+  - async           : AsyncSession (asyncpg / aiosqlite), la variante actual.
+Además del throughput mide el retraso máximo del event loop (lo que espera cualquier
+otra petición, p. ej. un /health, mientras el handler corre).
+Usa DATABASE_URL / ASYNC_DATABASE_URL con modelos 'BENCH-...' que se borran al terminar.
+En SQLite local no hay red: --latency-ms simula el ida y vuelta a un Postgres remoto
+(time.sleep en las variantes síncronas, asyncio.sleep en la async).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_db_async --tractors 5000 --requests 400 --concurrency 1,16,64 --latency-ms 2
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.database.connection import SessionLocal, AsyncSessionLocal, engine, async_engine, Base
+from app.database.models import Tractor
+from app.database.bulk import upsert_tractors
+from app.database.filters import active_filters
+from app.database.pagination import parse_sort
+from app.api.routes.tractors import _sql_query
+from benchmarks.bench_filter_engine import PREFIX, random_row
+
+PARAMS = {"power_net_min_kw": 60, "power_net_max_kw": 200, "drive_type": "4WD"}
+PAGE_SIZE = 50
+LATENCY_SECONDS = 0.0 # --latency-ms
+
+
+def _sync_page(statement) -> int:
+    db = SessionLocal()
+    try:
+        if LATENCY_SECONDS:
+            time.sleep(LATENCY_SECONDS)
+        return len(db.execute(statement).all())
+    finally:
+        db.close()
+
+
+async def sync_in_loop(statement) -> int:
+    return _sync_page(statement)
+
+
+async def sync_threadpool(statement) -> int:
+    return await run_in_threadpool(_sync_page, statement)
+
+
+async def async_session(statement) -> int:
+    async with AsyncSessionLocal() as db:
+        if LATENCY_SECONDS:
+            await asyncio.sleep(LATENCY_SECONDS)
+        return len((await db.execute(statement)).all())
+
+
+VARIANTS = {
+    "sync en el loop": sync_in_loop,
+    "threadpool": sync_threadpool,
+    "async": async_session,
+}
+
+
+async def _loop_lag(stop: asyncio.Event, lags: list[float], interval: float = 0.001):
+    """
+    Latido cada 'interval' s: lo que se pasa de ese intervalo es tiempo con el loop bloqueado.
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(handler, statement, requests: int, concurrency: int) -> tuple[float, list[float], float]:
+    """
+    'requests' llamadas con como mucho 'concurrency' a la vez.
+    Devuelve (req/s, latencias ordenadas, retraso máximo del loop).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], [0.0]
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_loop_lag(stop, lags))
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await handler(statement)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+    return requests / elapsed, sorted(latencies), max(lags)
+
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(Tractor).filter(Tractor.model.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def bench(args, statement):
+    # Calentamiento: abre las conexiones de los dos pools
+    for handler in VARIANTS.values():
+        await run(handler, statement, 20, 4)
+
+    for concurrency in args.concurrency:
+        print(f"concurrencia {concurrency}:")
+        for name, handler in VARIANTS.items():
+            rps, latencies, lag = await run(handler, statement, args.requests, concurrency)
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"  {name:16s}: {rps:8.0f} req/s  p50 {p50 * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms  loop bloqueado {lag * 1000:7.2f} ms")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tractors", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 16, 64])
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latencia de red simulada por consulta")
+    args = parser.parse_args()
+
+    global LATENCY_SECONDS
+    LATENCY_SECONDS = args.latency_ms / 1000
+
+    Base.metadata.create_all(bind=engine)
+    cleanup()
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        upsert_tractors(db, [random_row(i, rng) for i in range(args.tractors)])
+        db.commit()
+    finally:
+        db.close()
+
+    statement = _sql_query(active_filters(PARAMS), parse_sort("model"), None, PAGE_SIZE, None)
+    print(f"{engine.dialect.name} / {async_engine.dialect.driver}: {args.tractors} tractores, "
+          f"{args.requests} peticiones por variante, latencia simulada {args.latency_ms} ms\n")
+    try:
+        asyncio.run(bench(args, statement))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
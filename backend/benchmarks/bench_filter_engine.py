@@ -0,0 +1,125 @@
+"""
+Benchmark: motores de /tractors/filter.
+
+Compara el motor SQL (query ORM + hidratación de objetos Tractor) con el snapshot
+columnar en memoria (máscaras NumPy) sobre las mismas combinaciones de filtros,
+y comprueba que ambos devuelven los mismos tractores.
+Usa la base de datos de DATABASE_URL con modelos 'BENCH-...' que se borran al terminar.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_filter_engine --tractors 5000 --repeat 20
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from app.database.connection import SessionLocal, engine, Base
+from app.database.models import Tractor
+from app.database.bulk import upsert_tractors
+from app.database.filters import active_filters, apply_sql
+from app.database.versioning import catalog_version
+from app.services.tractor_snapshot import tractor_snapshot
+
+PREFIX = "BENCH-"
+
+COMPANIES = ["John Deere", "Fendt", "New Holland", "Kubota", "Massey Ferguson", "Case IH", None]
+DRIVE_TYPES = ["4WD", "2WD", "MFWD", None]
+
+# Combinaciones típicas del frontend
+QUERIES = [
+    {},
+    {"company": "deere"},
+    {"power_net_min_kw": 60, "power_net_max_kw": 120},
+    {"drive_type": "4WD", "cylinders_min": 4, "weight_ship_max_kg": 6000},
+    {"height_min_m": 2.5, "height_max_m": 3.0, "differential_lock": True},
+    {"company": "holland", "pump_flow_min_lpm": 40, "lift_cap_min_kg": 2000, "has_precision_agriculture": False},
+]
+
+
+def random_row(i: int, rng: random.Random) -> dict:
+    def maybe(value):
+        # ~15% de huecos, como en el catálogo real
+        return None if rng.random() < 0.15 else value
+
+    return {
+        "model": f"{PREFIX}{i:06d}",
+        "company": rng.choice(COMPANIES),
+        "drive_type": rng.choice(DRIVE_TYPES),
+        "numero_de_cilindros_num": maybe(rng.choice([3, 4, 6])),
+        "rated_power_net_kw": maybe(round(rng.uniform(20, 300), 1)),
+        "shipping_weight_kg": maybe(round(rng.uniform(1500, 15000))),
+        "height_m": maybe(round(rng.uniform(2.0, 3.5), 2)),
+        "height_rops_m": maybe(round(rng.uniform(2.2, 3.6), 2)),
+        "pump_flow_lpm": maybe(round(rng.uniform(20, 200), 1)),
+        "rear_lift_capacity_kg": maybe(round(rng.uniform(800, 10000))),
+        "differential_lock": maybe(rng.random() < 0.5),
+        "has_precision_agriculture": maybe(rng.random() < 0.3),
+    }
+
+
+def sql_engine(filters) -> list[int]:
+    db = SessionLocal()
+    try:
+        return [t.id for t in apply_sql(db.query(Tractor), filters).all()]
+    finally:
+        db.close()
+
+
+def snapshot_engine(filters) -> list[int]:
+    return [row["id"] for row in tractor_snapshot.get().filter(filters)]
+
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(Tractor).filter(Tractor.model.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def timed(func, filters, repeat: int) -> tuple[float, list[int]]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ids = func(filters)
+    return (time.perf_counter() - start) / repeat, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tractors", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    cleanup()
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        upsert_tractors(db, [random_row(i, rng) for i in range(args.tractors)])
+        db.commit()
+    finally:
+        db.close()
+    catalog_version.bump()
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            tractor_snapshot.get()
+        print(f"{engine.dialect.name}: {args.tractors} tractores, snapshot cargado en "
+              f"{tractor_snapshot.stats()['last_load_seconds'] * 1000:.0f} ms\n")
+
+        for params in QUERIES:
+            filters = active_filters(params)
+            t_sql, ids_sql = timed(sql_engine, filters, args.repeat)
+            t_snap, ids_snap = timed(snapshot_engine, filters, args.repeat)
+            same = "OK" if sorted(ids_sql) == sorted(ids_snap) else "DIFIEREN"
+            print(f"{len(ids_sql):6d} filas  sql: {t_sql * 1000:8.2f} ms  |  snapshot: {t_snap * 1000:7.2f} ms  "
+                  f"x{t_sql / t_snap:6.1f}  {same}  {params}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
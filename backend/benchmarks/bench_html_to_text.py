@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: HTML -> texto visible.
+
+Compara el camino anterior (BeautifulSoup 'html.parser' + find_all + decompose)
+con los caminos nuevos de app.services.html_text (lxml y tokenizador por eventos).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_html_to_text                  # páginas guardadas en la caché de scrapeo
+    python -m benchmarks.bench_html_to_text pagina1.html ... # archivos HTML sueltos
+    python -m benchmarks.bench_html_to_text --repeat 20
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from app.config import SCRAPE_CACHE_DIR
+from app.services import html_text
+
+
+def bs4_html_to_text(html: str) -> str:
+    """
+    Implementación anterior del scraper (referencia).
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup.find_all(list(html_text.SKIP_TAGS)):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)
+
+
+def load_pages(paths: list[str]) -> list[tuple[str, str]]:
+    pages = []
+    if paths:
+        for path in paths:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                pages.append((os.path.basename(path), f.read()))
+        return pages
+
+    for path in sorted(glob.glob(os.path.join(SCRAPE_CACHE_DIR, "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            pages.append((entry["value"]["url"], entry["value"]["html"]))
+        except (OSError, ValueError, KeyError):
+            continue
+    return pages
+
+
+def measure(func, pages: list[tuple[str, str]], repeat: int) -> tuple[float, float, list[str]]:
+    """
+    Devuelve (ms por página, pico de memoria en MB, textos obtenidos).
+    """
+    textos = [func(html) for _, html in pages] # calentamiento
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            func(html)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _, html in pages:
+        func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed * 1000 / (repeat * len(pages)), peak / (1024 * 1024), textos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Archivos HTML (por defecto, la caché de scrapeo)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = load_pages(args.paths)
+    if not pages:
+        print(f"No hay páginas guardadas en '{SCRAPE_CACHE_DIR}'. Pasa archivos HTML como argumentos.")
+        sys.exit(1)
+
+    total_kb = sum(len(html) for _, html in pages) / 1024
+    print(f"{len(pages)} páginas ({total_kb:.0f} KB), {args.repeat} repeticiones\n")
+
+    candidatos = {"bs4 html.parser (anterior)": bs4_html_to_text, "eventos (stdlib)": html_text._html_to_text_events}
+    if html_text.HAS_LXML:
+        candidatos["lxml"] = html_text._html_to_text_lxml
+
+    base_ms = None
+    base_textos = None
+    for nombre, func in candidatos.items():
+        ms, peak_mb, textos = measure(func, pages, args.repeat)
+        if base_ms is None:
+            base_ms, base_textos = ms, textos
+        # Mismas palabras que la referencia (el espaciado puede variar ligeramente)
+        iguales = sum(a.split() == b.split() for a, b in zip(textos, base_textos))
+        print(f"{nombre:<28} {ms:8.2f} ms/página  x{base_ms / ms:5.1f}  pico {peak_mb:6.1f} MB  "
+              f"texto idéntico {iguales}/{len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
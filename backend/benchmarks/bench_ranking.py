@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: ranking multicriterio y frontera de Pareto de /tractors/rank.
+
+Compara pareto_front (services/ranking.py) con la comprobación directa O(n^2)
+(cada punto contra todos los demás, vectorizada por fila) y mide rank() completo
+sobre catálogos sintéticos con 2, 3 y 4 objetivos. No usa la base de datos.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_ranking --tractors 100000 --check 3000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.ranking import Objective, pareto_front, rank
+
+COLUMNS = ["rated_power_net_kw", "shipping_weight_kg", "pump_flow_lpm", "rear_lift_capacity_kg"]
+DIRECTIONS = ["max", "min", "max", "max"]
+
+
+def synthetic_values(n: int, k: int, rng: np.random.Generator) -> np.ndarray:
+    # Potencia, peso, caudal y levante correlacionados (un tractor grande lo tiene todo grande), ~10% de huecos
+    power = rng.uniform(20, 400, n)
+    values = np.column_stack([power * rng.uniform(0.5, 1.5, n) * (i + 1) for i in range(k)])
+    values[rng.random((n, k)) < 0.1] = np.nan
+    return np.round(values, 1)
+
+
+def direct_front(costs: np.ndarray) -> np.ndarray:
+    """
+    Referencia: un punto es dominado si otro es <= en todo y < en algo.
+    """
+    return np.array([
+        not np.any(np.all(costs <= c, axis=1) & np.any(costs < c, axis=1))
+        for c in costs
+    ])
+
+
+def timed(func, repeat: int = 3) -> tuple[float, object]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tractors", type=int, default=100000)
+    parser.add_argument("--check", type=int, default=3000, help="Filas para la comparación con O(n^2)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    for k in (2, 3, 4):
+        objectives = tuple(Objective(COLUMNS[j], DIRECTIONS[j], 1.0) for j in range(k))
+        values = synthetic_values(args.tractors, k, rng)
+        complete = values[~np.isnan(values).any(axis=1)]
+        costs = np.where([d == "max" for d in DIRECTIONS[:k]], -complete, complete)
+
+        small = costs[:args.check]
+        t_direct, ref = timed(lambda: direct_front(small), 1)
+        t_small, mask = timed(lambda: pareto_front(small))
+        t_front, front = timed(lambda: pareto_front(costs))
+        ids = np.arange(1, len(values) + 1)
+        names = [(None, f"T{i}") for i in ids]
+        t_rank, result = timed(lambda: rank(ids, names, values, objectives, 20, 100))
+
+        print(f"{k} objetivos, {len(costs)} tractores completos:")
+        print(f"  O(n^2) directo ({args.check}) : {t_direct * 1000:9.1f} ms")
+        print(f"  pareto_front   ({args.check}) : {t_small * 1000:9.2f} ms  x{t_direct / t_small:.0f}  "
+              f"{'OK' if (mask == ref).all() else 'DIFIEREN'}")
+        print(f"  pareto_front   (todos)        : {t_front * 1000:9.2f} ms  ({int(front.sum())} en la frontera)")
+        print(f"  rank() completo               : {t_rank * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
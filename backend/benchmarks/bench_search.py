@@ -0,0 +1,114 @@
+"""
+Benchmark: búsqueda de tractores por nombre.
+
+Compara el ILIKE '%texto%' de /tractors/filter (company / model) con la búsqueda
+difusa de /tractors/search: pg_trgm si la BD lo tiene, y siempre el índice de
+trigramas en memoria. Muestra latencia y qué encuentra cada uno con erratas.
+Usa la base de datos de DATABASE_URL con modelos 'BENCH-...' que se borran al terminar.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_search --tractors 20000 --repeat 50
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+from sqlalchemy import or_, select
+
+from app.config import TRACTOR_SEARCH_MIN_SCORE
+from app.database.connection import SessionLocal, AsyncReadSessionLocal, async_read_engine, engine, Base
+from app.database.models import Tractor
+from app.database.bulk import upsert_tractors
+from app.database.search import ensure_trigram_indexes, sql_search
+from app.database.versioning import catalog_version
+from app.services.tractor_snapshot import tractor_snapshot
+from benchmarks.bench_filter_engine import PREFIX, random_row
+
+# Nombres reales con las consultas que escribe la gente (separadores distintos, erratas)
+NAMED = [("New Holland", f"{PREFIX}T7.190"), ("John Deere", f"{PREFIX}6R 110"), ("Fendt", f"{PREFIX}1050 Vario")]
+QUERIES = ["T7.190", "t7 190", "deere 6r", "jhon deer 6r", "fendt 1050"]
+
+
+def ilike(query: str) -> list[str]:
+    db = SessionLocal()
+    try:
+        pattern = f"%{query}%"
+        stmt = select(Tractor.model).where(or_(Tractor.company.ilike(pattern), Tractor.model.ilike(pattern))).limit(10)
+        return [model for (model,) in db.execute(stmt)]
+    finally:
+        db.close()
+
+
+def ngram(query: str) -> list[str]:
+    return [r["model"] for r in tractor_snapshot.get().search(query, 10, TRACTOR_SEARCH_MIN_SCORE)]
+
+
+def pg_trgm(query: str) -> list[str]:
+    async def run():
+        async with AsyncReadSessionLocal() as db:
+            return [r["model"] for r in await sql_search(db, query, 10, TRACTOR_SEARCH_MIN_SCORE)]
+    return asyncio.run(run())
+
+
+def timed(func, query: str, repeat: int) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(query)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(Tractor).filter(Tractor.model.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tractors", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    engines = {"ilike": ilike, "ngram (memoria)": ngram}
+    if ensure_trigram_indexes(engine):
+        engines["pg_trgm"] = pg_trgm
+    cleanup()
+    rng = random.Random(42)
+    rows = [random_row(i, rng) for i in range(args.tractors)]
+    rows += [{"model": model, "company": company} for company, model in NAMED]
+    db = SessionLocal()
+    try:
+        upsert_tractors(db, rows)
+        db.commit()
+    finally:
+        db.close()
+    catalog_version.bump()
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            tractor_snapshot.get()
+            start = time.perf_counter()
+            tractor_snapshot.get().search("warm-up", 1, 1.0)
+        print(f"{engine.dialect.name}: {len(rows)} tractores, índice de trigramas en memoria construido en "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+        for query in QUERIES:
+            print(f"'{query}':")
+            for name, func in engines.items():
+                seconds, models = timed(func, query, args.repeat)
+                found = [m.removeprefix(PREFIX) for m in models if not m[len(PREFIX):].isdigit()][:3]
+                print(f"  {name:16s}: {seconds * 1000:7.2f} ms  {len(models):2d} resultados  {found}")
+    finally:
+        cleanup()
+        asyncio.run(async_read_engine.dispose())
+
+
+if __name__ == "__main__":
+    main()
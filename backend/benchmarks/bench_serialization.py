@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: serialización de listas de tractores.
+
+Compara la validación + serialización con Pydantic (List[TractorPublic], como hacía
+FastAPI con response_model) con la ruta rápida de app.services.serialization
+(filas -> orjson, sin modelo por fila), y el primer trozo del modo NDJSON.
+No usa la base de datos: las filas son dicts sintéticos con todas las columnas.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serialization --rows 5000
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import Boolean, Float, Integer
+
+from app.database.models import Tractor
+from app.database.schemas import TractorPublic
+from app.services.serialization import HAS_ORJSON, rows_to_json, iter_ndjson
+
+
+def synthetic_rows(n: int) -> list[dict]:
+    rng = random.Random(7)
+    rows = []
+    for i in range(n):
+        row = {}
+        for column in Tractor.__table__.columns:
+            if rng.random() < 0.3 and not column.primary_key and column.name != "model":
+                row[column.name] = None
+            elif isinstance(column.type, Boolean):
+                row[column.name] = rng.random() < 0.5
+            elif isinstance(column.type, Integer):
+                row[column.name] = i + 1 if column.primary_key else rng.randint(1, 3000)
+            elif isinstance(column.type, Float):
+                row[column.name] = round(rng.uniform(0, 500), 2)
+            else:
+                row[column.name] = f"{column.name} {rng.randint(1, 999)} valor"
+        rows.append(row)
+    return rows
+
+
+def timed(func, repeat: int) -> tuple[float, object]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    adapter = TypeAdapter(List[TractorPublic])
+
+    t_pyd, body_pyd = timed(lambda: adapter.dump_json(adapter.validate_python(rows)), args.repeat)
+    t_fast, body_fast = timed(lambda: rows_to_json(rows), args.repeat)
+    t_first, _ = timed(lambda: next(iter_ndjson(rows)), args.repeat)
+
+    print(f"{args.rows} tractores x {len(Tractor.__table__.columns)} columnas (orjson: {'sí' if HAS_ORJSON else 'no'})")
+    print(f"pydantic       : {t_pyd * 1000:8.1f} ms  ({len(body_pyd) / 1e6:.2f} MB)")
+    print(f"ruta rápida    : {t_fast * 1000:8.1f} ms  ({len(body_fast) / 1e6:.2f} MB)  x{t_pyd / t_fast:.1f}")
+    print(f"NDJSON 1er lote: {t_first * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
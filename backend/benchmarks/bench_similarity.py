@@ -0,0 +1,87 @@
+"""
+Micro-benchmark: k vecinos de /tractors/{id}/similar.
+
+Construye el FeatureIndex (services/similarity.py) sobre un catálogo sintético con
+huecos y mide la construcción (lo que se paga una vez por versión del catálogo) y la
+latencia de las consultas k-NN. Comprueba los vecinos contra un cálculo directo fila a fila.
+No usa la base de datos.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_similarity --tractors 100000 --queries 200 --k 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.similarity import MIN_SHARED_WEIGHT, SIMILARITY_FEATURES, FeatureIndex
+
+
+def synthetic_columns(n: int, rng: np.random.Generator) -> list[np.ndarray]:
+    # Especificaciones correlacionadas con la potencia (como en un catálogo real), ~25% de huecos
+    power = rng.uniform(20, 400, n)
+    columns = []
+    for i, _ in enumerate(SIMILARITY_FEATURES):
+        column = power * (1 + 0.3 * i) + rng.normal(0, 20, n)
+        column[rng.random(n) < 0.25] = np.nan
+        columns.append(column)
+    return columns
+
+
+def direct_neighbours(columns: list[np.ndarray], row: int, k: int) -> list[int]:
+    """
+    Misma distancia, calculada fila a fila (referencia).
+    """
+    raw = np.column_stack(columns)
+    z = (raw - np.nanmean(raw, axis=0)) / np.nanstd(raw, axis=0)
+    weights = np.array([f.weight for f in SIMILARITY_FEATURES])
+    query_weight = weights * ~np.isnan(z[row])
+    distances = []
+    for other in range(len(z)):
+        shared = query_weight * ~np.isnan(z[other])
+        if other == row or shared.sum() < MIN_SHARED_WEIGHT * query_weight.sum():
+            continue
+        diff = np.where(shared > 0, z[other] - z[row], 0.0)
+        distances.append((np.sqrt((shared * diff ** 2).sum() / shared.sum()), other))
+    return [other for _, other in sorted(distances)[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tractors", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    columns = synthetic_columns(args.tractors, rng)
+    ids = np.arange(1, args.tractors + 1, dtype=np.int64)
+
+    start = time.perf_counter()
+    index = FeatureIndex(ids, columns)
+    build = time.perf_counter() - start
+
+    queries = rng.integers(1, args.tractors + 1, args.queries)
+    latencies = []
+    for tractor_id in queries:
+        start = time.perf_counter()
+        index.neighbours(int(tractor_id), args.k)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    check_rows = min(args.tractors, 5000)
+    check = FeatureIndex(ids[:check_rows], [c[:check_rows] for c in columns])
+    same = all(
+        [p for p, _, _ in check.neighbours(int(ids[row]), args.k)] == direct_neighbours([c[:check_rows] for c in columns], row, args.k)
+        for row in range(5)
+    )
+
+    print(f"{args.tractors} tractores x {len(SIMILARITY_FEATURES)} especificaciones, k={args.k}")
+    print(f"construcción   : {build * 1000:8.1f} ms")
+    print(f"consulta p50   : {latencies[len(latencies) // 2] * 1000:8.2f} ms")
+    print(f"consulta p99   : {latencies[int(len(latencies) * 0.99)] * 1000:8.2f} ms")
+    print(f"vecinos = cálculo directo ({check_rows} filas): {'OK' if same else 'DIFIEREN'}")
+
+
+if __name__ == "__main__":
+    main()
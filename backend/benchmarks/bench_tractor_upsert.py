@@ -0,0 +1,117 @@
+"""
+Benchmark: escritura de valores extraídos en la tabla 'tractors'.
+
+Compara el camino anterior (por cada variable: query + setattr + commit + refresh)
+con 'upsert_tractors' (INSERT ... ON CONFLICT (model) DO UPDATE por lotes).
+Usa la base de datos de DATABASE_URL con modelos 'BENCH-...' que se borran al terminar.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_tractor_upsert --tractors 50
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from app.database.connection import SessionLocal, engine, Base
+from app.database.models import Tractor
+from app.database.bulk import upsert_tractors
+from app.services.extraction_service import build_tractor_row
+
+# Valores de ejemplo con su columna numérica (como los devuelve el extractor)
+SAMPLE_VALUES = {
+    "numero_de_cilindros": "4",
+    "displacement": "4.5 L [276 ci]",
+    "oil_capacity": "15 qts [14.2 L]",
+    "starter_volts": "12",
+    "max_power_gross": "75 hp [55.9 kW]",
+    "rated_rpm": "2400",
+    "torque": "220 lb-ft [298 Nm]",
+    "rated_power_net": "67 hp [50.0 kW]",
+    "pump_flow": "11.3 gpm [42.8 lpm]",
+    "pressure": "2,850 psi [196 bar]",
+    "wheelbase": "80.1 inches [203 cm]",
+    "shipping_weight": "5,512 lbs [2500 kg]",
+    "fuel_tank_capacity": "18.5 gal [70.0 L]",
+    "rear_lift_capacity": "3,494 lbs [1585 kg]",
+    "battery_volts": "12",
+}
+
+PREFIX = "BENCH-"
+
+
+def per_field_path(rows: list[tuple[str, str, dict]]):
+    """
+    Implementación anterior de /extract: una transacción por variable.
+    """
+    db = SessionLocal()
+    try:
+        for model, company, valores in rows:
+            for variable_name, valor in valores.items():
+                tractor = db.query(Tractor).filter(Tractor.model == model).first()
+                if not tractor:
+                    tractor = Tractor(model=model, company=company)
+                    db.add(tractor)
+                    db.flush()
+                for columna, v in build_tractor_row(model, None, {variable_name: valor}).items():
+                    if columna != "model":
+                        setattr(tractor, columna, v)
+                db.commit()
+                db.refresh(tractor)
+    finally:
+        db.close()
+
+
+def bulk_path(rows: list[tuple[str, str, dict]]) -> dict:
+    db = SessionLocal()
+    try:
+        counts = upsert_tractors(db, [build_tractor_row(m, c, v) for m, c, v in rows])
+        db.commit()
+        return counts
+    finally:
+        db.close()
+
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(Tractor).filter(Tractor.model.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def timed(func, rows) -> tuple[float, object]:
+    # Los 'print' de la conversión no deben entrar en la medición
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(rows)
+        elapsed = time.perf_counter() - start
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tractors", type=int, default=50)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    rows = [(f"{PREFIX}{i:05d}", "Bench", SAMPLE_VALUES) for i in range(args.tractors)]
+    n_valores = args.tractors * len(SAMPLE_VALUES)
+    print(f"{engine.dialect.name}: {args.tractors} tractores x {len(SAMPLE_VALUES)} variables = {n_valores} valores\n")
+
+    cleanup()
+    try:
+        for etiqueta in ("insertar", "actualizar"):
+            t_old, _ = timed(per_field_path, rows)
+            if etiqueta == "insertar":
+                cleanup()
+            t_new, counts = timed(bulk_path, rows)
+            print(f"[{etiqueta}] por variable: {t_old * 1000:8.1f} ms  |  upsert: {t_new * 1000:8.1f} ms  "
+                  f"x{t_old / t_new:5.1f}  {counts}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Configuración común de los tests: SQLite y cachés en un directorio temporal.
+
+Las variables se fijan ANTES de importar 'app' (config.py las lee al importarse) y
+load_dotenv no pisa las que ya existen, así que el .env local no se cuela en los tests.
+"""
+import os
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="tractor-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/test.db"
+for _name in ("ASYNC_DATABASE_URL", "DATABASE_READ_URL", "ASYNC_DATABASE_READ_URL"):
+    os.environ[_name] = "" # Vacías: se derivan de DATABASE_URL
+os.environ["SCRAPE_CACHE_DIR"] = os.path.join(_TMP, "scrape")
+os.environ["LLM_MEMO_DIR"] = os.path.join(_TMP, "llm_memo")
+os.environ["MINING_JOBS_DIR"] = os.path.join(_TMP, "jobs")
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app.database.connection import Base, engine
+from app.database.models import Tractor
+from app.database.versioning import catalog_version
+from app.main import app
+from app.services.scraper import normalize_url, scrape_cache
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def empty_catalog():
+    """
+    Tabla 'tractors' vacía (y versión del catálogo nueva) antes del test.
+    """
+    with engine.begin() as conn:
+        conn.execute(Tractor.__table__.delete())
+    catalog_version.bump()
+    yield
+
+
+class AppClient:
+    """
+    Peticiones a la app en proceso (ASGITransport), cada llamada en su propio event loop.
+    'loop_thread' es el hilo de ese loop: para comprobar qué trabajo corre fuera de él.
+    """
+
+    def __init__(self):
+        self.loop_thread = None
+
+    def run(self, scenario):
+        """
+        Ejecuta 'await scenario(client)' con un cliente abierto y devuelve su resultado.
+        """
+        async def main():
+            self.loop_thread = threading.current_thread().name
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+
+        return asyncio.run(main())
+
+    def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        return self.run(lambda client: client.request(method, path, **kwargs))
+
+    def get(self, path: str, **kwargs) -> httpx.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> httpx.Response:
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", path, **kwargs)
+
+
+@pytest.fixture
+def api():
+    return AppClient()
+
+
+@pytest.fixture
+def cached_page():
+    """
+    Guarda una página en la caché del scraper para que la extracción no salga a internet:
+    cached_page(url, text) -> url.
+    """
+    def put(url: str, text: str = "Engine net power 100 hp.") -> str:
+        scrape_cache.set(normalize_url(url), {"url": url, "html": f"<p>{text}</p>", "text": text,
+                                              "content_hash": url, "structured": {}})
+        return url
+
+    return put
@@ -0,0 +1,27 @@
+"""
+Rutas de administración: las que recorren las cachés en disco no corren en el event loop.
+"""
+import threading
+
+import pytest
+
+from app.services.llm_memo import extraction_memo
+from app.services.scraper import scrape_cache
+
+
+@pytest.mark.parametrize("path, params, cache, method", [
+    ("/api/v1/admin/cache/llm-memo", {"variable_name": "rated_power_net"}, extraction_memo, "invalidate"),
+    ("/api/v1/admin/cache/scrape", {}, scrape_cache, "clear"),
+])
+def test_disk_cache_maintenance_runs_in_threadpool(monkeypatch, api, path, params, cache, method):
+    seen = []
+    original = getattr(cache, method)
+
+    def record(*args, **kwargs):
+        seen.append(threading.current_thread().name)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(cache, method, record)
+    response = api.delete(path, params=params)
+    assert response.status_code == 200 and "removed" in response.json()
+    assert seen and seen[0] != api.loop_thread
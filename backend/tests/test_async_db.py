@@ -0,0 +1,117 @@
+"""
+Capa asíncrona de la BD: URLs de los drivers async, escritura con AsyncSession y
+rutas de lectura con el motor 'sql' (mismas respuestas que el snapshot).
+"""
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.api.routes import tractors as tractors_routes
+from app.database.connection import AsyncSessionLocal, _async_url, async_engine, get_async_db
+from app.database.models import Tractor
+from app.database.versioning import catalog_version
+from app.services.extraction_service import store_tractor_values_async
+from app.services.tractor_snapshot import SnapshotStore
+
+CATALOG = [
+    ("Deere", "6R 110", {"rated_power_net": "110 hp", "shipping_weight": "11,464 lbs", "drive_type": "4x4 MFWD"}),
+    ("Deere", "6R 130", {"rated_power_net": "130 hp", "shipping_weight": "12,125 lbs", "drive_type": "4x4 MFWD"}),
+    ("Fendt", "724", {"rated_power_net": "174 kW", "pump_flow": "152 l/min", "drive_type": "4WD"}),
+    ("Kubota", "M5-111", {"rated_power_net": "83 kW"}),
+]
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://u:p@db:5432/tractors", "postgresql+asyncpg://u:p@db:5432/tractors"),
+    ("sqlite:///./tractors.db", "sqlite+aiosqlite:///./tractors.db"),
+    ("postgresql+asyncpg://u:p@db/tractors", "postgresql+asyncpg://u:p@db/tractors"),
+])
+def test_async_url(url, expected):
+    assert _async_url(url).render_as_string(hide_password=False) == expected
+
+
+def _store_catalog():
+    async def run():
+        counts = []
+        async with AsyncSessionLocal() as db:
+            for company, model, values in CATALOG:
+                counts.append(await store_tractor_values_async(db, model, company, values))
+        return counts
+
+    return asyncio.run(run())
+
+
+def test_store_tractor_values_async_upserts_and_bumps_version(empty_catalog):
+    version = catalog_version.current()
+    counts = _store_catalog()
+    assert [c["inserted"] for c in counts] == [1] * len(CATALOG)
+    assert catalog_version.current() != version
+
+    async def update_and_read():
+        async with AsyncSessionLocal() as db:
+            again = await store_tractor_values_async(db, "724", "Fendt", {"torque": "1,000 Nm"})
+            row = (await db.execute(select(Tractor).where(Tractor.model == "724"))).scalar_one()
+            return again, row
+
+    again, row = asyncio.run(update_and_read())
+    assert again["inserted"] == 0 and again["updated"] == 1
+    # La actualización conserva lo anterior y añade el String y su columna canónica
+    assert row.rated_power_net == "174 kW" and row.rated_power_net_kw == pytest.approx(174)
+    assert row.torque == "1,000 Nm" and row.torque_nm == pytest.approx(1000)
+
+
+def test_get_async_db_yields_session_on_write_engine():
+    async def run():
+        dependency = get_async_db()
+        db = await anext(dependency)
+        try:
+            return db.bind is async_engine, (await db.execute(select(1))).scalar()
+        finally:
+            await dependency.aclose()
+
+    assert asyncio.run(run()) == (True, 1)
+
+
+@pytest.fixture
+def both_engines(monkeypatch, api, empty_catalog):
+    """
+    Llama a una ruta con el motor 'sql' (AsyncSession) y con un snapshot recién cargado.
+    """
+    _store_catalog()
+    monkeypatch.setattr(tractors_routes, "tractor_snapshot", SnapshotStore(max_age_seconds=60, min_reload_seconds=0))
+
+    async def call(client, path: str, params: dict) -> dict:
+        results = {}
+        for engine_name in ("sql", "snapshot"):
+            monkeypatch.setattr(tractors_routes, "FILTER_ENGINE", engine_name)
+            response = await client.get(path, params=params)
+            assert response.status_code == 200, response.text
+            results[engine_name] = response
+        return results
+
+    return lambda path, params: api.run(lambda client: call(client, path, params))
+
+
+def test_filter_sql_matches_snapshot(both_engines):
+    params = {"power_net_min_kw": 83, "sort": "-rated_power_net_kw", "fields": "company,model,rated_power_net_kw"}
+    results = both_engines("/api/v1/tractors/filter", params)
+    sql, snapshot = (results[e].json() for e in ("sql", "snapshot"))
+    assert [t["model"] for t in sql] == ["724", "6R 130", "M5-111"]
+    assert sql == snapshot
+
+
+def test_filter_ndjson_streams_from_async_session(both_engines):
+    results = both_engines("/api/v1/tractors/filter", {"format": "ndjson", "fields": "model"})
+    lines = {e: [json.loads(line) for line in results[e].text.splitlines()] for e in results}
+    assert len(lines["sql"]) == len(CATALOG)
+    assert lines["sql"] == lines["snapshot"]
+
+
+def test_facets_sql_matches_snapshot(both_engines):
+    params = {"columns": "rated_power_net_kw,shipping_weight_kg", "bins": 4}
+    results = both_engines("/api/v1/tractors/facets", params)
+    sql, snapshot = (results[e].json() for e in ("sql", "snapshot"))
+    assert sql["total"] == len(CATALOG)
+    assert sql == snapshot
@@ -0,0 +1,101 @@
+"""
+Backfill de las columnas numéricas canónicas: qué escribe y cómo lo escribe.
+"""
+import pytest
+from sqlalchemy import event, select
+
+from app.database.connection import engine
+from app.database.models import Tractor
+from app.database.versioning import catalog_version
+from app.services.backfill import run_backfill
+
+ROWS = [
+    # rated_power_net (String) -> rated_power_net_kw; shipping_weight -> shipping_weight_kg
+    {"model": "B1", "rated_power_net": "100 hp", "shipping_weight": "5000 lbs"},
+    {"model": "B2", "rated_power_net": "75 kW", "shipping_weight": None},
+    {"model": "B3", "rated_power_net": "sin dato", "rated_power_net_kw": 50.0},
+    {"model": "B4", "rated_power_net": "100 hp", "rated_power_net_kw": 74.57, "shipping_weight": "2000 kg",
+     "shipping_weight_kg": 2000.0},
+    {"model": "B5", "rated_power_net": None, "shipping_weight": "3000 kg"},
+]
+
+
+@pytest.fixture
+def catalog(empty_catalog):
+    keys = {k for row in ROWS for k in row}
+    with engine.begin() as conn:
+        conn.execute(Tractor.__table__.insert(), [{"company": "Test", **dict.fromkeys(keys), **row} for row in ROWS])
+
+
+@pytest.fixture
+def updates():
+    """
+    Sentencias UPDATE enviadas a la BD: (filas, executemany).
+    """
+    seen = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            seen.append((len(parameters) if executemany else 1, executemany))
+
+    event.listen(engine, "before_cursor_execute", listener)
+    yield seen
+    event.remove(engine, "before_cursor_execute", listener)
+
+
+def _numeric() -> dict[str, tuple]:
+    with engine.connect() as conn:
+        rows = conn.execute(select(Tractor.model, Tractor.rated_power_net_kw, Tractor.shipping_weight_kg))
+        return {model: (kw, kg) for model, kw, kg in rows}
+
+
+def test_backfill_fills_and_converts(catalog, updates):
+    version = catalog_version.current()
+    report = run_backfill(variables=["rated_power_net", "shipping_weight"], chunk_size=2)
+
+    values = _numeric()
+    assert values["B1"] == (pytest.approx(74.57, abs=0.01), pytest.approx(2267.96, abs=0.01))
+    assert values["B2"] == (pytest.approx(75.0), None)
+    assert values["B3"] == (50.0, None) # String sin número: se conserva el numérico
+    assert values["B5"] == (None, pytest.approx(3000.0))
+
+    assert report["rows_scanned"] == 5
+    assert report["rows_touched"] == 3 # B4 ya estaba bien
+    assert report["values_updated"] == {"rated_power_net_kw": 2, "shipping_weight_kg": 2}
+    # Una sola sentencia por bloque con cambios (bloques de 2 filas: B1-B2, B3-B4, B5);
+    # con una sola fila SQLAlchemy la envía como execute simple
+    assert updates == [(2, True), (1, False)]
+    assert catalog_version.current() != version
+
+
+def test_backfill_is_idempotent(catalog, updates):
+    run_backfill(variables=["rated_power_net", "shipping_weight"])
+    updates.clear()
+    version = catalog_version.current()
+
+    report = run_backfill(variables=["rated_power_net", "shipping_weight"])
+    assert report["rows_touched"] == 0 and report["values_updated"] == {}
+    assert updates == []
+    assert catalog_version.current() == version # Nada escrito: el snapshot sigue valiendo
+
+
+def test_dry_run_writes_nothing(catalog, updates):
+    before = _numeric()
+    report = run_backfill(variables=["rated_power_net", "shipping_weight"], dry_run=True)
+    assert report["dry_run"] and report["rows_touched"] == 3
+    assert updates == []
+    assert _numeric() == before
+
+
+def test_clear_unparsed(catalog):
+    report = run_backfill(variables=["rated_power_net"], clear_unparsed=True)
+    assert _numeric()["B3"] == (None, None)
+    assert report["values_updated"] == {"rated_power_net_kw": 3}
+
+
+def test_untouched_cells_keep_their_value(catalog):
+    # B3 sólo cambia en una columna de su bloque: la otra se reescribe con su valor actual
+    with engine.begin() as conn:
+        conn.execute(Tractor.__table__.update().where(Tractor.model == "B3").values(shipping_weight_kg=123.0))
+    run_backfill(variables=["rated_power_net", "shipping_weight"], chunk_size=2)
+    assert _numeric()["B3"] == (50.0, 123.0)
@@ -0,0 +1,35 @@
+"""
+Chat: los 429 de Groq llegan al limitador compartido (el SDK no los reintenta por su cuenta).
+"""
+import httpx
+
+from app.api.routes import chat as chat_module
+from app.services.rate_limiter import RateLimiterRegistry
+
+COMPLETION = {
+    "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": chat_module.CHAT_MODEL,
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Hola"}}],
+}
+
+
+def test_rate_limited_chat_backs_off_in_shared_bucket(monkeypatch, api):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"retry-after": "0"}, json={"error": {"message": "Rate limit"}})
+        return httpx.Response(200, json=COMPLETION)
+
+    assert chat_module.client.max_retries == 0
+    client = chat_module.client.with_options(http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(chat_module, "client", client)
+    registry = RateLimiterRegistry({"groq": 6000})
+    monkeypatch.setattr(chat_module, "rate_limiters", registry)
+
+    response = api.post("/api/v1/chat/talk", json={"message": "hola"})
+    assert response.status_code == 200 and response.json() == {"response": "Hola"}
+    # Un solo intento por llamada del limitador: el 429 lo vio el bucket
+    assert len(calls) == 2
+    bucket = registry.get("groq", chat_module.CHAT_MODEL)
+    assert bucket.rate_limited == 1 and bucket.rate < bucket.max_rate
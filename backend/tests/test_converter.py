@@ -0,0 +1,138 @@
+"""
+Conversor de unidades: propiedades (hypothesis) y casos concretos de separadores y redondeo.
+"""
+import math
+
+import pandas as pd
+import pytest
+from hypothesis import given, strategies as st
+
+from app.services.backfill import convert_column
+from app.services.converter import DECIMAL_GROUP_DIMENSIONS, DECIMAL_GROUP_MIN_FACTOR, UNITS, VARIABLES, get_canonical_values, parse_canonical
+
+# Una variable con unidades por magnitud (la primera del registro)
+BY_DIMENSION = {}
+for _name, _spec in VARIABLES.items():
+    if UNITS[_spec.dimension]:
+        BY_DIMENSION.setdefault(_spec.dimension, _name)
+
+# Unidades en las que "4.485" es un decimal (litros, metros...)
+DECIMAL_UNITS = {
+    alias: (BY_DIMENSION[dimension], factor)
+    for dimension in DECIMAL_GROUP_DIMENSIONS
+    for alias, factor in UNITS[dimension].items()
+    if factor >= DECIMAL_GROUP_MIN_FACTOR
+}
+
+UNIT_CASES = [(dimension, alias, factor) for dimension in BY_DIMENSION for alias, factor in UNITS[dimension].items()]
+
+integers = st.integers(min_value=0, max_value=99_999_999)
+
+
+def _group(n: int, sep: str) -> str:
+    return f"{n:,}".replace(",", sep)
+
+
+@given(n=integers, sep=st.sampled_from([",", ".", " ", "\u00a0", "\u202f", ""]))
+def test_thousands_separators_round_trip(n, sep):
+    assert parse_canonical("shipping_weight", f"{_group(n, sep)} kg") == n
+
+
+@given(n=st.integers(min_value=0, max_value=9_999_999), tenths=st.integers(min_value=0, max_value=9))
+def test_decimals_round_trip_us_and_eu(n, tenths):
+    expected = n + tenths / 10
+    us = f"{n:,}.{tenths}"
+    eu = f"{_group(n, '.')},{tenths}"
+    assert parse_canonical("shipping_weight", f"{us} kg") == pytest.approx(expected)
+    assert parse_canonical("shipping_weight", f"{eu} kg") == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("dimension, alias, factor", UNIT_CASES)
+@given(n=st.integers(min_value=1, max_value=999_999))
+def test_unit_invariance(dimension, alias, factor, n):
+    # El mismo valor en cualquier alias de la magnitud da el valor canónico escalado
+    variable = BY_DIMENSION[dimension]
+    # En litros o metros "1,500" es un decimal: los miles se escriben con espacio
+    grouped = _group(n, " ") if alias in DECIMAL_UNITS else f"{n:,}"
+    assert parse_canonical(variable, f"{grouped} {alias}") == pytest.approx(n * factor)
+    assert parse_canonical(variable, f"{n} {alias.upper()}") == pytest.approx(n * factor)
+
+
+@given(n=st.integers(min_value=1, max_value=999), millis=st.integers(min_value=0, max_value=999),
+       sep=st.sampled_from([",", "."]), unit=st.sampled_from(sorted(DECIMAL_UNITS)))
+def test_single_separator_is_decimal_in_large_units(n, millis, sep, unit):
+    variable, factor = DECIMAL_UNITS[unit]
+    expected = (n + millis / 1000) * factor
+    assert parse_canonical(variable, f"{n}{sep}{millis:03d} {unit}") == pytest.approx(expected)
+
+
+@given(n=st.integers(min_value=1, max_value=9_999), unit=st.sampled_from(["kg", "lbs"]), other=st.sampled_from(["cm", "psi", "hp", "l"]))
+def test_first_unit_of_the_right_dimension_wins(n, unit, other):
+    # Las unidades de otra magnitud se saltan ("11,464 lbs [5200 kg]" -> las libras)
+    expected = n * UNITS["mass"][unit]
+    assert parse_canonical("shipping_weight", f"{n} {other} / {n:,} {unit} [999 kg]") == pytest.approx(expected)
+
+
+@given(st.text(max_size=60))
+def test_never_raises_and_is_finite(text):
+    for variable in ("rated_power_net", "wheelbase", "rated_rpm", "numero_de_cilindros"):
+        value = parse_canonical(variable, text)
+        assert value is None or math.isfinite(value)
+
+
+@given(st.lists(st.one_of(
+    st.builds(lambda n, d: f"{n:,}.{d} rpm", st.integers(0, 9_999), st.integers(0, 9)),
+    st.builds(lambda n, d: f"{n},{d}", st.integers(0, 9_999), st.integers(0, 9)),
+    st.sampled_from(["2,099.5 rpm", "2,100.5", "sin dato", ""]),
+), max_size=20))
+def test_backfill_matches_extraction(values):
+    # convert_column (columna a columna) y get_canonical_values (valor a valor) coinciden
+    converted = convert_column(pd.Series(values, dtype="string"), "rated_rpm").tolist()
+    for raw, got in zip(values, converted):
+        _, expected = get_canonical_values("rated_rpm", raw)
+        assert (expected is None and math.isnan(got)) or got == expected
+
+
+@pytest.mark.parametrize("variable, text, expected", [
+    ("shipping_weight", "12 500 kg", 12500),
+    ("shipping_weight", "5.670 kg", 5670),
+    ("shipping_weight", "1.234.567 kg", 1234567),
+    ("shipping_weight", "2,850 kg", 2850),
+    ("shipping_weight", "1.200,50 kg", 1200.5),
+    ("shipping_weight", "0,750 kg", 0.75), # Un cero inicial no es un grupo de miles
+    ("displacement", "4.5 L [276 ci]", 4.5),
+    ("displacement", "108,6 l", 108.6),
+    # Litros y metros: un único separador con 3 cifras es decimal
+    ("displacement", "4.485 L", 4.485),
+    ("displacement", "6.788 l", 6.788),
+    ("wheelbase", "2.870 m", 2.87),
+    ("wheelbase", "2,870 m", 2.87),
+    ("fuel_tank_capacity", "1.200,5 l", 1200.5),
+    # ... pero no en sus unidades pequeñas
+    ("displacement", "6,788 cc", 6.788),
+    ("wheelbase", "2,870 mm", 2.87),
+    ("rated_power_net", "1.050 hp", 1050 * 0.7457),
+    ("torque", "1,000 Nm", 1000),
+    ("rated_rpm", "2 100 – 2 400 rpm", 2250),
+    ("rated_rpm", "2,100-2,400 rpm", 2250),
+    ("numero_de_cilindros", "4 cyl 150 hp", 4),
+])
+def test_number_formats(variable, text, expected):
+    assert parse_canonical(variable, text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2,099.6 rpm", 2100), # Con int() se guardaba 2099
+    ("2,099.4 rpm", 2099),
+    ("1,940/2,036", 1940),
+])
+def test_integer_columns_round_to_nearest(text, expected):
+    column, value = get_canonical_values("rated_rpm", text)
+    assert column == "rated_rpm_num" and value == expected and isinstance(value, int)
+    assert convert_column(pd.Series([text], dtype="string"), "rated_rpm").tolist() == [expected]
+
+
+def test_backfill_keeps_decimal_litres_and_metres():
+    converted = convert_column(pd.Series(["4.485 L", "6.788 l", None], dtype="string"), "displacement").tolist()
+    assert converted[:2] == [pytest.approx(4.485), pytest.approx(6.788)] and math.isnan(converted[2])
+    assert convert_column(pd.Series(["2.870 m"], dtype="string"), "wheelbase").tolist() == [pytest.approx(2.87)]
@@ -0,0 +1,171 @@
+"""
+Eventos de los trabajos de minería: historial acotado y secuencia (Last-Event-ID)
+que continúa tras reiniciar el servidor y reanudar.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.services import mining_jobs as mining_jobs_module
+from app.services.mining_jobs import COMPLETED, INTERRUPTED, RUNNING, MiningJob, MiningJobManager
+
+TRACTORS = [{"company": "Test", "model": f"M{i}", "url": f"https://example.com/m{i}"} for i in range(3)]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """
+    Scrapeo, extracción y guardado falsos. 'failing' = modelos cuyo scrapeo falla.
+    """
+    failing = set()
+
+    async def scrape_page(url):
+        return None if url.rsplit("/", 1)[1].upper() in failing else {"url": url, "text": "x", "structured": {}}
+
+    async def extract_page_values(page, variable_names):
+        return {v: "100 hp" for v in variable_names}, {}
+
+    monkeypatch.setattr(mining_jobs_module, "scrape_page", scrape_page)
+    monkeypatch.setattr(mining_jobs_module, "extract_page_values", extract_page_values)
+    monkeypatch.setattr(MiningJobManager, "_store", staticmethod(lambda *args: None))
+    return failing
+
+
+async def _run_to_end(manager: MiningJobManager, job_id: str, last_seq: int = 0) -> list[dict]:
+    return [event async for event in manager.subscribe(job_id, last_seq)]
+
+
+def test_history_is_bounded_and_drops_values(tmp_path, pipeline):
+    manager = MiningJobManager(str(tmp_path), max_concurrency=2, event_history=5)
+
+    async def run():
+        job = manager.submit(TRACTORS, ["rated_power_net"])
+        live = await _run_to_end(manager, job.id)
+        return job, live
+
+    job, live = asyncio.run(run())
+
+    assert [e["seq"] for e in live] == list(range(1, job.last_seq + 1))
+    assert live[-1]["status"] == COMPLETED
+    done = [e for e in live if e["type"] == "tractor_done"]
+    assert done[0]["values"] == {"rated_power_net": "100 hp"} and done[0]["extracted"] == 1
+
+    history = list(manager._events[job.id])
+    assert len(history) == 5
+    assert [e["seq"] for e in history] == list(range(job.last_seq - 4, job.last_seq + 1))
+    assert all("values" not in e for e in history)
+
+
+def test_late_subscriber_gets_summary_when_history_was_trimmed(tmp_path, pipeline):
+    manager = MiningJobManager(str(tmp_path), max_concurrency=2, event_history=3)
+
+    async def run():
+        job = manager.submit(TRACTORS, ["rated_power_net"])
+        await manager._tasks[job.id]
+        return job, await _run_to_end(manager, job.id, last_seq=1)
+
+    job, events = asyncio.run(run())
+    # Se perdió más de lo que guarda el historial: primero el resumen, luego lo que queda
+    assert events[0]["type"] == "job_status" and events[0]["seq"] == 1 and events[0]["done"] == 3
+    assert [e["seq"] for e in events[1:]] == [job.last_seq - 2, job.last_seq - 1, job.last_seq]
+
+
+def test_resume_after_restart_continues_sequence(tmp_path, pipeline):
+    pipeline.add("M1")
+    first = MiningJobManager(str(tmp_path), max_concurrency=2)
+
+    async def run_first():
+        job = first.submit(TRACTORS, ["rated_power_net"])
+        return job, await _run_to_end(first, job.id)
+
+    job, events = asyncio.run(run_first())
+    assert job.summary()["failed"] == 1
+    last_seen = events[-1]["seq"]
+    assert last_seen == job.last_seq
+
+    # "Reinicio": otro gestor sobre el mismo directorio lee el checkpoint
+    pipeline.clear()
+    second = MiningJobManager(str(tmp_path), max_concurrency=2)
+    assert second.jobs[job.id].last_seq == last_seen
+
+    async def run_second():
+        second.resume(job.id)
+        return await _run_to_end(second, job.id, last_seq=last_seen)
+
+    resumed = asyncio.run(run_second())
+    assert [e["seq"] for e in resumed] == list(range(last_seen + 1, last_seen + 1 + len(resumed)))
+    assert resumed[-1]["status"] == COMPLETED and resumed[-1]["done"] == 3
+
+
+def test_crashed_job_skips_unsaved_sequence_numbers(tmp_path):
+    manager = MiningJobManager(str(tmp_path), max_concurrency=3)
+    job = MiningJob(id="crashed", tractors=TRACTORS, variable_names=["rated_power_net"], status=RUNNING, last_seq=10)
+    manager._save_checkpoint(job)
+
+    reloaded = MiningJobManager(str(tmp_path), max_concurrency=3).jobs["crashed"]
+    assert reloaded.status == INTERRUPTED
+    # Los 'stage' emitidos tras el último checkpoint (hasta 4 por worker) no se reutilizan
+    assert reloaded.last_seq == 10 + 4 * 3
+
+
+def test_old_checkpoint_without_last_seq(tmp_path):
+    (tmp_path / "old.json").write_text(
+        '{"id": "old", "tractors": [], "variable_names": [], "status": "completed", '
+        '"created_at": 0, "updated_at": 0, "results": {}}', encoding="utf-8"
+    )
+    assert MiningJobManager(str(tmp_path), max_concurrency=1).jobs["old"].last_seq == 0
+
+
+def test_checkpoints_are_written_off_the_event_loop(tmp_path, pipeline, monkeypatch):
+    manager = MiningJobManager(str(tmp_path), max_concurrency=2)
+    threads = []
+    write = manager._write_checkpoint
+
+    def record(job_id, data):
+        threads.append(threading.current_thread().name)
+        write(job_id, data)
+
+    monkeypatch.setattr(manager, "_write_checkpoint", record)
+
+    async def run():
+        job = manager.submit(TRACTORS, ["rated_power_net"]) # Alta: síncrona, una vez
+        await manager._tasks[job.id]
+        return job, threading.current_thread().name
+
+    job, loop_thread = asyncio.run(run())
+    # Inicio + uno por tractor + cierre, todos en hilos
+    assert threads[0] == loop_thread
+    assert len(threads) == 1 + 1 + len(TRACTORS) + 1
+    assert all(name != loop_thread for name in threads[1:])
+    # El último checkpoint escrito es el estado final
+    reloaded = MiningJobManager(str(tmp_path), max_concurrency=2).jobs[job.id]
+    assert reloaded.status == COMPLETED and reloaded.last_seq == job.last_seq
+
+
+def test_shutdown_emits_the_status_it_stores(tmp_path, monkeypatch):
+    async def scrape_page(url):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(mining_jobs_module, "scrape_page", scrape_page)
+    manager = MiningJobManager(str(tmp_path), max_concurrency=2)
+
+    async def run():
+        job = manager.submit(TRACTORS, ["rated_power_net"])
+        events = []
+
+        async def listen():
+            async for event in manager.subscribe(job.id):
+                events.append(event)
+
+        listener = asyncio.create_task(listen())
+        while not any(e["type"] == "stage" for e in events):
+            await asyncio.sleep(0.01)
+        await manager.shutdown()
+        await listener
+        return job, events
+
+    job, events = asyncio.run(run())
+    assert events[-1]["type"] == "job_status" and events[-1]["status"] == INTERRUPTED
+    assert job.status == INTERRUPTED
+    assert MiningJobManager(str(tmp_path), max_concurrency=2).jobs[job.id].status == INTERRUPTED
@@ -0,0 +1,60 @@
+"""
+/tractors/filter debe seguir respondiendo rápido mientras hay extracciones en curso:
+la llamada al LLM (síncrona, segundos) y la caché de páginas en disco no pueden
+bloquear el event loop.
+"""
+import asyncio
+import time
+
+import httpx
+
+from app.services.extraction_service import analyst
+
+LLM_SECONDS = 0.5
+EXTRACTIONS = 4
+
+
+def _slow_run_batch(contexto: str, nombres_variables: list[str]) -> dict[str, str]:
+    # Como una llamada real a Groq vía DSPy: bloquea su hilo durante toda la latencia
+    time.sleep(LLM_SECONDS)
+    return {nombre: "100 hp" for nombre in nombres_variables}
+
+
+async def _measure(client: httpx.AsyncClient) -> tuple[float, list[float], list[int]]:
+    async def extract(i: int) -> int:
+        url = f"https://example.com/tractor-{i}"
+        response = await client.post("/api/v1/extract/batch", json={
+            "tractor_model": f"TEST-{i}", "company": "Test", "source_url": url,
+            "variable_names": ["rated_power_net"],
+        })
+        return response.status_code
+
+    await client.get("/api/v1/tractors/filter") # Calentamiento: conexiones, snapshot, threadpool
+    start = time.perf_counter()
+    extractions = [asyncio.create_task(extract(i)) for i in range(EXTRACTIONS)]
+    latencies = []
+    i = 0
+    while not all(task.done() for task in extractions):
+        i += 1
+        t = time.perf_counter()
+        response = await client.get("/api/v1/tractors/filter", params={"model": f"x{i}"}) # Sin caché de respuesta
+        assert response.status_code == 200
+        latencies.append(time.perf_counter() - t)
+        await asyncio.sleep(0.01)
+    statuses = await asyncio.gather(*extractions)
+    return time.perf_counter() - start, latencies, statuses
+
+
+def test_filter_latency_while_extractions_in_flight(monkeypatch, api, cached_page, empty_catalog):
+    monkeypatch.setattr(analyst, "run_batch", _slow_run_batch)
+    for i in range(EXTRACTIONS):
+        cached_page(f"https://example.com/tractor-{i}", "Engine net power 100 hp. " * 2000)
+
+    elapsed, latencies, statuses = api.run(_measure)
+
+    assert statuses == [200] * EXTRACTIONS
+    # Las extracciones estuvieron en curso (y en paralelo: no 4 x LLM_SECONDS)
+    assert LLM_SECONDS <= elapsed < EXTRACTIONS * LLM_SECONDS
+    # Varias consultas mientras tanto, ninguna esperando a que termine un LLM
+    assert len(latencies) >= 5
+    assert max(latencies) < LLM_SECONDS / 5
@@ -0,0 +1,114 @@
+"""
+Pools de lectura y escritura: a qué pool va cada ruta, métricas de checkout y
+compatibilidad con la configuración anterior (un solo pool).
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.api.routes import tractors as tractors_routes
+from app.database.connection import pool_metrics
+from app.database.pool_metrics import PoolMetrics, instrumented_pool_class
+from app.services.extraction_service import analyst
+from app.services.tractor_snapshot import SnapshotStore
+
+POOLS = ("read", "read_async", "write", "write_async")
+
+
+def _checkouts() -> dict[str, int]:
+    return {name: pool_metrics[name].checkouts for name in POOLS}
+
+
+def _used(before: dict[str, int]) -> set[str]:
+    return {name for name, count in _checkouts().items() if count > before[name]}
+
+
+@pytest.mark.parametrize("path", ["/api/v1/tractors/filter", "/api/v1/tractors/facets"])
+def test_catalog_reads_use_read_pool(monkeypatch, api, empty_catalog, path):
+    monkeypatch.setattr(tractors_routes, "FILTER_ENGINE", "sql")
+    before = _checkouts()
+    assert api.get(path, params={"company": "pools"}).status_code == 200
+    assert _used(before) == {"read_async"}
+
+
+def test_snapshot_loads_from_read_pool(empty_catalog):
+    before = _checkouts()
+    SnapshotStore(max_age_seconds=60, min_reload_seconds=0).get()
+    assert _used(before) == {"read"}
+
+
+def test_extraction_writes_use_write_pool(monkeypatch, api, cached_page, empty_catalog):
+    url = cached_page("https://example.com/pools")
+    monkeypatch.setattr(analyst, "run_batch", lambda contexto, nombres: {n: "100 hp" for n in nombres})
+
+    before = _checkouts()
+    response = api.post("/api/v1/extract/batch", json={
+        "tractor_model": "POOLS-1", "company": "Test", "source_url": url, "variable_names": ["rated_power_net"],
+    })
+    assert response.status_code == 200 and response.json()["extracted_count"] == 1
+    assert "write_async" in _used(before)
+    assert not _used(before) & {"read", "read_async"}
+
+
+def test_checkout_wait_and_timeout_are_measured(tmp_path):
+    metrics = PoolMetrics("test")
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db", poolclass=instrumented_pool_class(QueuePool, metrics),
+        pool_size=1, max_overflow=0, pool_timeout=0.3,
+    )
+    metrics.attach(engine)
+    waiting = []
+
+    with engine.connect() as held:
+        held.execute(text("SELECT 1"))
+
+        def blocked():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+        thread = threading.Thread(target=blocked)
+        thread.start()
+        while metrics.waiting == 0 and thread.is_alive():
+            pass
+        waiting.append(metrics.waiting)
+        thread.join()
+
+    stats = metrics.stats()
+    assert waiting == [1] and stats["max_waiting"] == 1 and stats["waiting"] == 0
+    assert stats["timeouts"] == 1 and stats["checkouts"] == 1 and stats["connects"] == 1
+    assert stats["pool"] == "InstrumentedQueuePool" and stats["checkout_timing"] is True
+    engine.dispose()
+
+
+def test_pool_without_do_get_falls_back_to_events():
+    class NoDoGet: # Como un pool de una versión de SQLAlchemy sin _do_get
+        pass
+
+    metrics = PoolMetrics("fallback")
+    assert instrumented_pool_class(NoDoGet, metrics) is NoDoGet
+    assert metrics.stats()["checkout_timing"] is False
+    # StaticPool tiene _do_get: se envuelve igual que QueuePool
+    assert instrumented_pool_class(StaticPool, PoolMetrics("static")) is not StaticPool
+
+
+@pytest.mark.parametrize("env, expected", [
+    ({}, [10, 20, 5, 5]),
+    ({"DB_POOL_SIZE": "15", "DB_MAX_OVERFLOW": "3"}, [15, 3, 15, 3]),
+    ({"DB_POOL_SIZE": "15", "DB_WRITE_POOL_SIZE": "2", "DB_READ_MAX_OVERFLOW": "0"}, [15, 0, 2, 5]),
+])
+def test_legacy_pool_settings_are_defaults(env, expected, tmp_path):
+    names = ["DB_READ_POOL_SIZE", "DB_READ_MAX_OVERFLOW", "DB_WRITE_POOL_SIZE", "DB_WRITE_MAX_OVERFLOW"]
+    clean = {k: v for k, v in os.environ.items() if not k.startswith("DB_")}
+    # Proceso aparte (config.py se lee al importar) y fuera de backend/: sin .env local
+    output = subprocess.run(
+        [sys.executable, "-c", f"import json, app.config as c; print(json.dumps([getattr(c, n) for n in {names!r}]))"],
+        env={**clean, **env, "PYTHONPATH": os.path.dirname(os.path.dirname(os.path.abspath(__file__)))},
+        cwd=tmp_path, capture_output=True, text=True, check=True,
+    ).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == expected
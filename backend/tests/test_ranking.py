@@ -0,0 +1,37 @@
+"""
+Objetivos de /tractors/rank: validación de pesos y scores siempre finitos.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app.services.ranking import parse_objectives, rank
+
+
+@pytest.mark.parametrize("weight", ["inf", "-inf", "nan", "infinity", "1e400", "0", "-1", "abc"])
+def test_invalid_weights_are_rejected(weight):
+    with pytest.raises(ValueError):
+        parse_objectives(f"rated_power_net_kw:max:{weight}", 5)
+
+
+def test_valid_objectives():
+    parsed = parse_objectives("rated_power_net_kw:MAX:2.5, shipping_weight_kg:min", 5)
+    assert [(o.column, o.direction, o.weight) for o in parsed] == [
+        ("rated_power_net_kw", "max", 2.5), ("shipping_weight_kg", "min", 1.0),
+    ]
+
+
+def test_huge_weights_keep_scores_finite():
+    objectives = parse_objectives("rated_power_net_kw:max:1e308,shipping_weight_kg:min:1e308", 5)
+    values = np.array([[100.0, 5000.0], [150.0, 6000.0], [120.0, 4000.0]])
+    result = rank(np.arange(3), [("T", f"M{i}") for i in range(3)], values, objectives, 3, 3)
+    scores = [row["score"] for row in result["top"]]
+    assert all(math.isfinite(score) for score in scores)
+    assert len(scores) == 3 and max(scores) <= 1
+
+
+def test_rank_route_returns_400_for_infinite_weight(api):
+    response = api.get("/api/v1/tractors/rank", params={"objectives": "rated_power_net_kw:max:inf"})
+    assert response.status_code == 400
+    assert "finito" in response.json()["detail"]
@@ -0,0 +1,152 @@
+"""
+Búsquedas web compartidas (misma consulta a la vez): errores y cancelaciones
+de una petición no pueden llegar a las demás como otra cosa.
+"""
+import asyncio
+
+import pytest
+
+from app.services import searcher
+from app.services.rate_limiter import RateLimiterRegistry
+
+URL = "https://www.tractordata.com/farm-tractors/x.html"
+
+
+@pytest.fixture
+def web(monkeypatch):
+    """
+    Sin base de conocimiento ni caché; '_race_strategies' falso que espera a 'release'.
+    """
+    state = {"calls": 0, "cancelled": 0, "error": None, "release": asyncio.Event()}
+
+    async def race(clean_query):
+        state["calls"] += 1
+        try:
+            await state["release"].wait()
+        except asyncio.CancelledError:
+            state["cancelled"] += 1
+            raise
+        if state["error"]:
+            raise state["error"]
+        return URL, True
+
+    monkeypatch.setattr(searcher, "_race_strategies", race)
+    monkeypatch.setattr(searcher.url_registry, "lookup", lambda query: None)
+    monkeypatch.setattr(searcher.url_registry, "remember", lambda query, url: None)
+    monkeypatch.setattr(searcher, "search_cache", searcher.SearchCache(60, 60, 100))
+    return state
+
+
+async def _waiting(key: str, waiters: int):
+    """
+    Espera a que 'waiters' peticiones estén esperando la búsqueda compartida de 'key'.
+    """
+    for _ in range(500):
+        search = searcher._inflight.get(key)
+        if search is not None and search.waiters == waiters:
+            return search
+        await asyncio.sleep(0.002)
+    raise AssertionError(f"Nadie espera la búsqueda de '{key}'")
+
+
+def _search(query: str, n: int) -> list[asyncio.Task]:
+    return [asyncio.create_task(searcher.search_google_free(query)) for _ in range(n)]
+
+
+def test_concurrent_searches_share_one_web_search(web):
+    async def scenario():
+        tasks = _search("John Deere 6R 110", 3)
+        await _waiting("john deere 6r 110", 3)
+        web["release"].set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(scenario()) == [URL] * 3
+    assert web["calls"] == 1
+    assert searcher._inflight == {}
+
+
+def test_error_reaches_every_waiter_as_itself(web):
+    web["error"] = RuntimeError("DuckDuckGo caído")
+
+    async def scenario():
+        tasks = _search("Fendt 724", 3)
+        await _waiting("fendt 724", 3)
+        web["release"].set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    # Antes llegaba a los demás como CancelledError (y su trabajo de minería se marcaba CANCELLED)
+    assert all(type(r) is RuntimeError for r in results)
+    assert searcher._inflight == {}
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_others(web):
+    async def scenario():
+        leader, = _search("Case IH Puma 150", 1)
+        await _waiting("case ih puma 150", 1)
+        follower, = _search("Case IH Puma 150", 1)
+        await _waiting("case ih puma 150", 2)
+        leader.cancel()
+        await _waiting("case ih puma 150", 1)
+        web["release"].set()
+        return leader, await follower
+
+    leader, url = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert url == URL
+    assert web["calls"] == 1 and web["cancelled"] == 0
+    # La búsqueda terminó y quedó en la caché para la próxima vez
+    assert searcher.search_cache.get("case ih puma 150") == (True, URL)
+
+
+def test_search_is_cancelled_when_nobody_waits(web):
+    async def scenario():
+        tasks = _search("Claas Axion 870", 2)
+        search = await _waiting("claas axion 870", 2)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(search.task, return_exceptions=True)
+        assert search.task.cancelled()
+        # Una petición nueva lanza su propia búsqueda (no hereda la cancelada)
+        again, = _search("Claas Axion 870", 1)
+        await _waiting("claas axion 870", 1)
+        web["release"].set()
+        return await again
+
+    assert asyncio.run(scenario()) == URL
+    assert web["cancelled"] == 1 and web["calls"] == 2
+
+
+@pytest.fixture
+def ddg(monkeypatch):
+    """
+    Estrategias reales con '_ddg_text' falso ('error' que lanza o 'results') y sin esperas del limitador.
+    """
+    state = {"error": None, "results": [], "calls": 0}
+
+    def fake_ddg_text(strategy):
+        state["calls"] += 1
+        if state["error"]:
+            raise state["error"]
+        return state["results"]
+
+    monkeypatch.setattr(searcher, "_ddg_text", fake_ddg_text)
+    monkeypatch.setattr(searcher, "rate_limiters", RateLimiterRegistry({"duckduckgo": 60000}))
+    monkeypatch.setattr(searcher.url_registry, "lookup", lambda query: None)
+    monkeypatch.setattr(searcher.url_registry, "remember", lambda query, url: None)
+    monkeypatch.setattr(searcher, "search_cache", searcher.SearchCache(60, 60, 100))
+    return state
+
+
+def test_failed_searches_are_not_negatively_cached(ddg):
+    ddg["error"] = RuntimeError("DuckDuckGo caído")
+    assert asyncio.run(searcher.search_google_free("Massey Ferguson 7718")) is None
+    assert ddg["calls"] == 6 # 3 estrategias x 2 intentos
+    assert searcher.search_cache.get("massey ferguson 7718") == (False, None)
+
+
+def test_completed_searches_without_results_are_negatively_cached(ddg):
+    ddg["results"] = [{"href": "https://www.facebook.com/x", "title": "Massey Ferguson 7718"}]
+    assert asyncio.run(searcher.search_google_free("Massey Ferguson 7718")) is None
+    assert searcher.search_cache.get("massey ferguson 7718") == (True, None)
@@ -0,0 +1,116 @@
+"""
+Adaptadores de sitio contra páginas guardadas en tests/fixtures/.
+"""
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from app.services.html_text import BS_PARSER
+from app.services.site_adapters import extract_structured, get_adapter, jsonld_adapter, tractordata_adapter
+
+FIXTURES = Path(__file__).parent / "fixtures"
+TRACTORDATA_URL = "https://www.tractordata.com/farm-tractors/007/3/8/7386-john-deere-6r-110.html"
+
+
+def _soup(name: str) -> BeautifulSoup:
+    return BeautifulSoup((FIXTURES / name).read_text(encoding="utf-8"), BS_PARSER)
+
+
+def test_tractordata_spec_page():
+    assert tractordata_adapter(_soup("tractordata_6r110.html")) == {
+        "numero_de_cilindros": "4",
+        "displacement": "4.5 L [276 ci]",
+        "rated_power_net": "110 hp [82.0 kW]",
+        "rated_rpm": "2,100",
+        "torque": "405 lb-ft [549 Nm]",
+        "torque_rpm": "1,600",
+        "oil_capacity": "16.9 qts [16 L]",
+        "starter_volts": "12",
+        "battery_volts": "12",
+        "battery_AH": "190",
+        "drive_type": "4x4 MFWD",
+        "gears": "20-speed AutoQuad Plus",
+        "pressure": "2,900 psi [200 bar]",
+        "pump_flow": "30.4 gpm [115.1 lpm]",
+        "capacity": "19.8 gal [75 L]",
+        "rear_type": "II/IIIN",
+        "rear_lift_capacity": "10,600 lbs [4808 kg]",
+        "detalles_velocidades_pto": "540/1000",
+        "engine_rpm_at_pto": "1,940/2,036",
+        "wheelbase": "102.4 inches [260 cm]",
+        "length": "177 inches [449 cm]",
+        "shipping_weight": "11,464 lbs [5200 kg]",
+        "ballasted_weight": "20,503 lbs [9300 kg]",
+        "front_tread": "60 to 88 inches",
+        "axle_clearance_front": "18.9 inches [48 cm]",
+        "axle_clearance_rear": "21.3 inches [54 cm]",
+        "fuel_tank_capacity": "63.4 gal [240 L]",
+    }
+
+
+def test_tractordata_ambiguous_labels_need_their_section():
+    valores = tractordata_adapter(_soup("tractordata_6r110.html"))
+    # "Engine:" es la descripción del motor, no la marca; "Drive:" no es la tracción
+    assert "marca_motor" not in valores
+    assert valores["drive_type"] == "4x4 MFWD"
+    # El "Front axle:" de la sección de dimensiones (tipo de eje) no es la altura libre
+    assert valores["axle_clearance_front"] == "18.9 inches [48 cm]"
+
+
+@pytest.mark.parametrize("html, expected", [
+    # Fuera de su sección, las etiquetas ambiguas se ignoran
+    ("<tr><td>Volts:</td><td>12</td></tr><tr><td>Pressure:</td><td>30 psi</td></tr>"
+     "<tr><td>Front axle:</td><td>20 in</td></tr><tr><td>Engine RPM:</td><td>2100</td></tr>", {}),
+    # Cabecera de sección como fila 'etiqueta:' sin valor
+    ("<tr><td>Hydraulics:</td><td></td></tr><tr><td>Pressure:</td><td>2900 psi</td></tr>",
+     {"pressure": "2900 psi"}),
+    ("<tr><td colspan=2>Electrical</td></tr><tr><td>Volts:</td><td>12</td></tr>", {"battery_volts": "12"}),
+    ("<tr><th colspan=2>Rear PTO</th></tr><tr><td>Engine RPM:</td><td>2100</td></tr>",
+     {"engine_rpm_at_pto": "2100"}),
+    # La primera aparición gana
+    ("<tr><td>Weight:</td><td>5000 lbs</td></tr><tr><td>Shipping weight:</td><td>6000 lbs</td></tr>",
+     {"shipping_weight": "5000 lbs"}),
+])
+def test_tractordata_sections(html, expected):
+    assert tractordata_adapter(BeautifulSoup(f"<table>{html}</table>", BS_PARSER)) == expected
+
+
+def test_jsonld_additional_properties():
+    # @graph, unitText, primera aparición, nombres desconocidos o ambiguos y JSON roto
+    assert jsonld_adapter(_soup("jsonld_product.html")) == {
+        "rated_power_net": "75 kW",
+        "numero_de_cilindros": "4",
+        "pump_flow": "60 l/min",
+        "fuel_tank_capacity": "140 L",
+    }
+
+
+def test_jsonld_list_of_nodes():
+    html = ('<script type="application/ld+json">[{"@type": "Product", "additionalProperty": '
+            '[{"name": "Wheelbase", "value": "2.5", "unitText": "m"}]}, "no es un nodo"]</script>')
+    assert jsonld_adapter(BeautifulSoup(html, BS_PARSER)) == {"wheelbase": "2.5 m"}
+
+
+def test_get_adapter_by_domain():
+    assert get_adapter(TRACTORDATA_URL) is tractordata_adapter
+    assert get_adapter("https://tractordata.com/x.html") is tractordata_adapter
+    assert get_adapter("https://nottractordata.com/x.html") is None
+    assert get_adapter("https://example.com/tractordata.com") is None
+
+
+def test_extract_structured_merges_site_adapter_and_jsonld():
+    tractordata = (FIXTURES / "tractordata_6r110.html").read_text(encoding="utf-8")
+    jsonld = (FIXTURES / "jsonld_product.html").read_text(encoding="utf-8")
+    head, _, tail = tractordata.partition("</head>")
+    merged = head + jsonld[jsonld.index("<script"):jsonld.index("</head>")] + "</head>" + tail
+
+    valores = extract_structured(TRACTORDATA_URL, merged)
+    # La tabla del sitio manda; JSON-LD sólo completa lo que falta
+    assert valores["rated_power_net"] == "110 hp [82.0 kW]"
+    assert valores["fuel_tank_capacity"] == "63.4 gal [240 L]"
+    assert len(valores) == len(tractordata_adapter(_soup("tractordata_6r110.html")))
+
+    # Otros dominios: sin tablas, sólo JSON-LD
+    assert extract_structured("https://example.com/6r110", tractordata) == {}
+    assert extract_structured("https://example.com/5100", jsonld) == jsonld_adapter(_soup("jsonld_product.html"))
@@ -0,0 +1,72 @@
+"""
+Las rutas del motor 'snapshot' hacen su trabajo NumPy (y construyen los índices)
+en el threadpool, no en el hilo del event loop.
+"""
+import threading
+
+import pytest
+
+from app.services.tractor_snapshot import TractorSnapshot
+
+
+@pytest.fixture
+def threads(monkeypatch):
+    """
+    Hilo en el que se ejecuta cada método del snapshot: {método: nombre del hilo}.
+    """
+    seen = {}
+
+    def record(name):
+        original = getattr(TractorSnapshot, name)
+
+        def wrapper(self, *args, **kwargs):
+            seen[name] = threading.current_thread().name
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(TractorSnapshot, name, wrapper)
+
+    for name in ("page", "objective_values", "facets", "search", "similar"):
+        record(name)
+    return seen
+
+
+@pytest.fixture
+def get(api):
+    """
+    GET a la app: (código de estado, hilo del event loop).
+    """
+    def call(path: str, **params) -> tuple[int, str]:
+        return api.get(path, params=params).status_code, api.loop_thread
+
+    return call
+
+
+@pytest.mark.parametrize("params", [{}, {"format": "ndjson"}])
+def test_filter_pages_in_threadpool(threads, get, empty_catalog, params):
+    status, loop_thread = get("/api/v1/tractors/filter", sort="-rated_power_net_kw", **params)
+    assert status == 200
+    assert threads["page"] != loop_thread
+
+
+def test_rank_reads_objectives_in_threadpool(threads, get, empty_catalog):
+    status, loop_thread = get("/api/v1/tractors/rank", objectives="rated_power_net_kw:max")
+    assert status == 200
+    assert threads["objective_values"] != loop_thread
+
+
+def test_facets_run_in_threadpool(threads, get, empty_catalog):
+    status, loop_thread = get("/api/v1/tractors/facets", bins=5)
+    assert status == 200
+    assert threads["facets"] != loop_thread
+
+
+def test_search_builds_its_index_in_threadpool(threads, get, empty_catalog):
+    status, loop_thread = get("/api/v1/tractors/search", q="deere 6r")
+    assert status == 200
+    assert threads["search"] != loop_thread
+
+
+def test_similar_builds_its_index_in_threadpool(threads, get, empty_catalog):
+    status, loop_thread = get("/api/v1/tractors/1/similar", k=3)
+    assert status == 404 # Catálogo vacío; el índice se consulta igual
+    assert threads["similar"] != loop_thread
@@ -0,0 +1,111 @@
+"""
+Recarga del snapshot de filtros: el anterior se sigue sirviendo mientras un solo
+hilo lo reconstruye, como mucho una vez por intervalo mínimo.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.database.connection import engine
+from app.database.models import Tractor
+from app.database.versioning import catalog_version
+from app.services.tractor_snapshot import SnapshotStore
+
+MIN_RELOAD = 0.3
+
+
+def _insert(model: str):
+    with engine.begin() as conn:
+        conn.execute(Tractor.__table__.insert(), [{"company": "Test", "model": model}])
+    catalog_version.bump()
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def store(empty_catalog):
+    return SnapshotStore(max_age_seconds=60, min_reload_seconds=MIN_RELOAD)
+
+
+def test_first_load_is_synchronous(store):
+    _insert("S1")
+    snapshot = store.get()
+    assert snapshot.size == 1 and snapshot.is_current()
+    assert store.get() is snapshot and store.loads == 1
+
+
+def test_stale_snapshot_is_served_while_one_rebuild_runs(store, monkeypatch):
+    old = store.get()
+    started, release = threading.Event(), threading.Event()
+    load = store._load
+
+    def slow_load():
+        started.set()
+        release.wait(5)
+        return load()
+
+    monkeypatch.setattr(store, "_load", slow_load)
+    _insert("S1")
+
+    # Ninguna petición espera a la recarga: todas reciben el snapshot anterior
+    start = time.perf_counter()
+    assert all(store.get() is old for _ in range(50))
+    assert time.perf_counter() - start < MIN_RELOAD
+    assert not old.is_current() and store.stale_hits == 50
+
+    assert started.wait(5)
+    assert all(store.get() is old for _ in range(10)) # Sigue recargando: no se lanza otra
+    release.set()
+    _wait_for(lambda: store.get() is not old)
+    assert store.loads == 2 and store.get().size == 1
+
+
+def test_burst_of_writes_is_debounced_into_one_reload(store):
+    store.get()
+    for i in range(20):
+        _insert(f"S{i}")
+        store.get()
+    time.sleep(MIN_RELOAD / 2)
+    assert store.loads == 1 # Aún dentro del intervalo mínimo
+
+    _wait_for(lambda: store.get().is_current())
+    assert store.loads == 2 and store.get().size == 20
+
+
+def test_failed_rebuild_keeps_previous_snapshot(store, monkeypatch):
+    old = store.get()
+
+    def broken_load():
+        raise RuntimeError("BD caída")
+
+    monkeypatch.setattr(store, "_load", broken_load)
+    _insert("S1")
+    assert store.get() is old
+    _wait_for(lambda: not store._rebuilding)
+    assert store.get() is old # Se reintenta en segundo plano; mientras, el anterior
+
+
+def test_filter_does_not_cache_responses_from_a_stale_snapshot(monkeypatch, api, empty_catalog):
+    store = SnapshotStore(max_age_seconds=60, min_reload_seconds=MIN_RELOAD)
+    monkeypatch.setattr("app.api.routes.tractors.tractor_snapshot", store)
+
+    async def models(client):
+        response = await client.get("/api/v1/tractors/filter", params={"company": "Test"})
+        return sorted(t["model"] for t in response.json())
+
+    async def run(client):
+        assert await models(client) == []
+        _insert("S1")
+        stale = await models(client) # Snapshot anterior mientras se recarga
+        await asyncio.to_thread(_wait_for, lambda: store._snapshot.is_current())
+        return stale, await models(client)
+
+    stale, fresh = api.run(run)
+    assert stale == [] and fresh == ["S1"]
@@ -0,0 +1,56 @@
+"""
+Registro de URLs: la clave de un modelo no resuelve consultas de otro modelo.
+"""
+import pytest
+
+from app.database.connection import engine
+from app.database.models import SourceURL
+from app.services.url_registry import KNOWN_TRACTOR_URLS, UrlRegistry
+
+
+@pytest.fixture
+def registry():
+    """
+    Registro recién cargado sobre una tabla 'source_urls' con sólo las semillas.
+    """
+    with engine.begin() as conn:
+        conn.execute(SourceURL.__table__.delete())
+    registry = UrlRegistry()
+    registry.load()
+    return registry
+
+
+@pytest.mark.parametrize("name", ["John Deere tractor", "John Deere", "New Holland specs", "Fendt"])
+def test_brand_only_names_are_not_remembered(registry, name):
+    assert registry.remember(name, "https://example.com/brand") is None
+    assert registry.lookup("John Deere 5075E specs") is None
+
+
+def test_series_key_does_not_resolve_other_models(registry):
+    assert registry.remember("John Deere 6R", "https://example.com/6r") == "john deere 6r"
+    assert registry.lookup("John Deere 6R technical specs")[1] == "https://example.com/6r"
+    assert registry.lookup("John Deere 6R 250 specs") is None
+    assert registry.lookup("John Deere 6R 150") is None
+
+
+def test_seed_resolves_only_its_own_model(registry):
+    assert registry.lookup("John Deere 6R 110 technical specs tractordata")[1] == KNOWN_TRACTOR_URLS["john deere 6r 110"]
+    assert registry.lookup("New Holland T7.190 specs")[0] == "new holland t7 190"
+    assert registry.lookup("John Deere 6R 150") is None
+    assert registry.lookup("New Holland T7.210") is None
+
+
+def test_learned_key_resolves_variants_without_new_model_tokens(registry):
+    registry.remember("John Deere 5075E", "https://example.com/5075e")
+    assert registry.lookup("John Deere 5075E PowrReverse")[1] == "https://example.com/5075e"
+    assert registry.lookup("John Deere 5090E") is None
+
+
+def test_brand_only_keys_stored_earlier_are_ignored(registry):
+    with engine.begin() as conn:
+        conn.execute(SourceURL.__table__.insert().values(key="john deere", name="John Deere tractor",
+                                                         url="https://example.com/brand", origin="web"))
+    reloaded = UrlRegistry()
+    reloaded.load()
+    assert reloaded.lookup("John Deere 5075E") is None
+    assert reloaded.stats()["urls"] == len(KNOWN_TRACTOR_URLS)
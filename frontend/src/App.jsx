@@ -4,7 +4,7 @@ import { Routes, Route, Link, useLocation } from 'react-router-dom';
 import { useComparison } from './context/ComparisonContext';
 
 // 1. Importaciones de Servicios
-import { extractVariable, searchGoogle, sendChatMessage } from './services/api'; 
+import { extractBatch, searchGoogle, sendChatMessage, submitMiningJob, streamMiningJob } from './services/api'; 
 
 // 2. Importaciones de Componentes
 import SelectionModule from './components/modules/SelectionModule';
@@ -94,57 +94,34 @@ function App() {
       if (lowerCmd === '/investigar todos' || lowerCmd === '/automatizar todos') {
           logCallback(`🏭 **Iniciando Modo Fábrica**`);
           logCallback(`📋 Se procesarán ${KNOWN_TRACTOR_LIST.length} tractores de la lista.`);
-          
-          let totalSuccess = 0;
-
-          for (const tractor of KNOWN_TRACTOR_LIST) {
-              logCallback(`🚜 **Procesando: ${tractor.company} ${tractor.model}**...`);
-              
-              let targetUrl = tractor.url;
-
-              // LÓGICA MEJORADA: Si no hay URL, ¡búscala!
-              if (!targetUrl) {
-                  logCallback(`   🔍 URL no definida. Buscando en Google...`);
-                  const masterQuery = `${tractor.company} ${tractor.model} technical specs tractordata`;
-                  const foundUrl = await searchGoogle(masterQuery);
-                  
-                  if (foundUrl) {
-                      targetUrl = foundUrl;
-                      logCallback(`   🎯 Encontrada: ${targetUrl}`);
-                  } else {
-                      logCallback(`   ⚠️ No se encontró URL. Saltando tractor.`);
-                      continue;
-                  }
-                  // Pausa de seguridad tras búsqueda
-                  await new Promise(r => setTimeout(r, 2000));
-              } else {
-                  logCallback(`   🔗 Usando URL predefinida.`);
-              }
-              
-              // Bucle interno de variables
-              for (const variable of VARIABLES_TO_MINE) {
-                  try {
-                      await new Promise(r => setTimeout(r, 1000)); 
-                      
-                      const result = await extractVariable({
-                          tractor_model: `${tractor.company} ${tractor.model}`, 
-                          company: tractor.company,
-                          variable_name: variable,
-                          source_url: targetUrl 
-                      });
-
-                      if (result.status === 'success' && result.value && result.value !== 'N/A') {
-                          logCallback(`   ✅ ${variable}: ${result.value}`);
-                          totalSuccess++;
-                      }
-                  } catch (e) {
-                      console.error(e);
-                  }
+
+          // El trabajo corre en el servidor: aquí sólo seguimos su progreso
+          let job;
+          try {
+              job = await submitMiningJob(KNOWN_TRACTOR_LIST, VARIABLES_TO_MINE);
+          } catch (error) {
+              return `❌ No se pudo lanzar el trabajo de minería: ${error.message}`;
+          }
+          logCallback(`🆔 Trabajo ${job.job_id} en marcha en el servidor.`);
+
+          const finalStatus = await streamMiningJob(job.job_id, (event) => {
+              if (event.type === 'stage' && event.stage === 'search') {
+                  logCallback(`   🔍 ${event.tractor}: buscando ficha técnica...`);
+              } else if (event.type === 'tractor_done') {
+                  // Tras una reconexión, los eventos reenviados traen el recuento pero no los valores
+                  logCallback(`🚜 **${event.tractor}**: ${event.extracted ?? Object.keys(event.values || {}).length} datos extraídos.`);
+                  Object.entries(event.values || {}).forEach(([variable, value]) => {
+                      logCallback(`   ✅ ${variable}: ${value}`);
+                  });
+              } else if (event.type === 'tractor_failed') {
+                  logCallback(`   ⚠️ ${event.tractor}: ${event.error}`);
               }
-              logCallback(`   🏁 ${tractor.model} finalizado.`);
-              logCallback(`-----------------------------------`);
+          });
+
+          if (finalStatus.status === 'disconnected') {
+              return `⚠️ Se perdió la conexión con el trabajo ${job.job_id}: ${finalStatus.error}\nSigue corriendo en el servidor; revisa el Catálogo (/buscar) más tarde.`;
           }
-          return `🏆 **Proceso Masivo Completado**\nDatos extraídos: ${totalSuccess}.\nRevisa el Catálogo (/buscar).`;
+          return `🏆 **Proceso Masivo ${finalStatus.status === 'completed' ? 'Completado' : 'Detenido'}**\nDatos extraídos: ${finalStatus.extracted}.\nRevisa el Catálogo (/buscar).`;
       }
 
       // --- COMANDO INDIVIDUAL: /investigar [Marca] [Modelo] ---
@@ -166,23 +143,27 @@ function App() {
           logCallback(`🎯 Fuente: ${masterUrl}`);
 
           let successCount = 0;
-          for (const variable of VARIABLES_TO_MINE) {
-              try {
-                  await new Promise(r => setTimeout(r, 2000)); 
-                  const result = await extractVariable({
-                      tractor_model: `${company} ${model}`, 
-                      company: company,
-                      variable_name: variable,
-                      source_url: masterUrl
-                  });
+          try {
+              const result = await extractBatch({
+                  tractor_model: `${company} ${model}`, 
+                  company: company,
+                  variable_names: VARIABLES_TO_MINE,
+                  source_url: masterUrl
+              });
+
+              // extractBatch captura sus errores y devuelve { status: 'error', error }
+              if (result.status === 'error') {
+                  return `❌ Error en la extracción: ${result.error}`;
+              }
 
-                  if (result.status === 'success' && result.value && result.value !== 'N/A') {
-                      logCallback(`✅ **${variable}**: ${result.value}`);
+              for (const item of result.results || []) {
+                  if (item.status === 'success' && item.value && item.value !== 'N/A') {
+                      logCallback(`✅ **${item.variable_name}**: ${item.value}`);
                       successCount++;
                   }
-              } catch (error) {
-                  logCallback(`❌ Error en ${variable}: ${error.message}`);
               }
+          } catch (error) {
+              logCallback(`❌ Error en la extracción: ${error.message}`);
           }
           return `🏁 Finalizado. Datos: ${successCount}/${VARIABLES_TO_MINE.length}.`;
       }
@@ -39,8 +39,8 @@ const CalculationModule = () => {
     const loadTractorList = async () => {
       setLoadingList(true);
       try {
-        // Llama a la Tarea 7 (API de Filtro) sin filtros para traer todo
-        const data = await fetchTractors({}); 
+        // Llama a la Tarea 7 (API de Filtro) sin filtros, pero sólo con los campos del desplegable
+        const data = await fetchTractors({ fields: 'company,model', sort: 'model' });
         setTractorsList(data);
       } catch (error) {
         console.error("Error cargando lista de tractores:", error);
@@ -52,10 +52,12 @@ const CalculationModule = () => {
   }, []); // El array vacío [] significa que solo se ejecuta al montar
 
   // 2. Reacciona cuando el usuario selecciona un tractor
-  const handleTractorChange = (value) => {
+  const handleTractorChange = async (value) => {
     setSelectedTractorId(value);
-    // Busca el tractor completo en la lista que ya cargamos
-    const fullData = tractorsList.find(t => t.id === value);
+    // La lista sólo trae compañía y modelo: pedimos el tractor completo al seleccionarlo
+    const selected = tractorsList.find(t => t.id === value);
+    const matches = selected ? await fetchTractors({ model: selected.model }) : [];
+    const fullData = matches.find(t => t.id === value);
     setTractorData(fullData || null);
     
     // (Opcional) Resetea los sliders a los valores por defecto
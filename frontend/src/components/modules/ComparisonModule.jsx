@@ -1,10 +1,11 @@
 import React, { useState, useMemo, useRef } from 'react';
 import { Card, Row, Col, Typography, Empty, Button, Select, Tag, Divider, Space, Tooltip, FloatButton } from 'antd';
-import { CloseOutlined, DownloadOutlined, PlusOutlined, DeleteOutlined, BarChartOutlined, LineChartOutlined, RadarChartOutlined, AreaChartOutlined } from '@ant-design/icons';
+import { CloseOutlined, DownloadOutlined, PlusOutlined, DeleteOutlined, BarChartOutlined, LineChartOutlined, RadarChartOutlined, AreaChartOutlined, ClusterOutlined } from '@ant-design/icons';
 import Plot from 'react-plotly.js';
 import html2pdf from 'html2pdf.js';
 
 import { useComparison } from '/src/context/ComparisonContext.jsx';
+import { fetchSimilarTractors } from '/src/services/api.js';
 
 const { Title, Text } = Typography;
 
@@ -133,8 +134,9 @@ const ChartCard = ({ id, config, data, onUpdate, onRemove }) => {
  * Módulo Principal de Comparación (Dashboard)
  */
 const ComparisonModule = () => {
-  const { comparisonList, removeTractorFromCompare } = useComparison();
+  const { comparisonList, addTractorToCompare, removeTractorFromCompare } = useComparison();
   const [isGeneratingPdf, setIsGeneratingPdf] = useState(false);
+  const [loadingSimilarId, setLoadingSimilarId] = useState(null);
   const dashboardRef = useRef(null);
 
   // Estado de las Gráficas (Dashboard Config)
@@ -158,6 +160,20 @@ const ComparisonModule = () => {
     setCharts(charts.map(c => c.id === id ? { ...c, [field]: value } : c));
   };
 
+  // --- TRACTORES PARECIDOS ---
+  // Rellena los huecos libres de la comparación (máx. 4) con los vecinos más cercanos
+  const handleAddSimilar = async (tractor) => {
+    const freeSlots = 4 - comparisonList.length;
+    if (freeSlots <= 0) return;
+    setLoadingSimilarId(tractor.id);
+    const similar = await fetchSimilarTractors(tractor.id, freeSlots + comparisonList.length);
+    setLoadingSimilarId(null);
+    similar
+      .filter(s => !comparisonList.find(t => t.id === s.id))
+      .slice(0, freeSlots)
+      .forEach(s => addTractorToCompare(s));
+  };
+
   // --- PDF ---
   const handleDownloadPDF = () => {
     setIsGeneratingPdf(true);
@@ -220,7 +236,18 @@ const ComparisonModule = () => {
                         <Tag>{t.drive_type || '-'}</Tag>
                       </Space>
                     </div>
-                    <Button type="text" danger icon={<CloseOutlined />} onClick={() => removeTractorFromCompare(t.id)} />
+                    <Space direction="vertical" size={0}>
+                      <Button type="text" danger icon={<CloseOutlined />} onClick={() => removeTractorFromCompare(t.id)} />
+                      <Tooltip title="Añadir tractores parecidos">
+                        <Button
+                          type="text"
+                          icon={<ClusterOutlined />}
+                          loading={loadingSimilarId === t.id}
+                          disabled={comparisonList.length >= 4}
+                          onClick={() => handleAddSimilar(t)}
+                        />
+                      </Tooltip>
+                    </Space>
                  </div>
               </Card>
             </Col>
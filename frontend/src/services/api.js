@@ -22,6 +22,22 @@ export const fetchTractors = async (filters = {}) => {
   }
 };
 
+/**
+ * Tractores con las especificaciones más parecidas a uno dado (k vecinos).
+ * @param {number} tractorId - id del tractor de referencia
+ * @param {number} k - Número de vecinos
+ * @returns {Promise<Array>} - Tractores completos con 'distance' y 'shared_features'
+ */
+export const fetchSimilarTractors = async (tractorId, k = 3) => {
+  try {
+    const response = await api.get(`/api/v1/tractors/${tractorId}/similar`, { params: { k } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching similar tractors:', error);
+    return [];
+  }
+};
+
 /**
  * Tarea 5: Llama al endpoint de extracción para procesar una sola variable.
  * Actualizado para manejar errores suavemente en el bucle de minería.
@@ -40,6 +56,75 @@ export const extractVariable = async (extractionData) => {
   }
 };
 
+/**
+ * Extracción por lotes: un solo scrapeo y una sola escritura por tractor.
+ * @param {object} batchData - { tractor_model, company, variable_names, source_url }
+ * @returns {Promise<object>} - { status, extracted_count, results: [{ status, variable_name, value }] }
+ */
+export const extractBatch = async (batchData) => {
+  try {
+    const response = await api.post('/api/v1/extract/batch', batchData);
+    return response.data;
+  } catch (error) {
+    console.error('Error extracting batch:', error.response?.data || error.message);
+    return { status: 'error', extracted_count: 0, results: [], error: error.message };
+  }
+};
+
+/**
+ * Lanza un trabajo de minería en el servidor (búsqueda -> scrapeo -> extracción -> guardado).
+ * Sigue corriendo aunque se cierre la pestaña.
+ * @param {Array} tractors - [{ company, model, url }]
+ * @param {Array} variableNames - Variables a minar
+ * @returns {Promise<object>} - { job_id, status, total, ... }
+ */
+export const submitMiningJob = async (tractors, variableNames) => {
+  const response = await api.post('/api/v1/jobs/mining', {
+    tractors,
+    variable_names: variableNames,
+  });
+  return response.data;
+};
+
+/**
+ * Sigue el progreso de un trabajo de minería por Server-Sent Events.
+ * EventSource se reconecta solo (con Last-Event-ID) si se corta la conexión; si el
+ * navegador se rinde o fallan varios reintentos seguidos, se cierra el stream y la
+ * promesa se resuelve con { type: 'job_status', status: 'disconnected', error }.
+ * @param {string} jobId - ID del trabajo
+ * @param {function} onEvent - Callback para cada evento { type, tractor, stage, ... }
+ * @returns {Promise<object>} - Se resuelve con el estado final del trabajo
+ */
+export const streamMiningJob = (jobId, onEvent) => new Promise((resolve) => {
+  const source = new EventSource(`${api.defaults.baseURL}/api/v1/jobs/${jobId}/events`);
+  const finishedStates = ['completed', 'cancelled', 'interrupted'];
+  const maxRetries = 3;
+  let failures = 0;
+
+  const handleEvent = (e) => {
+    failures = 0;
+    const data = JSON.parse(e.data);
+    onEvent(data);
+    if (data.type === 'job_status' && finishedStates.includes(data.status)) {
+      source.close();
+      resolve(data);
+    }
+  };
+
+  ['job_status', 'stage', 'tractor_done', 'tractor_failed'].forEach((type) =>
+    source.addEventListener(type, handleEvent)
+  );
+
+  source.onerror = () => {
+    failures += 1;
+    if (source.readyState === EventSource.CLOSED || failures >= maxRetries) {
+      console.error(`Error en el stream del trabajo ${jobId} (${failures} fallos seguidos).`);
+      source.close();
+      resolve({ type: 'job_status', status: 'disconnected', error: 'conexión perdida con el servidor' });
+    }
+  };
+});
+
 /**
  * Tarea 6: Llama al endpoint de generación de PDF y fuerza la descarga.
  * @param {string} modelName - Nombre del modelo